@@ -3,11 +3,62 @@
 import { setUniversities, setUniversityData } from './state.js';
 
 const DATA_PATH = 'data';
+// Бандл из mcp/utils/bundle_builder.py: один файл на ВУЗ и общий all.json
+const BUNDLE_PATH = 'bundle';
+
+const CATEGORIES = [
+    'olympiads',
+    'courses',
+    'schools',
+    'summerPrograms',
+    'practicalEvents',
+    'infoEvents',
+    'educationalEvents',
+    'onlineResources'
+];
+
+let manifestPromise = null;
+let allBundlePromise = null;
+// Время изменения data/index.json (секунды) из Last-Modified; null — неизвестно
+let indexModified = null;
+
+function fetchJson(url) {
+    return fetch(url)
+        .then(r => r.ok ? r.json() : null)
+        .catch(() => null);
+}
+
+// manifest.json бандла загружается один раз; null — бандл не собран или устарел
+// (data/index.json изменен позже сборки), тогда грузим по файлам
+function loadBundleManifest() {
+    if (!manifestPromise) {
+        manifestPromise = fetchJson(`${BUNDLE_PATH}/manifest.json`).then(manifest => {
+            if (!manifest) return null;
+            if (indexModified !== null && !(manifest.index_mtime >= indexModified)) {
+                console.warn('Бандл данных устарел, загрузка из data/');
+                return null;
+            }
+            return manifest;
+        });
+    }
+    return manifestPromise;
+}
+
+// Общий бандл загружается один раз; null — бандл не собран, грузим по файлам
+function loadAllBundle() {
+    if (!allBundlePromise) {
+        allBundlePromise = loadBundleManifest()
+            .then(manifest => manifest ? fetchJson(`${BUNDLE_PATH}/all.json`) : null);
+    }
+    return allBundlePromise;
+}
 
 export async function loadUniversities() {
     try {
         const response = await fetch(`${DATA_PATH}/index.json`);
         if (!response.ok) throw new Error('Failed to load universities');
+        const lastModified = Date.parse(response.headers.get('Last-Modified'));
+        indexModified = Number.isNaN(lastModified) ? null : Math.floor(lastModified / 1000);
         const data = await response.json();
         setUniversities(data.universities);
         return data.universities;
@@ -20,36 +71,25 @@ export async function loadUniversities() {
 
 export async function loadUniversityData(universityId) {
     try {
-        const files = [
-            'olympiads.json',
-            'courses.json',
-            'schools.json',
-            'summerPrograms.json',
-            'practicalEvents.json',
-            'infoEvents.json',
-            'educationalEvents.json',
-            'onlineResources.json'
-        ];
-
-        const basePath = `${DATA_PATH}/universities/${universityId}`;
-        const responses = await Promise.all(
-            files.map(file =>
-                fetch(`${basePath}/${file}`)
-                    .then(r => r.ok ? r.json() : null)
-                    .catch(() => null)
-            )
-        );
-
-        const data = {
-            olympiads: responses[0] || [],
-            courses: responses[1] || [],
-            schools: responses[2] || [],
-            summerPrograms: responses[3] || [],
-            practicalEvents: responses[4] || [],
-            infoEvents: responses[5] || [],
-            educationalEvents: responses[6] || [],
-            onlineResources: responses[7] || []
-        };
+        const manifest = await loadBundleManifest();
+        const bundle = manifest?.universities?.[universityId]
+            ? await fetchJson(`${BUNDLE_PATH}/${universityId}.json`)
+            : null;
+
+        let responses;
+        if (bundle?.resources) {
+            responses = CATEGORIES.map(category => bundle.resources[category]);
+        } else {
+            const basePath = `${DATA_PATH}/universities/${universityId}`;
+            responses = await Promise.all(
+                CATEGORIES.map(category => fetchJson(`${basePath}/${category}.json`))
+            );
+        }
+
+        const data = {};
+        CATEGORIES.forEach((category, i) => {
+            data[category] = responses[i] || [];
+        });
 
         setUniversityData(data);
         return data;
@@ -62,31 +102,33 @@ export async function loadUniversityData(universityId) {
 
 export async function loadResourcesByType(resourceType, universities) {
     try {
-        const fileMapping = {
-            'olympiad': 'olympiads.json',
-            'course': 'courses.json',
-            'school': 'schools.json',
-            'summerProgram': 'summerPrograms.json',
-            'practicalEvent': 'practicalEvents.json',
-            'infoEvent': 'infoEvents.json',
-            'educationalEvent': 'educationalEvents.json',
-            'onlineResource': 'onlineResources.json'
+        const categoryMapping = {
+            'olympiad': 'olympiads',
+            'course': 'courses',
+            'school': 'schools',
+            'summerProgram': 'summerPrograms',
+            'practicalEvent': 'practicalEvents',
+            'infoEvent': 'infoEvents',
+            'educationalEvent': 'educationalEvents',
+            'onlineResource': 'onlineResources'
         };
 
-        const fileName = fileMapping[resourceType];
-        if (!fileName) {
+        const category = categoryMapping[resourceType];
+        if (!category) {
             throw new Error(`Unknown resource type: ${resourceType}`);
         }
 
         const allResources = [];
 
-        const responses = await Promise.all(
-            universities.map(uni =>
-                fetch(`${DATA_PATH}/universities/${uni.id}/${fileName}`)
-                    .then(r => r.ok ? r.json() : [])
-                    .catch(() => [])
-            )
-        );
+        const bundle = await loadAllBundle();
+        const responses = bundle?.resources
+            ? universities.map(uni => bundle.resources[uni.id]?.[category] || [])
+            : await Promise.all(
+                universities.map(uni =>
+                    fetchJson(`${DATA_PATH}/universities/${uni.id}/${category}.json`)
+                        .then(resources => resources || [])
+                )
+            );
 
         responses.forEach(resources => {
             if (Array.isArray(resources)) {
@@ -24,7 +24,15 @@ function isDateInRange(dateString, daysFromNow) {
     return date >= today && date <= futureDate;
 }
 
-function isRegistrationActive(dates) {
+function isRegistrationActive(resource) {
+    // _registration заранее вычислен при сборке бандла
+    if (resource._registration !== undefined) {
+        if (!resource._registration) return false;
+        const today = new Date();
+        const [start, end] = resource._registration.map(parseDate);
+        return today >= start && today <= end;
+    }
+    const dates = resource.dates;
     if (!dates || !dates.registration) return false;
     const [startStr, endStr] = dates.registration.split(' - ');
     if (!endStr) return false;
@@ -35,6 +43,9 @@ function isRegistrationActive(dates) {
 }
 
 function getEventDate(resource) {
+    if (resource._event !== undefined) {
+        return resource._event;
+    }
     if (resource.type === 'olympiad' && resource.dates?.final) {
         return resource.dates.final;
     }
@@ -114,7 +125,7 @@ export function applyFilters(resources) {
             const eventDate = getEventDate(resource);
             if (!isDateInRange(eventDate, 90)) return false;
         } else if (appState.activeFilters.dateFilter === 'active-registration') {
-            if (!isRegistrationActive(resource.dates)) return false;
+            if (!isRegistrationActive(resource)) return false;
         }
 
         return true;
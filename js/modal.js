@@ -191,12 +191,14 @@ export function openUniversityInfoModal(university) {
     }
 }
 
+const nameCollator = new Intl.Collator('ru');
+
 function renderResourceList(resources, container) {
-    // Сортируем ресурсы по названию
+    // Сортируем ресурсы по названию (_sort заранее вычислен при сборке бандла)
     const sorted = [...resources].sort((a, b) => {
-        const nameA = (a.name || '').toLowerCase();
-        const nameB = (b.name || '').toLowerCase();
-        return nameA.localeCompare(nameB, 'ru');
+        const nameA = a._sort ?? (a.name || '').toLowerCase();
+        const nameB = b._sort ?? (b.name || '').toLowerCase();
+        return nameCollator.compare(nameA, nameB);
     });
 
     // Очищаем контейнер
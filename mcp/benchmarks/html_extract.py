@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""
+Бенчмарк извлечения текста из HTML: полный разбор BeautifulSoup
+против потокового парсера с остановкой на max_chars
+
+Использование (из папки mcp):
+    python3 -m benchmarks.html_extract [размер_страницы_КБ]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from utils.html_text import TextExtractor, extract_text, extract_text_soup
+
+
+def make_page(size_kb: int) -> bytes:
+    """Генерирует страницу, похожую на страницу ВУЗа: меню, скрипты, много блоков текста"""
+    block = (
+        "<div class='card'><h3>День открытых дверей факультета</h3>"
+        "<p>Приглашаем школьников 10–11 классов 22.01.2026 в 12:00. Регистрация обязательна.</p>"
+        "<script>window.dataLayer.push({'event': 'view', 'id': 12345});</script>"
+        "<nav><a href='/a'>Абитуриентам</a><a href='/b'>Олимпиады</a></nav></div>\n"
+    )
+    head = "<html><head><meta charset='utf-8'><title>ВШЭ</title><style>.card{color:red}</style></head><body>"
+    blocks = max(1, size_kb * 1024 // len(block.encode("utf-8")))
+    return (head + block * blocks + "<footer>© ВШЭ</footer></body></html>").encode("utf-8")
+
+
+def measure(func, content: bytes, max_chars: int, repeat: int) -> tuple[float, int]:
+    """Возвращает (среднее время в мс, пик памяти в байтах)"""
+    tracemalloc.start()
+    func(content, max_chars)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(content, max_chars)
+    return (time.perf_counter() - started) / repeat * 1000, peak
+
+
+def main() -> None:
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    max_chars = 3000
+    content = make_page(size_kb)
+
+    assert extract_text(content, max_chars) == extract_text_soup(content, max_chars)
+
+    # Текстовый узел на границе блоков feed() не должен разрываться
+    extractor = TextExtractor()
+    extractor.feed("<p>День открытых дверей 22.01.")
+    extractor.feed("2026 регистрация</p>")
+    extractor.close()
+    assert extractor.text == "День открытых дверей 22.01.2026 регистрация"
+    paragraph = ("<p>" + " ".join(f"слово{i}" for i in range(3000)) + "</p>").encode("utf-8")
+    for limit in (None, max_chars):
+        assert extract_text(paragraph, limit) == extract_text_soup(paragraph, limit)
+
+    print(f"Страница: {len(content) / 1024:.0f} КБ, max_chars={max_chars}")
+    for name, func, repeat in (
+        ("BeautifulSoup (полный разбор)", extract_text_soup, 5),
+        ("Потоковый парсер", extract_text, 50),
+    ):
+        elapsed, peak = measure(func, content, max_chars, repeat)
+        print(f"  {name:32} {elapsed:8.2f} мс  пик памяти {peak / 1024 / 1024:6.2f} МБ")
+
+
+if __name__ == "__main__":
+    main()
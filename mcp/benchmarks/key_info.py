@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Бенчмарк извлечения ключевой информации: прежняя реализация extract_key_info
+(три некомпилированных регулярных выражения на вызов) против однопроходного
+токенизатора utils.key_info на описаниях ресурсов из data/
+
+Использование (из папки mcp):
+    python3 -m benchmarks.key_info [число_текстов]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+from utils.json_handler import JSONHandler
+from utils.key_info import extract_key_info_batch
+from utils.validator import STOP_WORDS
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+
+def legacy_extract(text: str) -> dict:
+    """Прежняя реализация инструмента extract_key_info"""
+    dates = re.findall(r"\d{2}\.\d{2}\.\d{4}", text)
+    entities = re.findall(r"\b[А-ЯЁA-Z][а-яёa-z]{2,}\b", text)
+    words = re.findall(r"\b[а-яёА-ЯЁa-zA-Z]{4,}\b", text.lower())
+    key_phrases = [w for w in words if w not in STOP_WORDS][:10]
+    return {
+        "dates": list(set(dates)),
+        "entities": list(set(entities))[:10],
+        "key_phrases": list(set(key_phrases)),
+    }
+
+
+def load_texts(count: int) -> list[str]:
+    """Собирает тексты вида "название. описание. даты" из всех файлов ресурсов"""
+    handler = JSONHandler(str(DATA_DIR))
+    texts = []
+    for path in sorted(DATA_DIR.glob("universities/*/*.json")):
+        if path.name == "index.json":
+            continue
+        for resource in handler.read_file(str(path.relative_to(DATA_DIR))):
+            dates = " ".join(str(v) for v in (resource.get("dates") or {}).values())
+            texts.append(f"{resource.get('name', '')}. {resource.get('description', '')}. {dates}")
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    texts = load_texts(count)
+    chars = sum(len(t) for t in texts)
+
+    print(f"Тексты: {len(texts)}, {chars / 1024:.0f} КБ")
+    for name, func in (
+        ("Прежний extract_key_info", lambda items: [legacy_extract(t) for t in items]),
+        ("extract_key_info_batch", extract_key_info_batch),
+    ):
+        started = time.perf_counter()
+        results = func(texts)
+        elapsed = time.perf_counter() - started
+        found = sum(len(r["dates"]) for r in results)
+        print(f"  {name:26} {elapsed * 1000:8.1f} мс  {len(texts) / elapsed:10.0f} текстов/с  дат найдено: {found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,22 +18,43 @@ MCP сервис для валидации ресурсов ВУЗов
     }
 """
 
+import copy
 import json
 import asyncio
 import logging
+import os
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any
 import sys
 
 try:
-    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp import Context, FastMCP
 except ImportError:
     print("❌ Ошибка: не установлена библиотека mcp")
     print("Установите: pip install mcp")
     sys.exit(1)
 
+from utils.bundle_builder import BundleBuilder
+from utils.change_journal import ChangeJournal
+from utils.http_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, HTTPCache, normalize_url
+from utils.link_checker import LINK_STATES, LinkCache, LinkChecker, index_links, resource_links
+from utils.parse_pool import ParseExecutor
 from utils.web_scraper import WebScraper
-from utils.json_handler import JSONHandler
-from utils.report_generator import ReportGenerator
+from utils.json_handler import JSONHandler, is_resource_id
+from utils import key_info
+from utils.date_checker import DateChecker
+from utils.duplicates import DEFAULT_NAME_THRESHOLD, DEFAULT_THRESHOLD, DuplicateFinder, merge_patches
+from utils.dates import parse_date
+from utils.pagination import project
+from utils.resource_query import RESOURCE_GLOB, ResourceQuery
+from utils.results_store import ResultsStore
+from utils import schema
+from utils.similarity import SimilarityScorer
+from utils.validation_state import ValidationState, data_hash, page_hash
+from utils.report_generator import ReportGenerator, read_records
 
 # ==================== ЛОГИРОВАНИЕ ====================
 
@@ -46,25 +67,213 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 REPORTS_DIR = PROJECT_ROOT / "reports"
+# Агрегированный бандл данных для сайта (собирается build_data_bundle)
+BUNDLE_DIR = PROJECT_ROOT / "bundle"
+# История всех записей валидации (для агрегатов и сравнения запусков)
+RESULTS_DB = REPORTS_DIR / "results.sqlite3"
+# Служебные кэши сервиса (HTTP ответы и т.п.)
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# Пул разбора (полный разбор HTML, проверка структуры): "thread" (по умолчанию),
+# "process" или "inline"; задается переменными окружения MCP_PARSE_EXECUTOR и
+# MCP_PARSE_WORKERS (пусто — по числу ядер)
+PARSE_EXECUTOR = os.environ.get("MCP_PARSE_EXECUTOR", "thread")
+PARSE_WORKERS = int(os.environ["MCP_PARSE_WORKERS"]) if os.environ.get("MCP_PARSE_WORKERS") else None
+
+# HTTP кэш страниц: секунд без перепроверки и лимит размера в байтах; задаются
+# переменными окружения MCP_HTTP_CACHE_TTL и MCP_HTTP_CACHE_MAX_BYTES
+HTTP_CACHE_TTL = float(os.environ.get("MCP_HTTP_CACHE_TTL") or DEFAULT_TTL)
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("MCP_HTTP_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES)
+
+# Журнал изменений: патчи из queue_resource_patches переносятся в data/ группами
+JOURNAL_PATH = Path(__file__).parent / ".journal" / "changes.jsonl"
+JOURNAL_MAX_PENDING = 200  # сбросить, когда накопилось столько патчей
+JOURNAL_FLUSH_INTERVAL = 2.0  # ... или через столько секунд после первого
 
 logger.info(f"📁 Корень проекта: {PROJECT_ROOT}")
 logger.info(f"📁 Папка data: {DATA_DIR}")
 logger.info(f"📁 Папка reports: {REPORTS_DIR}")
+logger.info(f"📁 Папка кэша: {CACHE_DIR}")
 
 # ==================== MCP СЕРВЕР ====================
 
 app = FastMCP("resource-validator")
 
 # Инициализируем компоненты с правильными путями
-scraper = WebScraper()
+http_cache = HTTPCache(str(CACHE_DIR / "http_cache.sqlite3"), HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES)
+parse_executor = ParseExecutor(PARSE_EXECUTOR, PARSE_WORKERS)
+scraper = WebScraper(cache=http_cache, parser=parse_executor)
 json_handler = JSONHandler(str(DATA_DIR))
 report_gen = ReportGenerator(str(REPORTS_DIR))
+resource_query = ResourceQuery(json_handler)
+journal = ChangeJournal(str(JOURNAL_PATH), json_handler, JOURNAL_MAX_PENDING, JOURNAL_FLUSH_INTERVAL)
+validation_state = ValidationState(str(CACHE_DIR / "validation_state.sqlite3"))
+results_store = ResultsStore(str(RESULTS_DB), json_handler.id_index)
+schema_cache = schema.SchemaCache(str(CACHE_DIR / "schema_cache.sqlite3"))
+link_cache = LinkCache(str(CACHE_DIR / "link_cache.sqlite3"))
+link_checker = LinkChecker(link_cache)
+bundle_builder = BundleBuilder(str(DATA_DIR), str(BUNDLE_DIR))
+
+# Поля по умолчанию для batch_get_resources и list_resources
+DEFAULT_BATCH_FIELDS = ["id", "name", "description", "website", "type"]
+DEFAULT_LIST_FIELDS = ["id", "name"]
+DEFAULT_QUERY_FIELDS = ["id", "name", "type", "website"]
+
+# Поддерживаемые форматы отчетов
+REPORT_FORMATS = list(ReportGenerator.SINKS)
+
+
+async def _flush_pending(filepath: str | None = None) -> None:
+    """Переносит в файл ожидающие патчи журнала, чтобы чтение видело все изменения"""
+    if journal.pending_count(filepath):
+        await asyncio.to_thread(journal.flush, filepath)
+
+
+def _group_patches(patches: str, filepath: str | None) -> tuple[dict[str, list[dict]], list[dict]]:
+    """
+    Разбирает JSON-строку патчей и группирует их по файлам
+
+    Returns:
+        (файл -> патчи в исходном порядке, результаты-ошибки для патчей без файла)
+    """
+    data = json.loads(patches)
+    if not isinstance(data, list):
+        data = [data]
+
+    by_file: dict[str, list[dict]] = {}
+    errors = []
+    for patch in data:
+        target = patch.get("file", filepath) if isinstance(patch, dict) else filepath
+        if not target:
+            errors.append(
+                {
+                    "id": patch.get("id") if isinstance(patch, dict) else None,
+                    "status": "error",
+                    "message": "Не указан файл (filepath или поле file)",
+                }
+            )
+            continue
+        by_file.setdefault(target, []).append(patch)
+    return by_file, errors
+
+
+async def _apply_patches(by_file: dict[str, list[dict]], atomic: bool) -> tuple[list[dict], list[str]]:
+    """
+    Применяет патчи, сгруппированные по файлам (одна запись на файл)
+
+    Returns:
+        (результаты {file, id, status, message} по каждому патчу, сохраненные файлы)
+    """
+    results = []
+    written = []
+    for target, file_patches in by_file.items():
+        try:
+            # Патчи из журнала поставлены раньше и применяются первыми
+            await _flush_pending(target)
+            outcome = await asyncio.to_thread(json_handler.patch_file, target, file_patches, atomic=atomic)
+        except Exception as e:
+            logger.error(f"Ошибка патча {target}: {e}")
+            outcome = {
+                "written": False,
+                "results": [
+                    {"id": p.get("id") if isinstance(p, dict) else None, "status": "error", "message": str(e)}
+                    for p in file_patches
+                ],
+            }
+        if outcome["written"]:
+            written.append(target)
+        results.extend({"file": target, **r} for r in outcome["results"])
+    return results, written
+
+
+async def _collect_resources(filepath: str | None) -> list[tuple[str, dict]]:
+    """Ресурсы файла (или всех файлов universities/*/*.json) парами (файл, ресурс)"""
+    await _flush_pending(filepath)
+    if filepath:
+        files = [filepath]
+    else:
+        files = sorted(
+            path.relative_to(DATA_DIR).as_posix() for path in DATA_DIR.glob(RESOURCE_GLOB) if path.name != "index.json"
+        )
+
+    items = []
+    for file in files:
+        data = await asyncio.to_thread(json_handler.read_file, file)
+        items.extend((file, r) for r in data if isinstance(r, dict) and "id" in r)
+    return items
+
+
+async def _fetch_pages(
+    items: list[tuple[str, dict]], max_chars: int, concurrency: int, use_cache: bool, ctx: Context | None
+) -> dict[str, dict]:
+    """Загружает страницы website ресурсов (каждый URL один раз), сообщая прогресс"""
+    urls = list(dict.fromkeys(r["website"] for _, r in items if r.get("website")))
+    pages: dict[str, dict] = {}
+    async for result in scraper.fetch_many(urls, max_chars, concurrency, use_cache):
+        pages[result["url"]] = result
+        if ctx is not None:
+            await ctx.report_progress(len(pages), len(urls))
+    return pages
+
+
+def _check_formats(formats: list[str]) -> None:
+    """Проверяет, что все форматы отчета поддерживаются"""
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Неизвестные форматы отчета: {', '.join(unknown)}")
+
+
+def _write_run(source: str, records: Iterable[dict], write: Callable[[Iterable[dict]], Any]) -> tuple[Any, int]:
+    """
+    Передает записи писателю отчетов, за тот же проход сохраняя их в историю результатов
+
+    Returns:
+        (результат write, run_id запуска в истории)
+    """
+    with results_store.open_run(source) as run:
+        result = write(run.track(records))
+    return result, run.run_id
+
+
+async def _save_reports(records: list[dict], formats: list[str], base: str) -> tuple[dict[str, str], int]:
+    """
+    Сохраняет записи в историю результатов и в отчеты {base}.{формат} за один проход
+
+    Returns:
+        (формат -> путь к отчету, run_id)
+    """
+
+    def write(tracked: Iterable[dict]) -> dict:
+        if not formats:
+            for _ in tracked:
+                pass
+            return {}
+        return report_gen.generate_many(tracked, formats, base)[0]
+
+    paths, run_id = await asyncio.to_thread(_write_run, base, records, write)
+    return {fmt: str(path) for fmt, path in paths.items()}, run_id
+
+
+def _day_start(value: str | None, days: int = 0) -> float | None:
+    """Timestamp начала дня (аргумент инструмента "YYYY-MM-DD") со сдвигом на days дней"""
+    if value is None:
+        return None
+    return (datetime.combine(parse_date(value), datetime.min.time()) + timedelta(days=days)).timestamp()
+
+
+def _page_text(pages: dict[str, dict], resource: dict) -> str | None:
+    """Текст страницы ресурса; None — нет website или страница не загрузилась"""
+    page = pages.get(resource.get("website") or "")
+    if page is None or page.get("status") != "success":
+        return None
+    return page.get("content", "")
+
 
 # ==================== ИНСТРУМЕНТЫ ====================
 
 
 @app.tool()
-def read_json_file(filepath: str) -> dict:
+async def read_json_file(filepath: str) -> dict:
     """
     Читает JSON файл с ресурсами
 
@@ -79,7 +288,8 @@ def read_json_file(filepath: str) -> dict:
     """
     try:
         logger.info(f"Чтение файла: {filepath}")
-        data = json_handler.read_file(filepath)
+        await _flush_pending(filepath)
+        data = await asyncio.to_thread(json_handler.read_file, filepath)
         logger.info(f"✅ Успешно загружено {len(data)} ресурсов")
         return {"status": "success", "count": len(data), "data": data}
     except FileNotFoundError:
@@ -94,29 +304,36 @@ def read_json_file(filepath: str) -> dict:
 
 
 @app.tool()
-def fetch_webpage(url: str, max_chars: int = 3000) -> dict:
+async def fetch_webpage(
+    url: str, max_chars: int = 3000, use_cache: bool = True, cache_ttl: float | None = None
+) -> dict:
     """
     Захватывает содержимое веб-страницы
 
     Args:
         url: URL страницы для захвата
         max_chars: Максимум символов в ответе (default: 3000)
+        use_cache: Использовать дисковый кэш страниц (default: True)
+        cache_ttl: Сколько секунд страница из кэша свежа без перепроверки
+            (default: MCP_HTTP_CACHE_TTL, 24 часа)
 
     Returns:
-        Текстовое содержимое страницы
+        Текстовое содержимое страницы и статус кэша (hit/revalidated/miss)
 
     Example:
         fetch_webpage("https://dod.hse.ru", 5000)
     """
     try:
         logger.info(f"Загрузка страницы: {url}")
-        content = asyncio.run(scraper.fetch_url(url, max_chars))
-        logger.info(f"✅ Страница загружена ({len(content)} символов)")
+        page = await scraper.fetch_page(url, max_chars, use_cache, cache_ttl)
+        content = page["content"]
+        logger.info(f"✅ Страница загружена ({len(content)} символов, кэш: {page['cache_status']})")
         return {
             "status": "success",
             "url": url,
             "content": content,
             "length": len(content),
+            "cache_status": page["cache_status"],
         }
     except TimeoutError:
         logger.error(f"Таймаут при загрузке: {url}")
@@ -127,7 +344,80 @@ def fetch_webpage(url: str, max_chars: int = 3000) -> dict:
 
 
 @app.tool()
-def batch_get_resources(filepath: str, start_index: int = 0, count: int = 10) -> dict:
+async def fetch_webpages(
+    urls: list[str],
+    max_chars: int = 3000,
+    concurrency: int = 10,
+    time_limit: float | None = None,
+    use_cache: bool = True,
+    cache_ttl: float | None = None,
+    ctx: Context | None = None,
+) -> dict:
+    """
+    Конкурентно захватывает содержимое нескольких веб-страниц
+
+    Args:
+        urls: Список URL (повторы загружаются один раз)
+        max_chars: Максимум символов для каждой страницы (default: 3000)
+        concurrency: Максимум одновременных загрузок (default: 10)
+        time_limit: Общий лимит времени в секундах; по истечении
+            возвращаются уже готовые результаты (optional)
+        use_cache: Использовать дисковый кэш страниц (default: True)
+        cache_ttl: Сколько секунд страница из кэша свежа без перепроверки
+            (default: MCP_HTTP_CACHE_TTL, 24 часа)
+
+    Returns:
+        Результаты по каждому URL в порядке запроса; незавершенные
+        к time_limit URL помечаются статусом "pending"
+
+    Example:
+        fetch_webpages(["https://dod.hse.ru", "https://olimpiada.ru"], 3000, 20)
+    """
+    try:
+        unique_urls = list(dict.fromkeys(urls))
+        logger.info(f"Загрузка {len(unique_urls)} страниц (concurrency: {concurrency})")
+
+        results: dict[str, dict] = {}
+
+        async def collect() -> None:
+            async for result in scraper.fetch_many(unique_urls, max_chars, concurrency, use_cache, cache_ttl):
+                results[result["url"]] = result
+                if ctx is not None:
+                    await ctx.report_progress(len(results), len(unique_urls))
+
+        timed_out = False
+        try:
+            await asyncio.wait_for(collect(), timeout=time_limit)
+        except TimeoutError:
+            timed_out = True
+            logger.warning(f"Лимит времени {time_limit} с исчерпан, готово {len(results)}/{len(unique_urls)}")
+
+        ordered = [results.get(url, {"url": url, "status": "pending"}) for url in unique_urls]
+        succeeded = sum(1 for r in ordered if r["status"] == "success")
+        failed = sum(1 for r in ordered if r["status"] == "error")
+
+        logger.info(f"✅ Загружено {succeeded} страниц, ошибок: {failed}")
+        return {
+            "status": "partial" if timed_out else "success",
+            "total": len(unique_urls),
+            "succeeded": succeeded,
+            "failed": failed,
+            "pending": len(unique_urls) - succeeded - failed,
+            "results": ordered,
+        }
+    except Exception as e:
+        logger.error(f"Ошибка пакетной загрузки: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def batch_get_resources(
+    filepath: str,
+    start_index: int = 0,
+    count: int = 10,
+    fields: list[str] | None = None,
+    cursor: str | None = None,
+) -> dict:
     """
     Получает пакет ресурсов из файла
 
@@ -135,48 +425,47 @@ def batch_get_resources(filepath: str, start_index: int = 0, count: int = 10) ->
         filepath: Путь к JSON файлу
         start_index: Начальный индекс (default: 0)
         count: Количество ресурсов (default: 10)
+        fields: Возвращаемые поля, в т.ч. вложенные ("dates.event", "benefits.bvi");
+            ["*"] — ресурс целиком (default: id, name, description, website, type)
+        cursor: Токен next_cursor из предыдущего ответа (вместо start_index)
 
     Returns:
-        Массив ресурсов с основными полями
+        Массив ресурсов с выбранными полями и next_cursor для следующей страницы
 
     Example:
-        batch_get_resources("hse/infoEvents.json", 0, 5)
+        batch_get_resources("hse/infoEvents.json", 0, 5, ["id", "name", "dates.event"])
     """
     try:
-        logger.info(f"Получение batch из {filepath} (index: {start_index}, count: {count})")
-        data = json_handler.read_file(filepath)
+        logger.info(f"Получение batch из {filepath} (index: {start_index}, count: {count}, cursor: {bool(cursor)})")
+        await _flush_pending(filepath)
+        page = await asyncio.to_thread(json_handler.read_page, filepath, count, cursor, start_index)
 
-        batch = data[start_index : start_index + count]
-
-        # Оставляем только важные поля
-        simplified = []
-        for resource in batch:
-            simplified.append(
-                {
-                    "id": resource.get("id"),
-                    "name": resource.get("name"),
-                    "description": resource.get("description", ""),
-                    "website": resource.get("website"),
-                    "type": resource.get("type"),
-                }
-            )
+        # Оставляем только запрошенные поля
+        simplified = [project(resource, fields or DEFAULT_BATCH_FIELDS) for resource in page["resources"]]
 
         logger.info(f"✅ Получено {len(simplified)} ресурсов")
         return {
             "status": "success",
             "filepath": filepath,
-            "total_resources": len(data),
+            "total_resources": page["total"],
             "batch_size": len(simplified),
-            "start_index": start_index,
+            "start_index": page["start_index"],
+            "next_cursor": page["next_cursor"],
             "resources": simplified,
         }
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Некорректный запрос batch: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
     except Exception as e:
         logger.error(f"Ошибка получения batch: {e}")
         return {"status": "error", "message": f"❌ Ошибка: {e}"}
 
 
 @app.tool()
-def update_json_file(filepath: str, updated_data: str) -> dict:
+async def update_json_file(filepath: str, updated_data: str) -> dict:
     """
     Обновляет JSON файл с исправленными данными
 
@@ -198,8 +487,9 @@ def update_json_file(filepath: str, updated_data: str) -> dict:
         if not isinstance(data, list):
             data = [data]
 
-        # Сохраняем
-        json_handler.write_file(filepath, data)
+        # Сохраняем (ожидающие патчи журнала поставлены раньше и применяются первыми)
+        await _flush_pending(filepath)
+        await asyncio.to_thread(json_handler.write_file, filepath, data)
 
         logger.info(f"✅ Файл обновлен: {len(data)} ресурсов")
         return {
@@ -217,7 +507,145 @@ def update_json_file(filepath: str, updated_data: str) -> dict:
 
 
 @app.tool()
-def save_validation_report(report_data: str, filename: str | None = None) -> dict:
+async def patch_resources(filepath: str | None, patches: str, atomic: bool = False) -> dict:
+    """
+    Частично обновляет ресурсы по ID без передачи файла целиком
+
+    Патч: {"id": "...", "merge": {...}} (JSON Merge Patch, null удаляет поле)
+    и/или {"id": "...", "ops": [{"op": "replace", "path": "/description", "value": "..."}]}
+    (JSON Patch); {"id": "...", "delete": true} удаляет ресурс. Поле "file" в
+    патче задает файл вместо filepath, поэтому один вызов может исправить
+    ресурсы нескольких файлов. Каждый файл сохраняется одной атомарной записью.
+
+    Args:
+        filepath: Путь к JSON файлу по умолчанию (None — файл указан в каждом патче)
+        patches: JSON-строка со списком патчей
+        atomic: Не сохранять файл, если хотя бы один его патч не применился
+
+    Returns:
+        Результат по каждому ID и список сохраненных файлов
+
+    Example:
+        patch_resources("hse/infoEvents.json", '[{"id": "general_open_day_hse", "merge": {"description": "..."}}]')
+    """
+    try:
+        by_file, results = _group_patches(patches, filepath)
+        logger.info(f"Патчи: {sum(map(len, by_file.values()))} в {len(by_file)} файлах")
+
+        file_results, written = await _apply_patches(by_file, atomic)
+        results.extend(file_results)
+
+        applied = sum(r["status"] == "success" for r in results)
+        failed = sum(r["status"] == "error" for r in results)
+        logger.info(f"✅ Применено патчей: {applied}, ошибок: {failed}")
+        return {
+            "status": "success" if not failed else "partial",
+            "applied": applied,
+            "failed": failed,
+            "written_files": written,
+            "results": results,
+        }
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка применения патчей: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def queue_resource_patches(filepath: str | None, patches: str, flush: bool = False) -> dict:
+    """
+    Ставит патчи ресурсов в журнал изменений для групповой записи
+
+    Патчи (формат patch_resources) сразу сохраняются в журнал на диске, а в
+    JSON файлы переносятся группами — по числу накопленных патчей или по
+    таймеру, одной записью на файл. Для исправлений по одному ресурсу это
+    дешевле update_json_file/patch_resources: сотни правок дают несколько
+    перезаписей файлов. Чтение файлов через сервис видит поставленные патчи.
+
+    Args:
+        filepath: Путь к JSON файлу по умолчанию (None — файл указан в каждом патче)
+        patches: JSON-строка со списком патчей
+        flush: Сразу перенести все ожидающие патчи в файлы
+
+    Returns:
+        Число принятых патчей и размер очереди; при flush — итог сброса
+
+    Example:
+        queue_resource_patches("hse/infoEvents.json", '[{"id": "general_open_day_hse", "merge": {"description": "..."}}]')
+    """
+    try:
+        by_file, errors = _group_patches(patches, filepath)
+
+        queued = 0
+        for target, file_patches in by_file.items():
+            accepted = []
+            for patch in file_patches:
+                valid = (
+                    isinstance(patch, dict)
+                    and is_resource_id(patch.get("id"))
+                    and bool({"merge", "ops", "delete"} & set(patch))
+                )
+                if not valid:
+                    errors.append(
+                        {
+                            "file": target,
+                            "id": patch.get("id") if isinstance(patch, dict) else None,
+                            "status": "error",
+                            "message": "Патч должен содержать id (строка или число) и merge, ops или delete",
+                        }
+                    )
+                    continue
+                accepted.append({key: value for key, value in patch.items() if key != "file"})
+            if accepted:
+                await asyncio.to_thread(journal.append, target, accepted)
+                queued += len(accepted)
+
+        response = {
+            "status": "success" if not errors else "partial",
+            "queued": queued,
+            "rejected": errors,
+            "pending": journal.pending_count(),
+        }
+        if flush:
+            response["flush"] = await asyncio.to_thread(journal.flush)
+            response["pending"] = journal.pending_count()
+
+        logger.info(f"✅ В журнал поставлено {queued} патчей, ожидают записи: {response['pending']}")
+        return response
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка постановки патчей: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def flush_journal(filepath: str | None = None) -> dict:
+    """
+    Переносит ожидающие патчи журнала изменений в JSON файлы
+
+    Args:
+        filepath: Сбросить только патчи этого файла (default: все)
+
+    Returns:
+        Число записанных файлов, примененных и отклоненных патчей с ошибками
+
+    Example:
+        flush_journal()
+    """
+    try:
+        summary = await asyncio.to_thread(journal.flush, filepath)
+        return {"status": "success" if not summary["failed"] else "partial", **summary}
+    except Exception as e:
+        logger.error(f"Ошибка сброса журнала: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def save_validation_report(report_data: str, filename: str | None = None) -> dict:
     """
     Сохраняет отчет о валидации в CSV
 
@@ -242,14 +670,20 @@ def save_validation_report(report_data: str, filename: str | None = None) -> dic
         if not isinstance(data, list):
             data = [data]
 
-        # Генерируем отчет
-        filepath = report_gen.generate_csv(data, filename)
+        # Генерируем отчет и сохраняем записи в историю
+        filepath, run_id = await asyncio.to_thread(
+            _write_run,
+            filename or "save_validation_report",
+            data,
+            lambda tracked: report_gen.generate_csv(tracked, filename),
+        )
 
         logger.info(f"✅ Отчет сохранен: {filepath}")
         return {
             "status": "success",
             "filepath": str(filepath),
             "record_count": len(data),
+            "run_id": run_id,
             "message": f"✅ Отчет сохранен: {filepath}",
         }
     except json.JSONDecodeError as e:
@@ -261,39 +695,136 @@ def save_validation_report(report_data: str, filename: str | None = None) -> dic
 
 
 @app.tool()
-def list_resources(filepath: str) -> dict:
+async def save_validation_reports(
+    report_data: str | None = None,
+    formats: list[str] | None = None,
+    filename: str | None = None,
+    source_file: str | None = None,
+    gzip: bool = False,
+) -> dict:
+    """
+    Сохраняет отчет о валидации сразу в нескольких форматах
+
+    Записи разбираются один раз и за один проход передаются писателям всех
+    форматов. Вместо report_data можно указать файл с записями на сервере
+    (JSONL читается построчно, без загрузки в память целиком).
+
+    Args:
+        report_data: JSON-строка с записями валидации (или используйте source_file)
+        formats: Форматы: "csv", "json", "html" (default: все три)
+        filename: Имя отчетов без расширения (optional, генерируется автоматически)
+        source_file: Файл с записями (.json, .jsonl, можно .gz); относительный путь — от папки reports
+        gzip: Сжимать отчеты gzip (default: False)
+
+    Returns:
+        Пути к отчетам по форматам, число записей и сводка
+
+    Example:
+        save_validation_reports('[{"resource_id": "...", "validation_status": "OK", ...}]', ["json", "html"])
+        save_validation_reports(source_file="validation_results.jsonl", gzip=True)
+    """
+    try:
+        formats = formats or REPORT_FORMATS
+        if (report_data is None) == (source_file is None):
+            raise ValueError("Укажите либо report_data, либо source_file")
+
+        if source_file is not None:
+            path = (REPORTS_DIR / source_file).resolve()
+            if not path.is_relative_to(PROJECT_ROOT.resolve()):
+                raise ValueError(f"Файл вне папки проекта: {source_file}")
+            if not path.exists():
+                raise FileNotFoundError(f"Файл не найден: {source_file}")
+            records = read_records(path)
+        else:
+            data = json.loads(report_data)
+            records = data if isinstance(data, list) else [data]
+
+        logger.info(f"Сохранение отчетов валидации: {', '.join(formats)}")
+        (paths, summary), run_id = await asyncio.to_thread(
+            _write_run,
+            filename or source_file or "save_validation_reports",
+            records,
+            lambda tracked: report_gen.generate_many(tracked, formats, filename, gzip),
+        )
+
+        return {
+            "status": "success",
+            "reports": {fmt: str(path) for fmt, path in paths.items()},
+            "run_id": run_id,
+            "record_count": summary["total"],
+            "summary": summary,
+            "message": f"✅ Отчеты сохранены: {', '.join(formats)} ({summary['total']} записей)",
+        }
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Некорректные параметры отчета: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка сохранения отчетов: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def list_resources(
+    filepath: str,
+    fields: list[str] | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> dict:
     """
     Выводит список всех ресурсов в файле
 
     Args:
         filepath: Путь к JSON файлу
+        fields: Возвращаемые поля (default: id, name)
+        limit: Размер страницы (default: все ресурсы)
+        cursor: Токен next_cursor из предыдущего ответа
 
     Returns:
-        Список ID и названий ресурсов
+        Список индексов и выбранных полей ресурсов
 
     Example:
         list_resources("hse/infoEvents.json")
+        list_resources("hse/infoEvents.json", ["id", "benefits.bvi"], 20)
     """
     try:
         logger.info(f"Получение списка ресурсов из {filepath}")
-        data = json_handler.read_file(filepath)
+        await _flush_pending(filepath)
+        page = await asyncio.to_thread(
+            json_handler.read_page, filepath, limit if limit is not None else sys.maxsize, cursor
+        )
 
-        resources = [{"index": i, "id": r.get("id"), "name": r.get("name")} for i, r in enumerate(data)]
+        resources = [
+            {"index": i, **project(r, fields or DEFAULT_LIST_FIELDS)}
+            for i, r in enumerate(page["resources"], start=page["start_index"])
+        ]
 
         logger.info(f"✅ Найдено {len(resources)} ресурсов")
         return {
             "status": "success",
             "filepath": filepath,
-            "total_count": len(resources),
+            "total_count": page["total"],
+            "next_cursor": page["next_cursor"],
             "resources": resources,
         }
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Некорректный запрос списка: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
     except Exception as e:
         logger.error(f"Ошибка получения списка: {e}")
         return {"status": "error", "message": f"❌ Ошибка: {e}"}
 
 
 @app.tool()
-def get_resource_by_id(filepath: str, resource_id: str) -> dict:
+async def get_resource_by_id(filepath: str, resource_id: str) -> dict:
     """
     Получает полную информацию о ресурсе по ID
 
@@ -309,12 +840,12 @@ def get_resource_by_id(filepath: str, resource_id: str) -> dict:
     """
     try:
         logger.info(f"Получение ресурса {resource_id} из {filepath}")
-        data = json_handler.read_file(filepath)
+        await _flush_pending(filepath)
+        resource = await asyncio.to_thread(json_handler.find_resource, filepath, resource_id)
 
-        for resource in data:
-            if resource.get("id") == resource_id:
-                logger.info(f"✅ Ресурс найден: {resource_id}")
-                return {"status": "success", "resource": resource}
+        if resource is not None:
+            logger.info(f"✅ Ресурс найден: {resource_id}")
+            return {"status": "success", "resource": resource}
 
         logger.warning(f"Ресурс не найден: {resource_id}")
         return {"status": "error", "message": f"❌ Ресурс {resource_id} не найден"}
@@ -324,45 +855,1131 @@ def get_resource_by_id(filepath: str, resource_id: str) -> dict:
 
 
 @app.tool()
-def extract_key_info(text: str) -> dict:
+async def find_resource_files(resource_id: str) -> dict:
+    """
+    Находит файлы data/, в которых есть ресурс с данным ID
+
+    Args:
+        resource_id: ID ресурса
+
+    Returns:
+        Список файлов с позицией ресурса и ID ВУЗа
+
+    Example:
+        find_resource_files("general_open_day_hse")
+    """
+    try:
+        logger.info(f"Поиск файлов с ресурсом {resource_id}")
+        await _flush_pending()
+        locations = await asyncio.to_thread(json_handler.locate_resource, resource_id)
+
+        if not locations:
+            logger.warning(f"Ресурс не найден: {resource_id}")
+            return {"status": "error", "message": f"❌ Ресурс {resource_id} не найден"}
+
+        logger.info(f"✅ Ресурс найден в {len(locations)} файлах")
+        return {"status": "success", "resource_id": resource_id, "locations": locations}
+    except Exception as e:
+        logger.error(f"Ошибка поиска ресурса: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def query_resources(
+    university: list[str] | None = None,
+    category: list[str] | None = None,
+    resource_type: list[str] | None = None,
+    resource_format: list[str] | None = None,
+    target_audience: list[str] | None = None,
+    bvi: bool | None = None,
+    registration_open_on: str | None = None,
+    event_from: str | None = None,
+    event_to: str | None = None,
+    fields: list[str] | None = None,
+    limit: int = 50,
+    count_only: bool = False,
+) -> dict:
+    """
+    Ищет ресурсы всех ВУЗов по индексам (без чтения каждого файла клиентом)
+
+    Значения внутри одного параметра объединяются по ИЛИ, параметры — по И.
+
+    Args:
+        university: ID ВУЗов ("hse", "msu", ...)
+        category: Категории по имени файла ("olympiads", "courses", "infoEvents", ...)
+        resource_type: Значения поля type ("олимпиада", "день открытых дверей", ...)
+        resource_format: Значения поля format ("очно", "онлайн", ...)
+        target_audience: Классы ("10 класс", "11 класс", ...)
+        bvi: Наличие льготы БВИ
+        registration_open_on: Дата, на которую открыта регистрация ("today" или YYYY-MM-DD)
+        event_from: Начало окна дат события (dates.event)
+        event_to: Конец окна дат события (dates.event)
+        fields: Возвращаемые поля (default: id, name, type, website)
+        limit: Максимум ресурсов в ответе (default: 50)
+        count_only: Вернуть только количество и разбивку
+
+    Returns:
+        Общее число совпадений, разбивка по ВУЗам и категориям, ресурсы
+
+    Example:
+        query_resources(university=["hse"], bvi=True, registration_open_on="today")
+    """
+    try:
+        terms = {
+            name: values
+            for name, values in (
+                ("university", university),
+                ("category", category),
+                ("type", resource_type),
+                ("format", resource_format),
+                ("target_audience", target_audience),
+                ("bvi", None if bvi is None else [bvi]),
+            )
+            if values is not None
+        }
+
+        date_windows = {}
+        if registration_open_on:
+            day = parse_date(registration_open_on)
+            date_windows["registration"] = (day, day)
+        if event_from or event_to:
+            date_windows["event"] = (
+                parse_date(event_from) if event_from else None,
+                parse_date(event_to) if event_to else None,
+            )
+
+        logger.info(f"Запрос ресурсов: {terms} {date_windows}")
+        await _flush_pending()
+        results = await asyncio.to_thread(resource_query.query, terms, date_windows)
+
+        response = {
+            "status": "success",
+            "total": len(results),
+            "counts": ResourceQuery.counts(results),
+        }
+        if not count_only:
+            response["resources"] = [
+                # Записи индекса общие с ResourceQuery: в ответ идет копия выбранных полей
+                {"filepath": relpath, **copy.deepcopy(project(resource, fields or DEFAULT_QUERY_FIELDS))}
+                for (relpath, _), resource in results[: max(0, limit)]
+            ]
+
+        logger.info(f"✅ Найдено {len(results)} ресурсов")
+        return response
+    except ValueError as e:
+        logger.error(f"Некорректный запрос: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка запроса ресурсов: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+def extract_key_info(text: str, default_year: int | None = None) -> dict:
     """
     Извлекает ключевую информацию из текста для валидации
 
     Args:
         text: Текст для анализа (описание ресурса или контент страницы)
+        default_year: Год для дат без года ("22 января") (optional)
 
     Returns:
         dict: {
-            "dates": ["22.01.2026", "15.02.2026"],
+            "dates": ["2026-01-22", "2026-02-15"],
+            "date_ranges": [["2026-02-01", "2026-02-15"]],
             "entities": ["ВШЭ", "МИФ"],
-            "key_phrases": ["день открытых дверей"]
+            "key_phrases": ["вебинар"]
         }
 
     Example:
         extract_key_info("Вебинар 22.01.2026 от ВШЭ о МИФ")
     """
-    import re
-    from utils.validator import STOP_WORDS
+    try:
+        return {"status": "success", **key_info.extract_key_info(text, default_year)}
+    except Exception as e:
+        logger.error(f"Ошибка извлечения информации: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def extract_key_info_batch(texts: list[str], default_year: int | None = None) -> dict:
+    """
+    Извлекает ключевую информацию из множества текстов за один вызов
+
+    Args:
+        texts: Тексты (описания ресурсов или контент страниц)
+        default_year: Год для дат без года ("22 января") (optional)
+
+    Returns:
+        Результаты extract_key_info в порядке текстов
+
+    Example:
+        extract_key_info_batch(["Вебинар 22.01.2026 от ВШЭ", "Смена 10–12 марта 2026"])
+    """
+    try:
+        logger.info(f"Извлечение ключевой информации из {len(texts)} текстов")
+        results = await asyncio.to_thread(key_info.extract_key_info_batch, texts, default_year)
+        logger.info(f"✅ Обработано {len(results)} текстов")
+        return {"status": "success", "count": len(results), "results": results}
+    except Exception as e:
+        logger.error(f"Ошибка извлечения информации: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def prescreen_resources(
+    filepath: str | None = None,
+    max_chars: int = 5000,
+    concurrency: int = 10,
+    use_cache: bool = True,
+    name_threshold: float = 0.6,
+    full_threshold: float = 0.6,
+    partial_threshold: float = 0.3,
+    include_passed: bool = False,
+    ctx: Context | None = None,
+) -> dict:
+    """
+    Локально (без LLM) оценивает соответствие карточек ресурсов их страницам
+
+    Для каждого ресурса загружается страница website и считается доля
+    TF-IDF веса признаков name и description (основы слов и символьные
+    триграммы), найденная в тексте страницы. Ресурсы со статусом pass
+    можно не отправлять на семантическую проверку; review и fail требуют ее.
+
+    Args:
+        filepath: Путь к JSON файлу (default: все файлы universities/*/*.json)
+        max_chars: Сколько символов страницы сравнивать (default: 5000)
+        concurrency: Максимум одновременных загрузок (default: 10)
+        use_cache: Использовать дисковый кэш страниц (default: True)
+        name_threshold: Порог name_match (default: 0.6)
+        full_threshold: Порог description_match = "full" (default: 0.6)
+        partial_threshold: Порог description_match = "partial" (default: 0.3)
+        include_passed: Включать в results ресурсы со статусом pass (default: False)
+
+    Returns:
+        Число ресурсов по статусам pass/review/fail и оценки
+        {file, resource_id, name_score, description_score, cosine,
+        name_match, description_match, prescreen}
+
+    Example:
+        prescreen_resources("universities/hse/infoEvents.json")
+    """
+    try:
+        scorer = SimilarityScorer(name_threshold, full_threshold, partial_threshold)
+
+        items = await _collect_resources(filepath)
+        logger.info(f"Предварительная оценка: {len(items)} ресурсов")
+        pages = await _fetch_pages(items, max_chars, concurrency, use_cache, ctx)
+        texts = [_page_text(pages, resource) or "" for _, resource in items]
+
+        scores = await asyncio.to_thread(scorer.score, [r for _, r in items], texts)
+
+        results = []
+        counts = {"pass": 0, "review": 0, "fail": 0}
+        for (file, resource), score in zip(items, scores, strict=True):
+            counts[score["prescreen"]] += 1
+            page = pages.get(resource.get("website") or "")
+            if page is None:
+                score["error"] = "Нет website"
+            elif page["status"] != "success":
+                score["error"] = page.get("message", "Страница не загружена")
+            if include_passed or score["prescreen"] != "pass":
+                results.append({"file": file, **score})
+
+        logger.info(f"✅ Предварительная оценка: {counts}")
+        return {"status": "success", "total": len(items), "counts": counts, "results": results}
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Некорректные параметры оценки: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка предварительной оценки: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def check_resource_dates(
+    filepath: str | None = None,
+    formats: list[str] | None = None,
+    filename: str | None = None,
+    max_chars: int = 20000,
+    concurrency: int = 10,
+    use_cache: bool = True,
+    today: str | None = None,
+    ctx: Context | None = None,
+) -> dict:
+    """
+    Проверяет даты ресурсов по их страницам без LLM и сохраняет отчет
+
+    За один проход загружаются страницы всех ресурсов; для каждого поля
+    dates.* проверяется, не прошли ли даты и есть ли они на странице.
+    NEEDS_UPDATE — все даты прошли или даты не найдены на странице.
+
+    Args:
+        filepath: Путь к JSON файлу (default: все файлы universities/*/*.json)
+        formats: Форматы отчета: "csv", "json", "html" (default: ["csv"])
+        filename: Имя отчета без расширения (optional, генерируется автоматически)
+        max_chars: Сколько символов страницы просматривать (default: 20000)
+        concurrency: Максимум одновременных загрузок (default: 10)
+        use_cache: Использовать дисковый кэш страниц (default: True)
+        today: Дата, относительно которой даты считаются прошедшими (default: сегодня)
+
+    Returns:
+        Сводка по статусам, пути к отчетам и ресурсы с расхождениями
 
+    Example:
+        check_resource_dates(formats=["csv", "html"])
+        check_resource_dates("universities/hse/olympiads.json", today="2026-01-15")
+    """
     try:
-        # Даты в формате DD.MM.YYYY
-        dates = re.findall(r"\d{2}\.\d{2}\.\d{4}", text)
+        formats = formats or ["csv"]
+        _check_formats(formats)
+        checker = DateChecker(parse_date(today) if today else None)
+
+        items = await _collect_resources(filepath)
+        logger.info(f"Проверка дат: {len(items)} ресурсов")
+        pages = await _fetch_pages(items, max_chars, concurrency, use_cache, ctx)
+
+        checked = await asyncio.to_thread(checker.check_many, [r for _, r in items], pages)
+        records = [{"file": file, **record} for (file, _), record in zip(items, checked, strict=True)]
+
+        base = filename or f"date_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        reports, run_id = await _save_reports(records, formats, base)
+
+        summary = report_gen.summarize(records)
+        issues = [
+            {
+                "file": r["file"],
+                "resource_id": r["resource_id"],
+                "validation_status": r["validation_status"],
+                "reasoning": r["reasoning"],
+                "key_discrepancies": r["semantic_analysis"]["key_discrepancies"],
+            }
+            for r in records
+            if r["validation_status"] != "OK"
+        ]
+
+        logger.info(f"✅ Проверка дат завершена: {summary}")
+        return {"status": "success", "summary": summary, "reports": reports, "run_id": run_id, "issues": issues}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Некорректные параметры проверки дат: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка проверки дат: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
 
-        # Ключевые фразы (заглавные слова)
-        entities = re.findall(r"\b[А-ЯЁA-Z][а-яёa-z]{2,}\b", text)
+@app.tool()
+async def validate_changed(
+    filepath: str | None = None,
+    max_age_days: float = 7,
+    force: bool = False,
+    formats: list[str] | None = None,
+    filename: str | None = None,
+    max_chars: int = 20000,
+    concurrency: int = 10,
+    use_cache: bool = True,
+    today: str | None = None,
+    ctx: Context | None = None,
+) -> dict:
+    """
+    Инкрементальная валидация: проверяет только изменившиеся ресурсы
+
+    Для каждого ресурса хранится хэш проверяемых полей (name, description,
+    website, type, format, dates), хэш текста страницы и результат прошлой
+    проверки. Страницы загружаются через HTTP кэш (неизменившиеся отвечают
+    304), а проверка дат и предварительная оценка сходства запускаются
+    только для ресурсов, у которых изменились данные или страница либо
+    результат старше max_age_days. Для остальных берется сохраненный результат.
+
+    Args:
+        filepath: Путь к JSON файлу (default: все файлы universities/*/*.json)
+        max_age_days: Максимальный возраст результата в днях (default: 7)
+        force: Проверить все ресурсы заново (default: False)
+        formats: Форматы отчета по всем ресурсам: "csv", "json", "html" (default: отчет не сохраняется)
+        filename: Имя отчета без расширения (optional, генерируется автоматически)
+        max_chars: Сколько символов страницы просматривать (default: 20000)
+        concurrency: Максимум одновременных загрузок (default: 10)
+        use_cache: Использовать дисковый кэш страниц (default: True)
+        today: Дата, относительно которой даты считаются прошедшими (default: сегодня)
 
-        # Длинные слова (потенциально важные)
-        words = re.findall(r"\b[а-яёА-ЯЁa-zA-Z]{4,}\b", text.lower())
-        key_phrases = [w for w in words if w not in STOP_WORDS][:10]
+    Returns:
+        Число проверенных и пропущенных ресурсов, причины проверки, сводку
+        по всем ресурсам, записи проверенных ресурсов и список ресурсов,
+        требующих внимания
 
+    Example:
+        validate_changed()
+        validate_changed("universities/hse/olympiads.json", max_age_days=1, formats=["html"])
+    """
+    try:
+        formats = formats or []
+        _check_formats(formats)
+        if max_age_days < 0:
+            raise ValueError("max_age_days не может быть отрицательным")
+        checker = DateChecker(parse_date(today) if today else None)
+        scorer = SimilarityScorer()
+
+        items = await _collect_resources(filepath)
+        pages = await _fetch_pages(items, max_chars, concurrency, use_cache, ctx)
+        saved = await asyncio.to_thread(validation_state.load, [(r["id"], file) for file, r in items])
+
+        changed = []
+        reasons: dict[str, int] = {}
+        for file, resource in items:
+            text = _page_text(pages, resource)
+            hashes = (data_hash(resource), page_hash(text))
+            if force:
+                reason = "forced"
+            else:
+                reason = validation_state.change_reason(
+                    saved.get((resource["id"], file)),
+                    *hashes,
+                    max_age=max_age_days * 86400,
+                    today=checker.today,
+                    date_ends=[end for _, end in DateChecker.resource_intervals(resource).values()],
+                )
+            if reason:
+                changed.append((file, resource, text, hashes, reason))
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+        logger.info(f"Инкрементальная валидация: {len(changed)} из {len(items)} ресурсов изменились")
+
+        resources = [resource for _, resource, _, _, _ in changed]
+        checked = await asyncio.to_thread(checker.check_many, resources, pages)
+        scores = await asyncio.to_thread(scorer.score, resources, [text or "" for _, _, text, _, _ in changed])
+
+        fresh: dict[tuple[str, str], dict] = {}
+        entries = []
+        for (file, resource, _, hashes, reason), record, score in zip(changed, checked, scores, strict=True):
+            semantic = record["semantic_analysis"]
+            semantic.update(name_match=score["name_match"], description_match=score["description_match"])
+            if score["prescreen"] == "fail":
+                semantic["key_discrepancies"].append("Название и описание почти не встречаются на странице")
+            record.update(file=file, prescreen=score["prescreen"], change_reason=reason)
+            fresh[(resource["id"], file)] = record
+            entries.append(
+                {
+                    "resource_id": resource["id"],
+                    "file": file,
+                    "data_hash": hashes[0],
+                    "page_hash": hashes[1],
+                    "status": record["validation_status"],
+                    "result": record,
+                    "evaluated_on": checker.today,
+                }
+            )
+        if entries:
+            await asyncio.to_thread(validation_state.record_many, entries)
+
+        records = [fresh.get((r["id"], file)) or saved[(r["id"], file)]["result"] for file, r in items]
+        needs_review = [
+            {
+                "file": r["file"],
+                "resource_id": r["resource_id"],
+                "validation_status": r["validation_status"],
+                "prescreen": r["prescreen"],
+                "reasoning": r["reasoning"],
+            }
+            for r in records
+            if r["validation_status"] != "OK" or r["prescreen"] != "pass"
+        ]
+
+        base = filename or f"incremental_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        reports, run_id = await _save_reports(records, formats, base)
+
+        summary = report_gen.summarize(records)
+        logger.info(f"✅ Инкрементальная валидация завершена: {summary}")
         return {
             "status": "success",
-            "dates": list(set(dates)),
-            "entities": list(set(entities))[:10],
-            "key_phrases": list(set(key_phrases)),
+            "total": len(items),
+            "validated": len(changed),
+            "skipped": len(items) - len(changed),
+            "reasons": reasons,
+            "summary": summary,
+            "reports": reports,
+            "run_id": run_id,
+            "results": list(fresh.values()),
+            "needs_review": needs_review,
         }
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Некорректные параметры инкрементальной валидации: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
     except Exception as e:
-        logger.error(f"Ошибка извлечения информации: {e}")
+        logger.error(f"Ошибка инкрементальной валидации: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def validate_all_structures(
+    filepath: str | None = None,
+    changed_only: bool = True,
+    include_warnings: bool = False,
+) -> dict:
+    """
+    Проверяет структуру всех ресурсов по модели данных (docs/модель_данных.md)
+
+    Проверяются обязательные поля и типы, значения format и cost.type из
+    справочников, поля benefits, ссылки, формат и корректность дат dates.*,
+    уникальность id в файле. Файлы проверяются параллельно в пуле
+    разбора; при changed_only повторно проверяются только файлы,
+    изменившиеся с прошлого запуска (остальные берутся из кэша).
+
+    Args:
+        filepath: Путь к JSON файлу (default: все файлы universities/*/*.json)
+        changed_only: Проверять только изменившиеся файлы (default: True)
+        include_warnings: Включать в сводки предупреждения (нестандартный type, даты текстом)
+
+    Returns:
+        Итоги (files, checked, resources, errors, warnings), число нарушений
+        по правилам и сводки по файлам с нарушениями
+        {file, resources, errors, warnings, rules, examples}
+
+    Example:
+        validate_all_structures()
+        validate_all_structures("universities/hse/olympiads.json", include_warnings=True)
+    """
+    try:
+        await _flush_pending(filepath)
+        if filepath:
+            relpaths = [filepath]
+        else:
+            relpaths = sorted(
+                path.relative_to(DATA_DIR).as_posix()
+                for path in DATA_DIR.glob(RESOURCE_GLOB)
+                if path.name != "index.json"
+            )
+
+        signatures = {}
+        for relpath in relpaths:
+            stat = (DATA_DIR / relpath).stat()
+            signatures[relpath] = (stat.st_mtime_ns, stat.st_size)
+
+        cached = await asyncio.to_thread(schema_cache.lookup, signatures) if changed_only else {}
+        stale = [relpath for relpath in relpaths if relpath not in cached]
+
+        # Пачки по числу воркеров x2: файлы небольшие, пересылка между процессами дороже проверки
+        chunks = max(1, min(len(stale), parse_executor.workers * 2))
+        batches = [stale[i::chunks] for i in range(chunks)] if stale else []
+        checked = await asyncio.gather(
+            *(
+                parse_executor.run(schema.validate_files, [str(DATA_DIR / relpath) for relpath in batch])
+                for batch in batches
+            )
+        )
+        fresh = {
+            relpath: result
+            for batch, results in zip(batches, checked, strict=True)
+            for relpath, result in zip(batch, results, strict=True)
+        }
+        if fresh or not filepath:
+            # При проверке всех файлов из кэша удаляются записи удаленных файлов
+            await asyncio.to_thread(
+                schema_cache.save,
+                {relpath: (signatures[relpath], result) for relpath, result in fresh.items()},
+                None if filepath else relpaths,
+            )
+
+        totals = {"resources": 0, "errors": 0, "warnings": 0}
+        rules: dict[str, int] = {}
+        files = []
+        for relpath in relpaths:
+            result = fresh.get(relpath) or cached[relpath]
+            for key in totals:
+                totals[key] += result[key]
+            for rule, count in result["rules"].items():
+                if include_warnings or rule.startswith("error:"):
+                    rules[rule] = rules.get(rule, 0) + count
+            if result["errors"] or (include_warnings and result["warnings"]):
+                files.append(
+                    {
+                        "file": relpath,
+                        "resources": result["resources"],
+                        "errors": result["errors"],
+                        "warnings": result["warnings"],
+                        "rules": {
+                            rule: count
+                            for rule, count in result["rules"].items()
+                            if include_warnings or rule.startswith("error:")
+                        },
+                        "examples": [
+                            e for e in result["examples"] if include_warnings or e["severity"] == "error"
+                        ],
+                    }
+                )
+
+        logger.info(
+            f"✅ Проверка структуры: {len(relpaths)} файлов ({len(fresh)} проверено заново), "
+            f"ошибок {totals['errors']}, предупреждений {totals['warnings']}"
+        )
+        return {
+            "status": "success",
+            "files": len(relpaths),
+            "checked": sorted(fresh),
+            "cached": len(relpaths) - len(fresh),
+            **totals,
+            "rules": dict(sorted(rules.items(), key=lambda item: -item[1])),
+            "results": files,
+        }
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ Файл не найден: {e.filename}"}
+    except Exception as e:
+        logger.error(f"Ошибка проверки структуры: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def find_duplicates(
+    filepath: str | None = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    name_threshold: float = DEFAULT_NAME_THRESHOLD,
+    cross_university_only: bool = False,
+    limit: int = 100,
+) -> dict:
+    """
+    Находит дубликаты и почти-дубликаты ресурсов, в том числе между ВУЗами
+
+    Ресурсы сравниваются по шинглам name + description через MinHash и LSH
+    (сравниваются только пары, попавшие в общую корзину, а не все со
+    всеми), дополнительно блокируются по нормализованному website.
+    Дубликатом считается пара со сходством названий не ниже name_threshold
+    и сходством текста не ниже threshold или одинаковой ссылкой.
+
+    Args:
+        filepath: Путь к JSON файлу (default: все файлы universities/*/*.json)
+        threshold: Порог сходства Жаккара name + description (default: 0.6)
+        name_threshold: Порог сходства названий (default: 0.5)
+        cross_university_only: Только пары ресурсов разных ВУЗов
+        limit: Сколько кластеров вернуть (default: 100)
+
+    Returns:
+        Число ресурсов, кандидатов, совпавших пар и кластеры
+        {universities, members: [{file, id, name, website}], pairs}
+
+    Example:
+        find_duplicates(cross_university_only=True)
+    """
+    try:
+        items = await _collect_resources(filepath)
+        finder = DuplicateFinder(threshold, name_threshold)
+        result = await asyncio.to_thread(finder.find, items, cross_university_only)
+
+        clusters = result.pop("clusters")
+        logger.info(f"✅ Дубликаты: {len(clusters)} кластеров среди {result['resources']} ресурсов")
+        return {
+            "status": "success",
+            **result,
+            "clusters_total": len(clusters),
+            "cross_university": sum(len(c["universities"]) > 1 for c in clusters),
+            "clusters": clusters[:limit],
+        }
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ Файл не найден: {e.filename}"}
+    except ValueError as e:
+        logger.error(f"Ошибка поиска дубликатов: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка поиска дубликатов: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def merge_duplicates(decisions: str, dry_run: bool = True) -> dict:
+    """
+    Объединяет дубликаты по решениям: один ресурс остается, остальные удаляются
+
+    Решение: {"keep": {"file": "...", "id": "..."}, "drop": [{"file": "...",
+    "id": "..."}], "fill": true}. При fill пустые и отсутствующие поля
+    сохраняемого ресурса заполняются из удаляемых (merge-патч), затем
+    удаляемые ресурсы убираются патчами {"id": ..., "delete": true}.
+    Изменения идут через patch_resources: каждый файл сохраняется одной
+    атомарной записью, файл с неприменившимся патчем не записывается.
+
+    Args:
+        decisions: JSON-строка со списком решений (например, по кластерам find_duplicates)
+        dry_run: Только показать патчи, не изменяя файлы (default: True)
+
+    Returns:
+        Построенные патчи и ошибки решений; без dry_run — результат
+        применения по каждому патчу и список сохраненных файлов
+
+    Example:
+        merge_duplicates('[{"keep": {"file": "universities/hse/olympiads.json", "id": "a"}, '
+                         '"drop": [{"file": "universities/msu/olympiads.json", "id": "b"}]}]', dry_run=False)
+    """
+    try:
+        data = json.loads(decisions)
+        if not isinstance(data, list):
+            data = [data]
+
+        files: dict[str, dict[str, dict]] = {}
+
+        async def lookup(ref: Any) -> dict:
+            if not isinstance(ref, dict) or not ref.get("file") or ref.get("id") is None:
+                raise ValueError(f"Ссылка на ресурс должна содержать file и id: {ref}")
+            if ref["file"] not in files:
+                await _flush_pending(ref["file"])
+                resources = await asyncio.to_thread(json_handler.read_file, ref["file"])
+                files[ref["file"]] = {r["id"]: r for r in resources if isinstance(r, dict) and "id" in r}
+            resource = files[ref["file"]].get(ref["id"])
+            if resource is None:
+                raise ValueError(f"Ресурс не найден: {ref['file']}#{ref['id']}")
+            return resource
+
+        patches: list[dict] = []
+        errors = []
+        claimed: set[tuple[str, str]] = set()
+        for decision in data:
+            try:
+                if not isinstance(decision, dict) or not isinstance(decision.get("drop"), list):
+                    raise ValueError("Решение должно содержать keep и список drop")
+                keep_ref, drop_refs = decision.get("keep"), decision["drop"]
+                keep = await lookup(keep_ref)
+                drops = [await lookup(ref) for ref in drop_refs]
+                refs = [(keep_ref["file"], keep_ref["id"]), *((ref["file"], ref["id"]) for ref in drop_refs)]
+                if len(set(refs)) != len(refs) or claimed & set(refs):
+                    raise ValueError("Ресурс указан в решениях несколько раз")
+                claimed.update(refs)
+            except ValueError as e:
+                errors.append({"decision": decision, "status": "error", "message": str(e)})
+                continue
+
+            fill = merge_patches(keep, drops) if decision.get("fill", True) else None
+            if fill:
+                patches.append({"file": keep_ref["file"], **fill})
+            patches.extend({"file": ref["file"], "id": ref["id"], "delete": True} for ref in drop_refs)
+
+        if dry_run or not patches:
+            return {
+                "status": "success" if not errors else "partial",
+                "dry_run": dry_run,
+                "patches": patches,
+                "errors": errors,
+            }
+
+        by_file: dict[str, list[dict]] = {}
+        for patch in patches:
+            by_file.setdefault(patch["file"], []).append(patch)
+        results, written = await _apply_patches(by_file, atomic=True)
+
+        applied = sum(r["status"] == "success" for r in results)
+        failed = sum(r["status"] == "error" for r in results)
+        logger.info(f"✅ Объединение дубликатов: применено патчей {applied}, ошибок {failed + len(errors)}")
+        return {
+            "status": "success" if not failed and not errors else "partial",
+            "dry_run": False,
+            "applied": applied,
+            "failed": failed,
+            "written_files": written,
+            "results": results,
+            "errors": errors,
+        }
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка объединения дубликатов: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def merge_resource_files(
+    sources: list[str],
+    dest_file: str,
+    policy: str = "keep",
+    timestamp_field: str | None = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Объединяет ресурсы из нескольких файлов в один файл по ID
+
+    Источники (JSON массивы или JSON Lines, например результаты парсинга)
+    читаются потоково; новые ID добавляются, для существующих действует
+    политика: keep — оставить как есть, overwrite — заменить целиком,
+    newest — объединить по полям, значения из более новой версии (по
+    timestamp_field или времени изменения файла). Целевой файл
+    сохраняется одной записью.
+
+    Args:
+        sources: Исходные файлы (пути относительно data, внутри папки проекта)
+        dest_file: Целевой файл относительно data (создается, если его нет)
+        policy: "keep", "overwrite" или "newest" (default: "keep")
+        timestamp_field: Поле ресурса с ISO датой версии для newest
+        dry_run: Только показать изменения, не записывая файл
+
+    Returns:
+        Прочитано по источникам, добавленные ID, изменения полей
+        обновленных ресурсов {id, source, fields: {поле: {old, new}}},
+        отклоненные ресурсы и признак записи
+
+    Example:
+        merge_resource_files(["../scraped/hse_olympiads.jsonl"], "universities/hse/olympiads.json", "newest")
+    """
+    try:
+        if json_handler.relative_path(dest_file) is None:
+            raise ValueError(f"Целевой файл вне папки data: {dest_file}")
+        for source in sources:
+            if not (DATA_DIR / source).resolve().is_relative_to(PROJECT_ROOT.resolve()):
+                raise ValueError(f"Файл вне папки проекта: {source}")
+
+        for filepath in dict.fromkeys([*sources, dest_file]):
+            if json_handler.relative_path(filepath) is not None:
+                await _flush_pending(filepath)
+        result = await asyncio.to_thread(
+            json_handler.merge_files, sources, dest_file, policy, timestamp_field, dry_run
+        )
+
+        logger.info(
+            f"✅ Объединение {dest_file}: добавлено {len(result['added'])}, обновлено {len(result['updated'])}"
+        )
+        return {"status": "success" if not result["rejected"] else "partial", "dry_run": dry_run, **result}
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Ошибка объединения файлов: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка объединения файлов: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def check_links(
+    filepath: str | None = None,
+    include_index: bool = True,
+    concurrency: int = 50,
+    use_cache: bool = True,
+    include_ok: bool = False,
+    ctx: Context | None = None,
+) -> dict:
+    """
+    Проверяет ссылки website ресурсов и ВУЗов без загрузки страниц
+
+    Собираются website всех ресурсов и website/contacts.*.website из
+    index.json. Каждый уникальный URL проверяется HEAD-запросом (при
+    ошибке — GET первого байта) с переходом по редиректам; результаты
+    кэшируются с разным сроком жизни для рабочих, перенаправленных и
+    битых ссылок.
+
+    Args:
+        filepath: Путь к JSON файлу ресурсов (default: все файлы universities/*/*.json)
+        include_index: Проверять ссылки index.json (default: True)
+        concurrency: Максимум одновременных проверок (default: 50)
+        use_cache: Использовать кэш результатов проверки (default: True)
+        include_ok: Включать в results рабочие ссылки
+
+    Returns:
+        Число ссылок и уникальных URL, итоги по состояниям (ok, redirected,
+        broken, error, skipped — хост временно отключен) и результаты {url, state, status, final_url, chain,
+        method, error, cached, locations: [{file, id, field}]}
+
+    Example:
+        check_links()
+        check_links("universities/hse/olympiads.json", include_index=False)
+    """
+    try:
+        started = time.monotonic()
+        links: list[tuple[str, dict]] = []
+        by_file: dict[str, list[dict]] = {}
+        for file, resource in await _collect_resources(filepath):
+            by_file.setdefault(file, []).append(resource)
+        for file, resources in by_file.items():
+            links.extend(resource_links(file, resources))
+
+        if include_index:
+            for path in [DATA_DIR / "index.json", *sorted(DATA_DIR.glob("universities/*/index.json"))]:
+                if path.exists():
+                    text = await asyncio.to_thread(path.read_text, encoding="utf-8")
+                    links.extend(index_links(path.relative_to(DATA_DIR).as_posix(), json.loads(text)))
+
+        locations: dict[str, list[dict]] = {}
+        for url, location in links:
+            locations.setdefault(normalize_url(url), []).append(location)
+        urls = list(dict.fromkeys(url for url, _ in links))
+        logger.info(f"Проверка ссылок: {len(links)} ссылок, {len(locations)} уникальных URL")
+
+        results = []
+        async for result in link_checker.check_many(urls, concurrency, use_cache):
+            results.append(result)
+            if ctx is not None:
+                await ctx.report_progress(len(results), len(locations))
+
+        by_state = dict.fromkeys(LINK_STATES, 0)
+        for result in results:
+            by_state[result["state"]] += 1
+        order = {state: i for i, state in enumerate(("broken", "error", "redirected", "skipped", "ok"))}
+        results.sort(key=lambda r: (order[r["state"]], r["url"]))
+
+        logger.info(
+            f"✅ Ссылки: {by_state['ok']} ok, {by_state['redirected']} с редиректом, "
+            f"{by_state['broken']} битых, {by_state['error']} ошибок"
+        )
+        return {
+            "status": "success",
+            "links": len(links),
+            "unique_urls": len(results),
+            "checked": sum(not r["cached"] for r in results),
+            "cached": sum(r["cached"] for r in results),
+            "by_state": by_state,
+            "duration_seconds": round(time.monotonic() - started, 2),
+            "results": [
+                {**r, "locations": locations[normalize_url(r["url"])]}
+                for r in results
+                if include_ok or r["state"] != "ok"
+            ],
+        }
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ Файл не найден: {e.filename}"}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка проверки ссылок: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def build_data_bundle(force: bool = False) -> dict:
+    """
+    Собирает агрегированный бандл данных для сайта (bundle/)
+
+    Вместо запроса на каждый файл категории каждого ВУЗа сайт загружает
+    bundle/<id>.json (страница ВУЗа) или bundle/all.json (поиск по типу):
+    только поля карточек, заранее вычисленные ключи сортировки и даты,
+    рядом сжатые копии .json.gz. Пересобираются только ВУЗы с
+    изменившимися исходными файлами.
+
+    Args:
+        force: Пересобрать все файлы независимо от manifest.json
+
+    Returns:
+        Словарь с папкой бандла, числом ВУЗов и ресурсов, списками
+        пересобранных и удаленных ВУЗов и размерами all.json
+    """
+    try:
+        await _flush_pending()
+        result = await asyncio.to_thread(bundle_builder.build, force)
+        return {"status": "success", **result}
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        return {"status": "error", "message": f"❌ Файл не найден: {e.filename}"}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON: {e}")
+        return {"status": "error", "message": f"❌ Ошибка парсинга JSON: {e}"}
+    except ValueError as e:
+        logger.error(f"Ошибка сборки бандла: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка сборки бандла: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def list_validation_runs(limit: int = 20, university: str | None = None) -> dict:
+    """
+    Возвращает последние запуски из истории результатов валидации
+
+    Запуск создается при каждом сохранении отчета (save_validation_report,
+    save_validation_reports), проверке дат и инкрементальной валидации.
+
+    Args:
+        limit: Сколько запусков вернуть (default: 20)
+        university: Только запуски с ресурсами ВУЗа (например, "hse")
+
+    Returns:
+        Список {run_id, created_at, source, total}, новые первыми
+
+    Example:
+        list_validation_runs(5, "hse")
+    """
+    try:
+        runs = await asyncio.to_thread(results_store.runs, limit, university)
+        return {"status": "success", "count": len(runs), "runs": runs}
+    except Exception as e:
+        logger.error(f"Ошибка чтения истории запусков: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def aggregate_results(
+    group_by: list[str] | None = None,
+    university: str | None = None,
+    status: str | None = None,
+    run_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> dict:
+    """
+    Считает записи истории валидации по группам
+
+    Args:
+        group_by: Поля группировки: "status", "university", "run_id", "file" (default: ["status"])
+        university: Фильтр по ВУЗу
+        status: Фильтр по статусу (OK, NEEDS_UPDATE, MISMATCH, ERROR)
+        run_id: Фильтр по запуску
+        since: Запуски начиная с даты ("YYYY-MM-DD")
+        until: Запуски по дату включительно ("YYYY-MM-DD")
+
+    Returns:
+        Список {<поля группировки>, count, avg_confidence}
+
+    Example:
+        aggregate_results(["university", "status"], since="2026-09-01")
+        aggregate_results(["run_id"], university="hse", status="MISMATCH")
+    """
+    try:
+        groups = await asyncio.to_thread(
+            results_store.aggregate,
+            group_by,
+            university,
+            status,
+            run_id,
+            _day_start(since),
+            _day_start(until, days=1),
+        )
+        return {"status": "success", "groups": groups}
+    except ValueError as e:
+        logger.error(f"Некорректные параметры агрегации: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка агрегации результатов: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def results_trend(
+    status: str = "MISMATCH",
+    university: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 50,
+) -> dict:
+    """
+    Показывает долю записей со статусом по запускам (динамику)
+
+    Args:
+        status: Статус, долю которого считать (default: "MISMATCH")
+        university: Фильтр по ВУЗу
+        since: Запуски начиная с даты ("YYYY-MM-DD")
+        until: Запуски по дату включительно ("YYYY-MM-DD")
+        limit: Сколько последних запусков учитывать (default: 50)
+
+    Returns:
+        Список {run_id, created_at, source, total, count, rate, avg_confidence},
+        старые запуски первыми
+
+    Example:
+        results_trend("MISMATCH", "hse", since="2026-09-17")
+    """
+    try:
+        trend = await asyncio.to_thread(
+            results_store.trend, status, university, _day_start(since), _day_start(until, days=1), limit
+        )
+        return {"status": "success", "validation_status": status, "runs": trend}
+    except ValueError as e:
+        logger.error(f"Некорректные параметры динамики: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка расчета динамики: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def find_regressions(
+    run_id: int | None = None,
+    base_run_id: int | None = None,
+    university: str | None = None,
+    limit: int = 100,
+) -> dict:
+    """
+    Находит ресурсы, статус которых ухудшился между двумя запусками
+
+    Ухудшение — переход к более тяжелому статусу: OK → NEEDS_UPDATE/ERROR → MISMATCH.
+    Смена статуса той же тяжести (ERROR ↔ NEEDS_UPDATE) попадает в changed.
+
+    Args:
+        run_id: Запуск (default: последний)
+        base_run_id: С каким запуском сравнивать (default: предыдущий запуск с теми же ресурсами)
+        university: Фильтр по ВУЗу
+        limit: Максимум ресурсов в списках regressed, improved и changed (default: 100)
+
+    Returns:
+        run_id, base_run_id, regressed, improved и changed ({resource_id, university,
+        file, from, to, confidence, reasoning}), число unchanged, new, removed
+
+    Example:
+        find_regressions(university="hse")
+    """
+    try:
+        result = await asyncio.to_thread(results_store.regressions, run_id, base_run_id, university)
+        return {
+            "status": "success",
+            **result,
+            "regressed_count": len(result["regressed"]),
+            "improved_count": len(result["improved"]),
+            "changed_count": len(result["changed"]),
+            "regressed": result["regressed"][:limit],
+            "improved": result["improved"][:limit],
+            "changed": result["changed"][:limit],
+        }
+    except ValueError as e:
+        logger.error(f"Некорректные параметры сравнения запусков: {e}")
+        return {"status": "error", "message": f"❌ {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка сравнения запусков: {e}")
+        return {"status": "error", "message": f"❌ Ошибка: {e}"}
+
+
+@app.tool()
+async def get_server_stats() -> dict:
+    """
+    Возвращает статистику работы сервиса (кэши, счетчики)
+
+    Returns:
+        Статистика кэша разобранных JSON файлов, индексов ID и запросов, HTTP кэша,
+        планировщика запросов по хостам, пула разбора HTML и кэша проверки ссылок
+
+    Example:
+        get_server_stats()
+    """
+    try:
+        # Запросы SQLite и блокировки индексов и журнала — вне event loop
+        stats = await asyncio.to_thread(
+            lambda: {
+                "json_cache": json_handler.cache_stats(),
+                "id_index": json_handler.id_index.stats(),
+                "query_index": resource_query.stats(),
+                "http_cache": http_cache.stats(),
+                "hosts": scraper.scheduler.stats(),
+                "parse_pool": parse_executor.stats(),
+                "journal": journal.stats(),
+                "validation_state": validation_state.stats(),
+                "results_store": results_store.stats(),
+                "schema_cache": schema_cache.stats(),
+                "link_cache": link_cache.stats(),
+            }
+        )
+        return {"status": "success", **stats}
+    except Exception as e:
+        logger.error(f"Ошибка получения статистики: {e}")
         return {"status": "error", "message": f"❌ Ошибка: {e}"}
 
 
@@ -373,11 +1990,35 @@ if __name__ == "__main__":
     logger.info("Инструменты доступны в Claude Code:")
     logger.info("  - read_json_file")
     logger.info("  - fetch_webpage")
+    logger.info("  - fetch_webpages")
     logger.info("  - batch_get_resources")
     logger.info("  - update_json_file")
+    logger.info("  - patch_resources")
+    logger.info("  - queue_resource_patches")
+    logger.info("  - flush_journal")
     logger.info("  - save_validation_report")
+    logger.info("  - save_validation_reports")
     logger.info("  - list_resources")
     logger.info("  - get_resource_by_id")
+    logger.info("  - find_resource_files")
+    logger.info("  - query_resources")
     logger.info("  - extract_key_info")
-
+    logger.info("  - extract_key_info_batch")
+    logger.info("  - prescreen_resources")
+    logger.info("  - check_resource_dates")
+    logger.info("  - validate_changed")
+    logger.info("  - validate_all_structures")
+    logger.info("  - find_duplicates")
+    logger.info("  - merge_duplicates")
+    logger.info("  - merge_resource_files")
+    logger.info("  - check_links")
+    logger.info("  - build_data_bundle")
+    logger.info("  - list_validation_runs")
+    logger.info("  - aggregate_results")
+    logger.info("  - results_trend")
+    logger.info("  - find_regressions")
+    logger.info("  - get_server_stats")
+
+    # Применяем записи журнала, незафиксированные до сбоя, до приема запросов
+    journal.start()
     app.run()
@@ -0,0 +1,179 @@
+# mcp/tests/test_change_journal.py
+
+"""
+Тесты журнала изменений: повторное применение после сбоя, отметка
+"applying" с хэшем файла и частичные ошибки сброса
+"""
+
+import hashlib
+import json
+import threading
+
+import pytest
+
+from utils.change_journal import ChangeJournal
+from utils.json_handler import JSONHandler
+
+TARGET = "universities/u/olympiads.json"
+
+
+def _resource(resource_id: str, **fields) -> dict:
+    return {
+        "id": resource_id,
+        "name": f"Ресурс {resource_id}",
+        "description": "Описание",
+        "website": "https://example.com",
+        "type": "олимпиада",
+        **fields,
+    }
+
+
+@pytest.fixture
+def handler(tmp_path):
+    path = tmp_path / "data" / TARGET
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps([_resource("r0", subjects=["математика"]), _resource("r1")]), encoding="utf-8")
+    return JSONHandler(str(tmp_path / "data"))
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / "journal" / "changes.jsonl"
+
+
+def _journal(handler, journal_path) -> ChangeJournal:
+    return ChangeJournal(str(journal_path), handler, max_pending=1000, flush_interval=60)
+
+
+def _write_lines(path, records) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records), encoding="utf-8")
+
+
+def _file_hash(handler) -> str:
+    return hashlib.sha256((handler.data_dir / TARGET).read_bytes()).hexdigest()
+
+
+def _read(handler) -> dict:
+    return {resource["id"]: resource for resource in handler.read_file(TARGET)}
+
+
+ADD_SUBJECT = {"id": "r0", "ops": [{"op": "add", "path": "/subjects/-", "value": "физика"}]}
+
+
+def test_replay_applies_uncommitted_entries(handler, journal_path):
+    _write_lines(
+        journal_path,
+        [
+            {"seq": 1, "file": TARGET, "patches": [{"id": "r0", "merge": {"name": "Первый"}}], "ts": 0},
+            {"seq": 2, "file": TARGET, "patches": [{"id": "r1", "merge": {"name": "Второй"}}], "ts": 0},
+            {"committed": [1]},
+        ],
+    )
+    journal = _journal(handler, journal_path)
+    journal.start()
+
+    resources = _read(handler)
+    assert resources["r0"]["name"] == "Ресурс r0"
+    assert resources["r1"]["name"] == "Второй"
+    assert journal.pending_count() == 0
+    assert journal_path.stat().st_size == 0
+    journal.close()
+
+
+def test_replay_skips_batch_already_written_before_crash(handler, journal_path):
+    before = _file_hash(handler)
+    # Сбой после записи файла, но до отметки committed
+    handler.patch_file(TARGET, [ADD_SUBJECT])
+    _write_lines(
+        journal_path,
+        [
+            {"seq": 1, "file": TARGET, "patches": [ADD_SUBJECT], "ts": 0},
+            {"applying": [1], "file": TARGET, "before": before},
+        ],
+    )
+    journal = _journal(handler, journal_path)
+    journal.start()
+
+    assert _read(handler)["r0"]["subjects"] == ["математика", "физика"]
+    assert journal.pending_count() == 0
+    journal.close()
+
+
+def test_replay_reapplies_batch_when_file_unchanged(handler, journal_path):
+    # Сбой после отметки applying, но до записи файла
+    _write_lines(
+        journal_path,
+        [
+            {"seq": 1, "file": TARGET, "patches": [ADD_SUBJECT], "ts": 0},
+            {"applying": [1], "file": TARGET, "before": _file_hash(handler)},
+        ],
+    )
+    journal = _journal(handler, journal_path)
+    journal.start()
+
+    assert _read(handler)["r0"]["subjects"] == ["математика", "физика"]
+    journal.close()
+
+
+def test_flush_reports_failed_patch_and_applies_the_rest(handler, journal_path):
+    journal = _journal(handler, journal_path)
+    journal.append(TARGET, [{"id": "r0", "merge": {"name": "FIXED"}}, {"id": "missing", "merge": {"name": "x"}}])
+
+    summary = journal.flush()
+
+    assert summary["applied"] == 1
+    assert summary["failed"] == 1
+    assert summary["errors"][0]["id"] == "missing"
+    assert _read(handler)["r0"]["name"] == "FIXED"
+    assert journal.pending_count() == 0
+    journal.close()
+
+
+def test_append_rejects_patch_without_scalar_id(handler, journal_path):
+    journal = _journal(handler, journal_path)
+    with pytest.raises(ValueError):
+        journal.append(TARGET, [{"id": "r0", "merge": {"name": "FIXED"}}, {"id": {"bad": 1}, "merge": {}}])
+    assert journal.pending_count() == 0
+    journal.close()
+
+
+def test_file_level_failure_moves_entries_to_dead_letter(handler, journal_path):
+    journal = _journal(handler, journal_path)
+    patch = {"id": "r0", "merge": {"name": "FIXED"}}
+    journal.append(TARGET, [patch])
+    (handler.data_dir / TARGET).write_text("[{", encoding="utf-8")
+
+    summary = journal.flush()
+
+    assert summary["failed"] == 1
+    assert journal.pending_count() == 0
+    dead = [json.loads(line) for line in journal.dead_letter_path.read_text(encoding="utf-8").splitlines()]
+    assert [entry["patches"] for entry in dead] == [[patch]]
+    assert dead[0]["file"] == TARGET
+    assert journal.stats()["dead_lettered"] == 1
+    journal.close()
+
+
+def test_pending_count_does_not_wait_for_flush(handler, journal_path):
+    journal = _journal(handler, journal_path)
+    journal.append(TARGET, [{"id": "r0", "merge": {"name": "FIXED"}}])
+
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with journal._lock:
+            locked.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    try:
+        locked.wait(5)
+        assert journal.pending_count() == 1
+        assert journal.pending_count(TARGET) == 1
+    finally:
+        release.set()
+        thread.join()
+    journal.close()
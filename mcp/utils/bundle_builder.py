@@ -0,0 +1,355 @@
+# mcp/utils/bundle_builder.py
+
+"""
+Модуль сборки агрегированного бандла данных для сайта
+
+Вместо отдельного запроса на каждый файл категории каждого ВУЗа сайт
+загружает один файл на ВУЗ (bundle/<id>.json) или один общий файл
+(bundle/all.json). В бандл попадают только поля, которые отображают
+карточки и использует фильтрация, плюс заранее вычисленные ключи:
+    _sort — ключ сортировки по названию
+    _event — дата события (ISO) для фильтра «ближайшие»
+    _registration — [начало, конец] регистрации (ISO) или null
+Рядом лежат сжатые копии .json.gz для серверов с отдачей
+предварительно сжатых файлов. Пересобираются только ВУЗы, исходные
+файлы которых изменились (manifest.json хранит их размер и mtime).
+Сайт не использует бандл, если data/index.json новее отметки
+index_mtime в manifest.json (бандл не пересобран после правки данных).
+
+Использование (из папки mcp):
+    python3 -m utils.bundle_builder [--force]
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Версия формата бандла: при изменении все файлы пересобираются
+BUNDLE_VERSION = 3
+
+# Файлы категорий ВУЗа в порядке js/data-loader.js
+CATEGORIES = (
+    "olympiads",
+    "courses",
+    "schools",
+    "summerPrograms",
+    "practicalEvents",
+    "infoEvents",
+    "educationalEvents",
+    "onlineResources",
+)
+
+# Поля ресурса, которые используют js/resource-cards.js, js/filters.js и js/modal.js
+CARD_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "type",
+    "format",
+    "targetAudience",
+    "subjects",
+    "profiles",
+    "grades",
+    "dates",
+    "cost",
+    "benefits",
+    "website",
+)
+# Даты с подписью в карточке (renderDatesBlock) — остальные ключи dates не отображаются
+DATE_FIELDS = (
+    "registration",
+    "event",
+    "qualification",
+    "final",
+    "applicationDeadline",
+    "courses",
+    "admissions",
+    "startOfYear",
+    "program",
+)
+COST_FIELDS = ("type", "amount", "note")
+# null в льготах значим: фильтр проверяет grants !== null и tuitionDiscount !== null
+BENEFIT_FIELDS = ("bvi", "points100", "additionalPoints", "grants", "tuitionDiscount", "priority", "earlyAdmission")
+
+# Форматы дат parseDate из js/filters.js (в порядке проверки)
+_JS_DATE_FORMATS = (
+    (re.compile(r"(\d{2})\.(\d{2})\.(\d{4})"), (3, 2, 1)),
+    (re.compile(r"(\d{4})-(\d{2})-(\d{2})"), (1, 2, 3)),
+)
+
+ALL_BUNDLE = "all.json"
+MANIFEST = "manifest.json"
+
+
+def sort_key(name: Any) -> str:
+    """Ключ сортировки по названию: нижний регистр, ё -> е"""
+    return str(name or "").lower().replace("ё", "е")
+
+
+def parse_js_date(text: str) -> date | None:
+    """
+    Первая дата строки так же, как parseDate в js/filters.js: ДД.ММ.ГГГГ,
+    затем ГГГГ-ММ-ДД; день и месяц вне диапазона переносятся, как в new Date()
+    """
+    for regex, (year_group, month_group, day_group) in _JS_DATE_FORMATS:
+        match = regex.search(text)
+        if match:
+            year, month, day = (int(match.group(group)) for group in (year_group, month_group, day_group))
+            first = date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+            try:
+                return first + timedelta(days=day - 1)
+            except OverflowError:
+                return None
+    return None
+
+
+def event_date(resource: dict[str, Any]) -> str | None:
+    """
+    Дата события ресурса в ISO формате (как getEventDate в js/filters.js)
+
+    Для ресурсов с type "olympiad" — dates.final, для остальных (и если
+    final нет) — первое слово dates.event или dates.program. Дата, которую
+    parseDate не разбирает, дает None: фильтр «ближайшие» пропускает такой
+    ресурс и без бандла.
+    """
+    dates = resource.get("dates")
+    if not isinstance(dates, dict):
+        return None
+    if resource.get("type") == "olympiad" and isinstance(dates.get("final"), str) and dates["final"]:
+        value = dates["final"]
+    else:
+        texts = [dates[key] for key in ("event", "program") if isinstance(dates.get(key), str) and dates[key]]
+        value = texts[0].split(" ")[0] if texts else None
+    parsed = parse_js_date(value) if value else None
+    return parsed.isoformat() if parsed else None
+
+
+def registration_range(dates: Any) -> list[str] | None:
+    """Интервал регистрации "начало - конец" в ISO (как isRegistrationActive в js/filters.js)"""
+    value = dates.get("registration") if isinstance(dates, dict) else None
+    if not isinstance(value, str):
+        return None
+    parts = value.split(" - ")
+    if len(parts) < 2:
+        return None
+    start, end = parse_js_date(parts[0]), parse_js_date(parts[1])
+    return [start.isoformat(), end.isoformat()] if start and end else None
+
+
+def compact_resource(resource: dict[str, Any]) -> dict[str, Any]:
+    """Ресурс для бандла: поля карточки и вычисленные ключи _sort, _event, _registration"""
+    result = {field: resource[field] for field in CARD_FIELDS if field in resource}
+    if isinstance(result.get("dates"), dict):
+        result["dates"] = {key: value for key, value in result["dates"].items() if key in DATE_FIELDS}
+    if isinstance(result.get("cost"), dict):
+        result["cost"] = {key: value for key, value in result["cost"].items() if key in COST_FIELDS}
+    if isinstance(result.get("benefits"), dict):
+        result["benefits"] = {key: value for key, value in result["benefits"].items() if key in BENEFIT_FIELDS}
+    result["_sort"] = sort_key(resource.get("name"))
+    result["_event"] = event_date(resource)
+    result["_registration"] = registration_range(resource.get("dates"))
+    return result
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(payload)
+    tmp.replace(path)
+
+
+def _file_signature(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class BundleBuilder:
+    """
+    Инкрементальная сборка бандла data/ -> bundle/
+
+    manifest.json хранит для каждого ВУЗа сигнатуры исходных файлов
+    (mtime_ns, размер); ВУЗ пересобирается, если изменилась сигнатура,
+    версия формата или пропал файл бандла. all.json собирается из
+    бандлов ВУЗов и пересобирается, только если изменился хотя бы один
+    из них или data/index.json. index_mtime в manifest.json — время
+    изменения data/index.json в секундах: сайт сравнивает его с
+    Last-Modified файла и при более новом index.json грузит data/.
+    """
+
+    def __init__(self, data_dir: str, output_dir: str):
+        self.data_dir = Path(data_dir)
+        self.output_dir = Path(output_dir)
+
+    def _load_manifest(self) -> dict[str, Any]:
+        try:
+            manifest = json.loads((self.output_dir / MANIFEST).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return manifest if manifest.get("version") == BUNDLE_VERSION else {}
+
+    def _sources(self, university: str) -> dict[str, list[int] | None]:
+        base = self.data_dir / "universities" / university
+        return {f"{category}.json": _file_signature(base / f"{category}.json") for category in CATEGORIES}
+
+    def _outputs_exist(self, name: str) -> bool:
+        return (self.output_dir / name).exists() and (self.output_dir / f"{name}.gz").exists()
+
+    def _write(self, name: str, value: Any) -> dict[str, Any]:
+        """Записывает name и name.gz; возвращает размеры и sha256 несжатого файла"""
+        payload = _dumps(value)
+        # mtime=0 — одинаковые данные дают побайтно одинаковый .gz
+        compressed = gzip.compress(payload, compresslevel=9, mtime=0)
+        _write_atomic(self.output_dir / name, payload)
+        _write_atomic(self.output_dir / f"{name}.gz", compressed)
+        return {"bytes": len(payload), "gzip_bytes": len(compressed), "sha256": hashlib.sha256(payload).hexdigest()}
+
+    def compile_university(self, university: str) -> dict[str, list[dict[str, Any]]]:
+        """
+        Ресурсы ВУЗа по категориям в формате бандла
+
+        Raises:
+            json.JSONDecodeError: Если исходный файл содержит некорректный JSON
+            ValueError: Если исходный файл не является массивом ресурсов
+        """
+        base = self.data_dir / "universities" / university
+        resources = {}
+        for category in CATEGORIES:
+            path = base / f"{category}.json"
+            items = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+            if not isinstance(items, list):
+                raise ValueError(f"Ожидается массив ресурсов: {path.relative_to(self.data_dir).as_posix()}")
+            resources[category] = [compact_resource(item) for item in items if isinstance(item, dict)]
+        return resources
+
+    def build(self, force: bool = False) -> dict[str, Any]:
+        """
+        Собирает бандл, пересобирая только изменившиеся ВУЗы
+
+        Args:
+            force: Пересобрать все файлы независимо от manifest.json
+
+        Returns:
+            {"output", "universities", "rebuilt", "removed", "all_rebuilt",
+            "resources", "bytes", "gzip_bytes"}
+
+        Raises:
+            FileNotFoundError: Если нет data/index.json
+            json.JSONDecodeError: Если исходный файл содержит некорректный JSON
+            ValueError: Если исходный файл не является массивом ресурсов
+        """
+        index_path = self.data_dir / "index.json"
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        previous = {} if force else self._load_manifest()
+        old_entries = previous.get("universities", {})
+        universities = sorted(
+            path.name
+            for path in (self.data_dir / "universities").iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+
+        entries: dict[str, Any] = {}
+        compiled: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        rebuilt = []
+        for university in universities:
+            sources = self._sources(university)
+            old = old_entries.get(university)
+            name = f"{university}.json"
+            if old and old.get("sources") == sources and self._outputs_exist(name):
+                entries[university] = old
+                continue
+            resources = self.compile_university(university)
+            stats = self._write(name, {"version": BUNDLE_VERSION, "university": university, "resources": resources})
+            entries[university] = {
+                "sources": sources,
+                "resources": sum(len(items) for items in resources.values()),
+                **stats,
+            }
+            compiled[university] = resources
+            rebuilt.append(university)
+
+        removed = []
+        for university in sorted(set(old_entries) - set(entries)):
+            for suffix in ("", ".gz"):
+                (self.output_dir / f"{university}.json{suffix}").unlink(missing_ok=True)
+            removed.append(university)
+
+        index_signature = _file_signature(index_path)
+        all_entry = previous.get("all")
+        all_rebuilt = bool(
+            rebuilt
+            or removed
+            or not all_entry
+            or all_entry.get("index") != index_signature
+            or not self._outputs_exist(ALL_BUNDLE)
+        )
+        if all_rebuilt:
+            resources = {}
+            for university in universities:
+                if university not in compiled:
+                    bundle = json.loads((self.output_dir / f"{university}.json").read_text(encoding="utf-8"))
+                    compiled[university] = bundle["resources"]
+                resources[university] = compiled[university]
+            all_bundle = {
+                "version": BUNDLE_VERSION,
+                "universities": index.get("universities", []),
+                "resources": resources,
+            }
+            all_entry = {"index": index_signature, **self._write(ALL_BUNDLE, all_bundle)}
+
+        if rebuilt or removed or all_rebuilt:
+            manifest = {
+                "version": BUNDLE_VERSION,
+                "index_mtime": index_signature[0] // 1_000_000_000,
+                "universities": entries,
+                "all": all_entry,
+            }
+            payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+            _write_atomic(self.output_dir / MANIFEST, payload)
+
+        result = {
+            "output": str(self.output_dir),
+            "universities": len(entries),
+            "rebuilt": rebuilt,
+            "removed": removed,
+            "all_rebuilt": all_rebuilt,
+            "resources": sum(entry["resources"] for entry in entries.values()),
+            "bytes": all_entry["bytes"],
+            "gzip_bytes": all_entry["gzip_bytes"],
+        }
+        logger.info(
+            f"✅ Бандл данных: пересобрано {len(rebuilt)} из {len(entries)} ВУЗов, "
+            f"all.json {'обновлен' if all_rebuilt else 'без изменений'}"
+        )
+        return result
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parent.parent.parent
+    builder = BundleBuilder(str(project_root / "data"), str(project_root / "bundle"))
+    result = builder.build(force="--force" in sys.argv[1:])
+    print(f"Бандл: {result['output']}")
+    print(f"  ВУЗов: {result['universities']}, ресурсов: {result['resources']}")
+    print(f"  Пересобрано: {', '.join(result['rebuilt']) or 'нет'}")
+    if result["removed"]:
+        print(f"  Удалено: {', '.join(result['removed'])}")
+    print(f"  all.json: {result['bytes'] / 1024:.1f} КБ, gzip {result['gzip_bytes'] / 1024:.1f} КБ")
+
+
+if __name__ == "__main__":
+    main()
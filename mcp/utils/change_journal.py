@@ -0,0 +1,349 @@
+# mcp/utils/change_journal.py
+
+"""
+Модуль журнала изменений (write-ahead log) для групповой записи патчей в data/
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from .json_handler import is_resource_id
+
+logger = logging.getLogger(__name__)
+
+# Сбрасывать журнал, когда накопилось столько патчей
+DEFAULT_MAX_PENDING = 200
+# ... или когда самому старому патчу столько секунд
+DEFAULT_FLUSH_INTERVAL = 2.0
+# Сколько последних ошибок применения хранить для flush_journal/get_server_stats
+MAX_FAILURES = 100
+
+
+class ChangeJournal:
+    """
+    Журнал изменений ресурсов с групповой записью
+
+    Патчи (формат JSONHandler.patch_file) сразу дописываются в журнал
+    JSON Lines с fsync и считаются сохраненными. В JSON файлы они
+    переносятся группами — по числу накопленных патчей или по таймеру:
+    все патчи одного файла применяются одной записью. После сброса
+    файла в журнал пишется отметка "committed"; когда ожидающих патчей
+    не остается, журнал обрезается. При первом обращении (start)
+    незафиксированные записи применяются повторно (replay).
+
+    Патчи ops и delete не идемпотентны, поэтому перед записью файла в
+    журнал пишется отметка "applying" с хэшем файла до записи. Если сбой
+    произошел между записью файла и отметкой "committed", при replay
+    файл с изменившимся хэшем считается уже записанным и патчи повторно
+    не применяются. Изменения файла в обход журнала в этом коротком
+    окне не различаются с записью журнала.
+
+    Если файл не удалось прочитать или записать целиком (удален, JSON
+    поврежден), его записи переносятся в <журнал>.failed.jsonl и только
+    потом фиксируются — патчи не теряются и их можно применить вручную.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        json_handler: Any,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.json_handler = json_handler
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+
+        self.dead_letter_path = self.path.with_name(f"{self.path.stem}.failed.jsonl")
+
+        self._lock = threading.RLock()
+        # Число ожидающих патчей по файлам читается без self._lock: сброс держит
+        # его на время записи файлов, а pending_count вызывается из event loop
+        self._counts_lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._timer: threading.Timer | None = None
+        # Ожидающие записи: {"seq", "file", "patches", "ts"}
+        self._pending: list[dict[str, Any]] = []
+        self._seq = 0
+
+        self.appended = 0
+        self.flushes = 0
+        self.files_written = 0
+        self.dead_lettered = 0
+        self.failures: deque[dict[str, Any]] = deque(maxlen=MAX_FAILURES)
+
+        # Журнал открывается при первом обращении, а не при импорте сервера
+        self._file: Any = None
+
+    def start(self) -> None:
+        """Открывает журнал и применяет незафиксированные записи (повторный вызов ничего не делает)"""
+        with self._lock:
+            if self._file is not None:
+                return
+            resolved = self.replay()
+            self._file = self.path.open("a", encoding="utf-8")
+            atexit.register(self.close)
+            if resolved:
+                self._write_line({"committed": sorted(resolved)})
+
+            if self._pending:
+                logger.info(f"Журнал: найдено {self.pending_count()} незафиксированных патчей, применяем")
+                self.flush()
+
+    def _recount(self) -> None:
+        """Пересчитывает число ожидающих патчей по файлам (вызывать под self._lock)"""
+        counts: dict[str, int] = {}
+        for entry in self._pending:
+            counts[entry["file"]] = counts.get(entry["file"], 0) + len(entry["patches"])
+        with self._counts_lock:
+            self._counts = counts
+
+    def _key(self, filepath: str) -> str:
+        """Нормализует путь файла, чтобы "hse/a.json" и "./hse/a.json" попадали в одну группу"""
+        return self.json_handler.relative_path(filepath) or filepath
+
+    def _write_line(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _file_hash(self, target: str) -> str | None:
+        """Хэш содержимого файла данных (None — файла нет)"""
+        try:
+            return hashlib.sha256((self.json_handler.data_dir / target).read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def replay(self) -> set[int]:
+        """
+        Загружает из файла журнала записи без отметки committed
+
+        Returns:
+            Номера записей, которые уже попали в файл до сбоя (отметка
+            "applying" есть, а хэш файла изменился) — их нужно зафиксировать
+        """
+        if not self.path.exists():
+            return set()
+
+        entries: dict[int, dict[str, Any]] = {}
+        committed: set[int] = set()
+        applying: dict[int, dict[str, Any]] = {}
+        with self.path.open(encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Недописанная строка при сбое во время добавления
+                    logger.warning(f"Журнал: пропущена поврежденная строка {line_no}")
+                    continue
+                if "committed" in record:
+                    committed.update(record["committed"])
+                elif "applying" in record:
+                    applying.update(dict.fromkeys(record["applying"], record))
+                else:
+                    entries[record["seq"]] = record
+
+        resolved: set[int] = set()
+        hashes: dict[str, str | None] = {}
+        for seq, record in applying.items():
+            if seq in committed or seq not in entries:
+                continue
+            if record["file"] not in hashes:
+                hashes[record["file"]] = self._file_hash(record["file"])
+            if hashes[record["file"]] != record["before"]:
+                resolved.add(seq)
+        if resolved:
+            logger.info(f"Журнал: {len(resolved)} записей уже применены до сбоя, повторно не применяем")
+
+        done = committed | resolved
+        self._pending = [entries[seq] for seq in sorted(entries) if seq not in done]
+        self._recount()
+        self._seq = max([*entries, *committed], default=0)
+        return resolved
+
+    def append(self, filepath: str, patches: list[dict[str, Any]]) -> int:
+        """
+        Записывает патчи файла в журнал
+
+        Args:
+            filepath: Путь к файлу относительно data_dir
+            patches: Патчи в формате JSONHandler.patch_file
+
+        Returns:
+            Номер записи в журнале
+
+        Raises:
+            ValueError: Если патч не объект или его id не строка и не число
+        """
+        for patch in patches:
+            if not isinstance(patch, dict) or not is_resource_id(patch.get("id")):
+                raise ValueError(f"Патч должен быть объектом с id (строка или число): {patch}")
+
+        with self._lock:
+            self.start()
+            self._seq += 1
+            entry = {"seq": self._seq, "file": self._key(filepath), "patches": patches, "ts": time.time()}
+            self._write_line(entry)
+            self._pending.append(entry)
+            with self._counts_lock:
+                self._counts[entry["file"]] = self._counts.get(entry["file"], 0) + len(patches)
+            self.appended += len(patches)
+
+            if self.pending_count() >= self.max_pending:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+            return entry["seq"]
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Журнал: ошибка фонового сброса: {e}")
+
+    def flush(self, filepath: str | None = None) -> dict[str, Any]:
+        """
+        Переносит ожидающие патчи в JSON файлы
+
+        Args:
+            filepath: Сбросить только патчи этого файла (None — все)
+
+        Returns:
+            {"files", "applied", "failed", "errors"}
+        """
+        with self._lock:
+            self.start()
+            key = None if filepath is None else self._key(filepath)
+            selected = [e for e in self._pending if key is None or e["file"] == key]
+            summary: dict[str, Any] = {"files": 0, "applied": 0, "failed": 0, "errors": []}
+            if not selected:
+                return summary
+
+            if key is None and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            by_file: dict[str, list[dict[str, Any]]] = {}
+            for entry in selected:
+                by_file.setdefault(entry["file"], []).append(entry)
+
+            for target, entries in by_file.items():
+                patches = [patch for entry in entries for patch in entry["patches"]]
+                seqs = {entry["seq"] for entry in entries}
+                try:
+                    with self.json_handler.lock_for(target):
+                        self._write_line({"applying": sorted(seqs), "file": target, "before": self._file_hash(target)})
+                        outcome = self.json_handler.patch_file(target, patches)
+                    results = outcome["results"]
+                    if outcome["written"]:
+                        self.files_written += 1
+                except Exception as e:
+                    # Повтор не поможет (файл удален, JSON поврежден): записи уходят в
+                    # отдельный файл, чтобы не блокировать журнал и не потерять патчи
+                    logger.error(f"Журнал: не удалось применить патчи к {target}: {e}")
+                    self._dead_letter(entries, str(e))
+                    results = [
+                        {"id": p.get("id") if isinstance(p, dict) else None, "status": "error", "message": str(e)}
+                        for p in patches
+                    ]
+
+                for result in results:
+                    if result["status"] == "success":
+                        summary["applied"] += 1
+                    else:
+                        error = {"file": target, **result}
+                        summary["failed"] += 1
+                        summary["errors"].append(error)
+                        self.failures.append(error)
+                summary["files"] += 1
+
+                self._write_line({"committed": sorted(seqs)})
+                self._pending = [e for e in self._pending if e["seq"] not in seqs]
+                self._recount()
+
+            if not self._pending:
+                self._file.truncate(0)
+                self._file.seek(0)
+                os.fsync(self._file.fileno())
+
+            self.flushes += 1
+            logger.info(
+                f"✅ Журнал сброшен: {summary['files']} файлов, применено {summary['applied']}, "
+                f"ошибок {summary['failed']}"
+            )
+            return summary
+
+    def _dead_letter(self, entries: list[dict[str, Any]], error: str) -> None:
+        """Дописывает записи, которые не удалось применить, в файл непримененных патчей"""
+        failed_at = time.time()
+        with self.dead_letter_path.open("a", encoding="utf-8") as f:
+            for entry in entries:
+                record = {**entry, "error": error, "failed_at": failed_at}
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.dead_lettered += sum(len(entry["patches"]) for entry in entries)
+        logger.warning(f"Журнал: {len(entries)} записей перенесены в {self.dead_letter_path}")
+
+    def pending_count(self, filepath: str | None = None) -> int:
+        """
+        Возвращает число ожидающих патчей (всех или одного файла)
+
+        Не ждет идущий сброс журнала, поэтому его можно вызывать из event loop.
+        """
+        if self._file is None:
+            self.start()
+        key = None if filepath is None else self._key(filepath)
+        with self._counts_lock:
+            if key is None:
+                return sum(self._counts.values())
+            return self._counts.get(key, 0)
+
+    def close(self) -> None:
+        """Сбрасывает ожидающие патчи и закрывает журнал"""
+        with self._lock:
+            if self._file is None or self._file.closed:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            try:
+                self.flush()
+            finally:
+                self._file.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает счетчики журнала"""
+        with self._lock:
+            self.start()
+            oldest = min((e["ts"] for e in self._pending), default=None)
+            return {
+                "pending_patches": self.pending_count(),
+                "pending_files": len({e["file"] for e in self._pending}),
+                "oldest_pending_seconds": round(time.time() - oldest, 3) if oldest is not None else None,
+                "appended": self.appended,
+                "flushes": self.flushes,
+                "files_written": self.files_written,
+                "failures": len(self.failures),
+                "dead_lettered": self.dead_lettered,
+                "journal_bytes": self.path.stat().st_size if self.path.exists() else 0,
+                "max_pending": self.max_pending,
+                "flush_interval": self.flush_interval,
+            }
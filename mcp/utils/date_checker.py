@@ -0,0 +1,159 @@
+# mcp/utils/date_checker.py
+
+"""
+Модуль проверки дат ресурсов по тексту их страниц
+"""
+
+import logging
+from datetime import date
+from typing import Any
+
+from .dates import parse_date_range
+from .key_info import extract_key_info
+
+logger = logging.getLogger(__name__)
+
+# Уверенность проверки по видам результата
+CONFIDENCE_CONFIRMED = 1.0
+CONFIDENCE_STALE = 0.9
+CONFIDENCE_ABSENT = 0.7
+CONFIDENCE_UNVERIFIED = 0.5
+
+
+def _fmt(interval: tuple[date, date]) -> str:
+    start, end = interval
+    return start.isoformat() if start == end else f"{start.isoformat()} - {end.isoformat()}"
+
+
+class DateChecker:
+    """
+    Детерминированная проверка полей dates.* ресурса
+
+    Для каждого поля с датами (registration, event, final, program, ...)
+    проверяется, не прошел ли интервал, и встречаются ли его границы
+    среди дат на странице ресурса (включая "22 января" без года — год
+    берется из дат ресурса). Результат — запись в схеме отчета валидации
+    (resource_id, validation_status, confidence, reasoning,
+    semantic_analysis.key_discrepancies) с подробностями в date_check.
+    """
+
+    def __init__(self, today: date | None = None):
+        self.today = today or date.today()
+        # (url, год) -> даты страницы: одну страницу часто используют несколько ресурсов
+        self._page_dates: dict[tuple[str, int | None], set[date]] = {}
+
+    @staticmethod
+    def resource_intervals(resource: dict[str, Any]) -> dict[str, tuple[date, date]]:
+        """Возвращает интервалы всех разбираемых полей dates.*"""
+        dates = resource.get("dates")
+        if not isinstance(dates, dict):
+            return {}
+        intervals = {}
+        for field, value in dates.items():
+            interval = parse_date_range(value)
+            if interval is not None:
+                intervals[field] = interval
+        return intervals
+
+    def page_dates(self, url: str, text: str, years: set[int]) -> set[date]:
+        """Даты страницы; даты без года дополняются каждым из годов ресурса"""
+        found: set[date] = set()
+        for year in years or {None}:
+            key = (url, year)
+            if key not in self._page_dates:
+                self._page_dates[key] = {date.fromisoformat(d) for d in extract_key_info(text, year)["dates"]}
+            found |= self._page_dates[key]
+        return found
+
+    def check(self, resource: dict[str, Any], page: dict[str, Any] | None) -> dict[str, Any]:
+        """
+        Проверяет даты одного ресурса
+
+        Args:
+            resource: Ресурс
+            page: Результат загрузки страницы ({"url", "status", "content"} или
+                {"status": "error", "message"}); None — страница не загружалась
+
+        Returns:
+            Запись отчета валидации
+        """
+        intervals = self.resource_intervals(resource)
+        fields: dict[str, dict[str, Any]] = {}
+        discrepancies: list[str] = []
+
+        record: dict[str, Any] = {
+            "resource_id": resource.get("id", ""),
+            "was_auto_corrected": False,
+            "current_description": resource.get("description", ""),
+            "suggested_description": "",
+            "semantic_analysis": {"key_discrepancies": discrepancies},
+            "date_check": fields,
+        }
+
+        if not intervals:
+            record.update(
+                validation_status="OK",
+                confidence=CONFIDENCE_UNVERIFIED,
+                reasoning="У ресурса нет дат для проверки",
+            )
+            return record
+
+        page_ok = page is not None and page.get("status") == "success"
+        on_page: set[date] = set()
+        explicit: set[date] = set()
+        if page_ok:
+            years = {d.year for interval in intervals.values() for d in interval}
+            on_page = self.page_dates(page["url"], page.get("content", ""), years)
+            # Только даты с явным годом: "20 октября" с подставленным годом не считается новой датой
+            explicit = self.page_dates(page["url"], page.get("content", ""), set())
+
+        for field, interval in intervals.items():
+            start, end = interval
+            past = end < self.today
+            found = bool(on_page) and (start in on_page or end in on_page)
+            fields[field] = {"range": [start.isoformat(), end.isoformat()], "past": past, "on_page": found}
+            if past:
+                discrepancies.append(f"dates.{field} прошли: {_fmt(interval)}")
+            if page_ok and on_page and not found:
+                discrepancies.append(f"dates.{field} ({_fmt(interval)}) не найдены на странице")
+
+        latest = max(end for _, end in intervals.values())
+        stale = latest < self.today
+        newer = sorted(d for d in explicit if d > latest and d >= self.today)
+        if newer:
+            discrepancies.append(f"На странице есть более поздние даты: {', '.join(d.isoformat() for d in newer[:5])}")
+
+        absent = [field for field, info in fields.items() if page_ok and on_page and not info["on_page"]]
+        if stale:
+            status, confidence = "NEEDS_UPDATE", CONFIDENCE_STALE
+            reasoning = f"Все даты ресурса прошли (последняя: {latest.isoformat()})"
+        elif absent:
+            status, confidence = "NEEDS_UPDATE", CONFIDENCE_ABSENT
+            reasoning = f"Даты не найдены на странице: {', '.join(absent)}"
+        elif not page_ok:
+            status, confidence = "ERROR", 0.0
+            reasoning = f"Страница не загружена: {(page or {}).get('message', 'нет website')}"
+        elif not on_page:
+            status, confidence = "OK", CONFIDENCE_UNVERIFIED
+            reasoning = "На странице нет дат, сверить не удалось"
+        else:
+            status, confidence = "OK", CONFIDENCE_CONFIRMED
+            reasoning = "Даты актуальны и указаны на странице"
+
+        record.update(validation_status=status, confidence=confidence, reasoning=reasoning)
+        return record
+
+    def check_many(
+        self, resources: list[dict[str, Any]], pages: dict[str, dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Проверяет ресурсы по загруженным страницам
+
+        Args:
+            resources: Ресурсы
+            pages: URL -> результат загрузки (WebScraper.fetch_many)
+
+        Returns:
+            Записи отчета в порядке ресурсов
+        """
+        return [self.check(resource, pages.get(resource.get("website") or "")) for resource in resources]
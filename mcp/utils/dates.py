@@ -0,0 +1,77 @@
+# mcp/utils/dates.py
+
+"""
+Модуль разбора дат в полях ресурсов
+"""
+
+import re
+from datetime import date
+
+# 2026-01-22 или 22.01.2026
+DATE_RE = re.compile(r"\b(?:(\d{4})-(\d{2})-(\d{2})|(\d{2})\.(\d{2})\.(\d{4}))\b")
+
+
+def find_dates(text: str) -> list[date]:
+    """
+    Находит все даты в строке (ISO YYYY-MM-DD и DD.MM.YYYY)
+
+    Args:
+        text: Строка, например "2025-08-20 - 2025-10-20"
+
+    Returns:
+        Список дат в порядке появления; некорректные даты пропускаются
+    """
+    result = []
+    for match in DATE_RE.finditer(text):
+        year, month, day, day2, month2, year2 = match.groups()
+        try:
+            if year:
+                result.append(date(int(year), int(month), int(day)))
+            else:
+                result.append(date(int(year2), int(month2), int(day2)))
+        except ValueError:
+            continue
+    return result
+
+
+def parse_date_range(value: object) -> tuple[date, date] | None:
+    """
+    Разбирает значение поля dates.* в интервал
+
+    "2026-01-22" -> (22.01, 22.01); "2025-08-20 - 2025-10-20" -> (20.08, 20.10);
+    перечисление "2026-01-10, 2026-02-14" -> (10.01, 14.02). Текстовые
+    значения без дат ("постоянно", "по расписанию") дают None.
+
+    Args:
+        value: Значение поля
+
+    Returns:
+        (начало, конец) или None
+    """
+    if not isinstance(value, str):
+        return None
+    dates = find_dates(value)
+    if not dates:
+        return None
+    return (min(dates), max(dates))
+
+
+def parse_date(value: str) -> date:
+    """
+    Разбирает одну дату из аргумента инструмента
+
+    Args:
+        value: "YYYY-MM-DD", "DD.MM.YYYY" или "today"
+
+    Returns:
+        Дата
+
+    Raises:
+        ValueError: Если дату разобрать не удалось
+    """
+    if value.strip().lower() == "today":
+        return date.today()
+    dates = find_dates(value)
+    if len(dates) != 1:
+        raise ValueError(f"Некорректная дата: {value}")
+    return dates[0]
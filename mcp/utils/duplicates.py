@@ -0,0 +1,243 @@
+# mcp/utils/duplicates.py
+
+"""
+Модуль поиска дубликатов и почти-дубликатов ресурсов (MinHash + LSH)
+"""
+
+import logging
+import re
+import zlib
+from typing import Any
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from .id_index import IdIndex
+
+logger = logging.getLogger(__name__)
+
+# Число хэш-функций MinHash = BANDS * ROWS; порог LSH ~ (1 / BANDS) ** (1 / ROWS) ≈ 0.42
+BANDS = 32
+ROWS = 4
+# Длина символьных шинглов
+SHINGLE = 4
+# Простое число Мерсенна 2^31 - 1 для универсального хэширования (a * x + b) mod p
+_PRIME = np.uint64((1 << 31) - 1)
+# Корзина (полоса LSH или website) больше этого размера не дает всех пар: каждый ресурс
+# сравнивается только с MAX_BUCKET - 1 следующими, иначе шаблонные тексты дают O(n^2) пар
+MAX_BUCKET = 50
+
+DEFAULT_THRESHOLD = 0.6  # сходство Жаккара name + description
+DEFAULT_NAME_THRESHOLD = 0.5  # минимальное сходство названий любой пары дубликатов
+
+_NON_WORD_RE = re.compile(r"[^0-9a-zа-я]+")
+
+
+def normalize_text(text: str) -> str:
+    """Нижний регистр, ё -> е, знаки препинания и кавычки -> пробел"""
+    return _NON_WORD_RE.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+def normalize_website(url: str | None) -> str:
+    """
+    Нормализует ссылку для сравнения: без схемы, www, параметров и
+    завершающего слеша ("https://www.olymp.hse.ru/mmo/?utm=1" -> "olymp.hse.ru/mmo")
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip().lower())
+    host = (parts.hostname or "").removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def shingles(text: str) -> set[int]:
+    """Хэши символьных шинглов нормализованного текста"""
+    normalized = normalize_text(text)
+    if len(normalized) <= SHINGLE:
+        return {zlib.crc32(normalized.encode("utf-8"))} if normalized else set()
+    return {zlib.crc32(normalized[i : i + SHINGLE].encode("utf-8")) for i in range(len(normalized) - SHINGLE + 1)}
+
+
+def jaccard(left: set[int], right: set[int]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class _DisjointSet:
+    """Система непересекающихся множеств (union-find) для сборки кластеров"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, left: int, right: int) -> None:
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            self.parent[max(left, right)] = min(left, right)
+
+
+class DuplicateFinder:
+    """
+    Поиск кластеров почти-дубликатов среди ресурсов всех ВУЗов
+
+    Для каждого ресурса строится MinHash сигнатура по шинглам name +
+    description; сигнатура режется на BANDS полос, ресурсы с совпавшей
+    полосой становятся кандидатами (LSH) — сравниваются не все пары, а
+    только попавшие в общую корзину. Отдельная блокировка по
+    нормализованному website добавляет кандидатов с одинаковой ссылкой.
+    Кандидаты проверяются точным сходством Жаккара: дубликатом считается
+    пара с похожими названиями и похожим текстом или одинаковой ссылкой
+    (одного текста мало — описания бывают шаблонными). Пары объединяются
+    в кластеры через union-find.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        name_threshold: float = DEFAULT_NAME_THRESHOLD,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1 or not 0 < name_threshold <= 1:
+            raise ValueError("Пороги сходства должны быть в диапазоне (0, 1]")
+        self.threshold = threshold
+        self.name_threshold = name_threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=BANDS * ROWS, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=BANDS * ROWS, dtype=np.uint64)
+
+    def signature(self, features: set[int]) -> np.ndarray:
+        """MinHash сигнатура множества хэшей шинглов"""
+        if not features:
+            return np.full(BANDS * ROWS, np.iinfo(np.uint64).max, dtype=np.uint64)
+        values = np.fromiter(features, dtype=np.uint64, count=len(features)) % _PRIME
+        # a, b, x < 2^31, поэтому a * x + b < 2^63 помещается в uint64
+        hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) % _PRIME
+        return hashed.min(axis=1)
+
+    def candidates(self, signatures: np.ndarray, websites: list[str]) -> set[tuple[int, int]]:
+        """
+        Пары-кандидаты: общая LSH корзина хотя бы в одной полосе или одинаковый website
+
+        В корзине больше MAX_BUCKET ресурсов каждый ресурс образует пары только
+        с MAX_BUCKET - 1 следующими за ним: число пар растет линейно, а
+        кластер дубликатов все равно собирается через цепочку пар.
+        """
+        pairs: set[tuple[int, int]] = set()
+        buckets: list[dict[bytes, list[int]]] = [{} for _ in range(BANDS)]
+        for row, signature in enumerate(signatures):
+            for band in range(BANDS):
+                key = signature[band * ROWS : (band + 1) * ROWS].tobytes()
+                buckets[band].setdefault(key, []).append(row)
+
+        by_website: dict[str, list[int]] = {}
+        for row, website in enumerate(websites):
+            if website:
+                by_website.setdefault(website, []).append(row)
+
+        for groups in [*(band.values() for band in buckets), by_website.values()]:
+            for members in groups:
+                for i, left in enumerate(members):
+                    for right in members[i + 1 : i + MAX_BUCKET]:
+                        pairs.add((left, right))
+        return pairs
+
+    def find(self, items: list[tuple[str, dict[str, Any]]], cross_university: bool = False) -> dict[str, Any]:
+        """
+        Находит кластеры почти-дубликатов
+
+        Args:
+            items: Пары (файл относительно data, ресурс)
+            cross_university: Учитывать только пары из разных ВУЗов
+
+        Returns:
+            {"resources", "candidates", "pairs", "clusters": [{"universities",
+            "members": [{"file", "id", "name", "website"}], "pairs": [{"left",
+            "right", "score", "name_score", "same_website"}]}]}
+        """
+        texts = [f"{r.get('name') or ''} {r.get('description') or ''}" for _, r in items]
+        features = [shingles(text) for text in texts]
+        names = [shingles(str(r.get("name") or "")) for _, r in items]
+        websites = [normalize_website(r.get("website")) for _, r in items]
+        universities = [IdIndex.university_of(file) for file, _ in items]
+
+        signatures = np.vstack([self.signature(f) for f in features]) if items else np.empty((0, BANDS * ROWS))
+        candidates = self.candidates(signatures, websites)
+
+        sets = _DisjointSet(len(items))
+        matches: list[tuple[int, int, float, float, bool]] = []
+        for left, right in sorted(candidates):
+            if cross_university and universities[left] == universities[right]:
+                continue
+            score = jaccard(features[left], features[right])
+            name_score = jaccard(names[left], names[right])
+            same_website = bool(websites[left]) and websites[left] == websites[right]
+            if name_score >= self.name_threshold and (score >= self.threshold or same_website):
+                matches.append((left, right, score, name_score, same_website))
+                sets.union(left, right)
+
+        members: dict[int, list[int]] = {}
+        for left, right, *_ in matches:
+            for row in (left, right):
+                root = sets.find(row)
+                if row not in members.setdefault(root, []):
+                    members[root].append(row)
+
+        def ref(row: int) -> dict[str, Any]:
+            file, resource = items[row]
+            return {"file": file, "id": resource.get("id")}
+
+        cluster_pairs: dict[int, list[dict[str, Any]]] = {}
+        for left, right, score, name_score, same_website in matches:
+            cluster_pairs.setdefault(sets.find(left), []).append(
+                {
+                    "left": ref(left),
+                    "right": ref(right),
+                    "score": round(score, 3),
+                    "name_score": round(name_score, 3),
+                    "same_website": same_website,
+                }
+            )
+
+        clusters = []
+        for root, rows in members.items():
+            clusters.append(
+                {
+                    "universities": sorted({universities[row] or "" for row in rows}),
+                    "members": [
+                        {**ref(row), "name": items[row][1].get("name", ""), "website": items[row][1].get("website", "")}
+                        for row in sorted(rows)
+                    ],
+                    "pairs": cluster_pairs[root],
+                }
+            )
+        clusters.sort(key=lambda c: (-len(c["universities"]), -len(c["members"])))
+
+        logger.info(
+            f"Поиск дубликатов: {len(items)} ресурсов, {len(candidates)} кандидатов, "
+            f"{len(matches)} пар, {len(clusters)} кластеров"
+        )
+        return {"resources": len(items), "candidates": len(candidates), "pairs": len(matches), "clusters": clusters}
+
+
+def merge_patches(keep: dict[str, Any], drops: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """
+    Merge Patch для сохраняемого ресурса: поля, которых у него нет (или они
+    пустые), берутся из удаляемых дубликатов по порядку
+
+    Returns:
+        Патч {"id", "merge"} или None, если добавлять нечего
+    """
+    merge: dict[str, Any] = {}
+    for drop in drops:
+        for field, value in drop.items():
+            if field == "id" or value in (None, "", [], {}):
+                continue
+            if keep.get(field) in (None, "", [], {}) and field not in merge:
+                merge[field] = value
+    return {"id": keep["id"], "merge": merge} if merge else None
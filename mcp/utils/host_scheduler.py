@@ -0,0 +1,214 @@
+# mcp/utils/host_scheduler.py
+
+"""
+Модуль планировщика запросов по хостам (вежливый скрапинг)
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class HostUnavailableError(Exception):
+    """Хост временно исключен из обхода (разомкнут предохранитель или долгий Retry-After)"""
+
+
+def host_key(url: str) -> str:
+    """
+    Возвращает ключ хоста для планировщика
+
+    Поддомены объединяются по двум последним меткам (dod.hse.ru и
+    olymp.hse.ru -> hse.ru), т.к. обычно обслуживаются одним сервером.
+    IP-адреса используются как есть.
+    """
+    hostname = (urlsplit(url).hostname or "").lower()
+    labels = hostname.split(".")
+    if len(labels) <= 2 or labels[-1].isdigit():
+        return hostname
+    return ".".join(labels[-2:])
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Разбирает заголовок Retry-After
+
+    Args:
+        value: Число секунд или HTTP-дата
+
+    Returns:
+        Задержка в секундах или None, если заголовок отсутствует/некорректен
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return max(0.0, (moment - datetime.now(UTC)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Экспоненциальная задержка с полным джиттером: U(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * 2**attempt))  # noqa: S311
+
+
+class _HostState:
+    """Состояние одного хоста: корзина токенов и предохранитель"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.opened_until = 0.0
+        # Срок пробного запроса полуоткрытого предохранителя (0 — пробы нет)
+        self.probing_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+
+
+class HostScheduler:
+    """
+    Планировщик запросов с корзиной токенов на каждый хост
+
+    Скорость хоста адаптивна (AIMD): при 429/503 она уменьшается вдвое,
+    при успешных ответах медленно растет до исходной. Retry-After
+    блокирует хост на указанное время. После failure_threshold ошибок
+    подряд предохранитель размыкается на reset_timeout секунд, затем
+    пропускается один пробный запрос. Проба, о результате которой не
+    сообщили (запрос отменен или упал с непредусмотренной ошибкой),
+    истекает через reset_timeout, и хост получает следующую.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: float = 4.0,
+        min_rate: float = 0.1,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+    ):
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: dict[str, _HostState] = {}
+
+    def _state(self, url: str) -> _HostState:
+        key = host_key(url)
+        if key not in self._hosts:
+            self._hosts[key] = _HostState(self.max_rate, self.burst)
+        return self._hosts[key]
+
+    async def acquire(self, url: str, max_wait: float | None = None) -> None:
+        """
+        Ожидает разрешения на запрос к хосту
+
+        Args:
+            url: URL запроса
+            max_wait: Максимальное ожидание из-за Retry-After (секунды)
+
+        Raises:
+            HostUnavailableError: Если предохранитель разомкнут или ждать дольше max_wait
+        """
+        state = self._state(url)
+        now = time.monotonic()
+
+        probe = False
+        if state.opened_until:
+            if now < state.opened_until or now < state.probing_until:
+                raise HostUnavailableError(f"Хост {host_key(url)} временно отключен после {state.failures} ошибок")
+            # Полуоткрытое состояние: пропускаем один пробный запрос
+            state.probing_until = now + self.reset_timeout
+            probe = True
+
+        try:
+            if max_wait is not None and state.blocked_until - now > max_wait:
+                raise HostUnavailableError(
+                    f"Хост {host_key(url)} просит подождать {state.blocked_until - now:.0f} с (Retry-After)"
+                )
+
+            while True:
+                now = time.monotonic()
+                state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+                state.updated_at = now
+
+                wait = state.blocked_until - now
+                if state.tokens < 1:
+                    wait = max(wait, (1 - state.tokens) / state.rate)
+
+                if wait <= 0:
+                    state.tokens -= 1
+                    state.requests += 1
+                    return
+
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Проба не началась (Retry-After дольше max_wait или отмена) — отдаем ее следующему
+            if probe:
+                state.probing_until = 0.0
+            raise
+
+    def record_success(self, url: str) -> None:
+        """Отмечает успешный ответ хоста"""
+        state = self._state(url)
+        state.failures = 0
+        state.opened_until = 0.0
+        state.probing_until = 0.0
+        state.rate = min(self.max_rate, state.rate + self.max_rate / 10)
+
+    def record_failure(self, url: str, retry_after: float | None = None, throttled: bool = False) -> None:
+        """
+        Отмечает ошибку хоста
+
+        Args:
+            url: URL запроса
+            retry_after: Задержка из заголовка Retry-After (секунды)
+            throttled: Хост ограничивает частоту запросов (429/503)
+        """
+        state = self._state(url)
+        now = time.monotonic()
+        state.failures += 1
+        state.probing_until = 0.0
+
+        if throttled:
+            state.throttled += 1
+            state.rate = max(self.min_rate, state.rate / 2)
+        if retry_after is not None:
+            state.blocked_until = max(state.blocked_until, now + retry_after)
+
+        if state.failures >= self.failure_threshold or state.opened_until:
+            state.opened_until = now + self.reset_timeout
+            logger.warning(f"Хост {host_key(url)} отключен на {self.reset_timeout:.0f} с после {state.failures} ошибок")
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает состояние хостов"""
+        now = time.monotonic()
+        return {
+            "hosts": len(self._hosts),
+            "open_circuits": sorted(key for key, state in self._hosts.items() if state.opened_until > now),
+            "per_host": {
+                key: {
+                    "rate": round(state.rate, 3),
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                    "failures": state.failures,
+                    "blocked_for": round(max(0.0, state.blocked_until - now), 1),
+                }
+                for key, state in self._hosts.items()
+            },
+        }
@@ -0,0 +1,182 @@
+# mcp/utils/html_text.py
+
+"""
+Модуль извлечения текста из HTML
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+# Теги, содержимое которых не попадает в текст страницы
+SKIP_TAGS = ("script", "style", "nav", "footer", "noscript")
+
+# Кодировка из <meta charset=...> или <meta content="...; charset=...">
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_\-]+)""", re.IGNORECASE)
+
+
+def sniff_encoding(head: bytes, declared: str | None = None) -> str:
+    """
+    Определяет кодировку HTML документа
+
+    Args:
+        head: Начало документа (достаточно первых килобайт)
+        declared: Кодировка из заголовка Content-Type
+
+    Returns:
+        Имя кодировки, известной Python (по умолчанию utf-8)
+    """
+    candidates = [declared]
+    match = META_CHARSET_RE.search(head[:4096])
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+class TextExtractor(HTMLParser):
+    """
+    Инкрементальный извлекатель текста из HTML
+
+    Принимает документ частями через feed(), пропускает содержимое
+    SKIP_TAGS и выставляет done, как только набрано max_chars символов.
+    Результат совпадает с BeautifulSoup.get_text(separator="\\n", strip=True).
+    """
+
+    def __init__(self, max_chars: int | None = None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.done = False
+        self._parts: list[str] = []
+        self._chars = 0
+        self._skip_depth = 0
+        # Части текущего текстового узла: HTMLParser отдает текст кусками
+        # на каждой границе feed(), узел заканчивается на следующем теге
+        self._pending: list[str] = []
+        self._pending_len = 0
+
+    def _flush_text(self) -> None:
+        """Добавляет накопленный текстовый узел в результат"""
+        if not self._pending:
+            return
+        data = "".join(self._pending).strip()
+        self._pending.clear()
+        self._pending_len = 0
+        if not data:
+            return
+        self._parts.append(data)
+        # Длина текста с учетом разделителей "\n" между частями
+        self._chars += len(data) + (1 if len(self._parts) > 1 else 0)
+        if self.max_chars is not None and self._chars >= self.max_chars:
+            self.done = True
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self._flush_text()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        # Самозакрывающиеся теги (<br/>) не открывают пропускаемый блок
+        self._flush_text()
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_text()
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
+    def handle_decl(self, decl: str) -> None:
+        self._flush_text()
+
+    def handle_pi(self, data: str) -> None:
+        self._flush_text()
+
+    def unknown_decl(self, data: str) -> None:
+        self._flush_text()
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth or self.done:
+            return
+        self._pending.append(data)
+        self._pending_len += len(data)
+        # Длинный узел не ждет закрывающего тега: если его начало уже набирает
+        # max_chars, дальнейшие куски не изменят обрезанный результат
+        if self.max_chars is not None and self._chars + 1 + self._pending_len >= self.max_chars:
+            data = "".join(self._pending).strip()
+            if self._chars + len(data) + (1 if self._parts else 0) >= self.max_chars:
+                self._flush_text()
+
+    def feed(self, data: str) -> None:
+        if not self.done:
+            super().feed(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush_text()
+
+    @property
+    def text(self) -> str:
+        """Извлеченный текст (не длиннее max_chars)"""
+        text = "\n".join(self._parts)
+        return text if self.max_chars is None else text[: self.max_chars]
+
+
+def extract_text(content: bytes, max_chars: int | None = None, encoding: str | None = None) -> str:
+    """
+    Извлекает текст из HTML однопроходным парсером с ранней остановкой
+
+    Args:
+        content: HTML документ
+        max_chars: Максимум символов (None — весь текст)
+        encoding: Кодировка из заголовка Content-Type
+
+    Returns:
+        Текст страницы
+    """
+    extractor = TextExtractor(max_chars)
+    decoder = codecs.getincrementaldecoder(sniff_encoding(content, encoding))(errors="replace")
+
+    # Подаем документ частями, чтобы не декодировать то, что не понадобится
+    chunk_size = 8 * 1024
+    for offset in range(0, len(content), chunk_size):
+        extractor.feed(decoder.decode(content[offset : offset + chunk_size]))
+        if extractor.done:
+            return extractor.text
+
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.text
+
+
+def extract_text_soup(content: bytes, max_chars: int | None = None) -> str:
+    """
+    Извлекает текст из HTML через полное дерево BeautifulSoup
+
+    Args:
+        content: HTML документ
+        max_chars: Максимум символов (None — весь текст)
+
+    Returns:
+        Текст страницы
+    """
+    # Парсим HTML
+    soup = BeautifulSoup(content, "html.parser")
+
+    # Удаляем ненужные теги
+    for tag in soup(list(SKIP_TAGS)):
+        tag.decompose()
+
+    # Извлекаем текст
+    text = soup.get_text(separator="\n", strip=True)
+    return text if max_chars is None else text[:max_chars]
@@ -0,0 +1,221 @@
+# mcp/utils/http_cache.py
+
+"""
+Модуль дискового кэша HTTP ответов
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Время жизни записи без перепроверки на сервере (секунды)
+DEFAULT_TTL = 24 * 60 * 60
+
+# Лимит кэша по суммарному размеру тел ответов и текста (байт)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Заголовки, которые нужны для условных запросов и отладки
+STORED_HEADERS = ("etag", "last-modified", "content-type", "cache-control", "date", "expires")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Нормализует URL для использования в качестве ключа кэша
+
+    Схема и хост приводятся к нижнему регистру, порт по умолчанию и
+    фрагмент отбрасываются, параметры запроса сортируются.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class HTTPCache:
+    """
+    Персистентный LRU кэш HTTP ответов на SQLite
+
+    Методы блокирующие (запись тела страницы с commit), из async кода их
+    вызывают через asyncio.to_thread. Счетчики hits, revalidated и misses
+    ведет сам кэш: get считает попадания, touch — перепроверки, put — промахи.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                text TEXT NOT NULL,
+                text_limit INTEGER,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, url: str, max_chars: int | None = None, ttl: float | None = None) -> dict[str, Any] | None:
+        """
+        Возвращает запись кэша для URL
+
+        Свежая подходящая запись засчитывается как попадание.
+
+        Args:
+            url: URL страницы
+            max_chars: Сколько символов текста нужно: запись с текстом,
+                извлеченным с меньшим лимитом, не подходит
+            ttl: Сколько секунд запись свежа (None — ttl кэша)
+
+        Returns:
+            {"status", "headers", "body", "text", "text_limit", "fetched_at", "fresh"} или None
+        """
+        key = normalize_url(url)
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, text, text_limit, fetched_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, headers, body, text, text_limit, fetched_at = row
+            if max_chars is not None and text_limit is not None and text_limit < max_chars:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            if now - fetched_at < ttl:
+                self.hits += 1
+
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+            "text": text,
+            "text_limit": text_limit,
+            "fetched_at": fetched_at,
+            "fresh": now - fetched_at < ttl,
+        }
+
+    def put(
+        self,
+        url: str,
+        status: int,
+        headers: dict[str, str],
+        body: bytes,
+        text: str,
+        text_limit: int | None = None,
+    ) -> None:
+        """
+        Сохраняет ответ в кэш и вытесняет давно не используемые записи
+
+        Args:
+            url: URL страницы
+            status: HTTP статус
+            headers: Заголовки ответа
+            body: Тело ответа
+            text: Извлеченный текст
+            text_limit: Лимит символов, с которым извлекался текст (None — текст полный)
+        """
+        key = normalize_url(url)
+        stored = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        size = len(body) + len(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(stored), body, text, text_limit, now, now, size),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str, headers: dict[str, str]) -> None:
+        """
+        Отмечает запись как перепроверенную (ответ 304 Not Modified) и
+        засчитывает перепроверку
+
+        Args:
+            url: URL страницы
+            headers: Заголовки ответа 304, обновляющие сохраненные
+        """
+        key = normalize_url(url)
+        with self._lock:
+            self.revalidated += 1
+            row = self._conn.execute("SELECT headers FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            stored = json.loads(row[0])
+            stored.update({name: headers[name] for name in STORED_HEADERS if name in headers})
+            self._conn.execute(
+                "UPDATE entries SET headers = ?, fetched_at = ? WHERE key = ?", (json.dumps(stored), time.time(), key)
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Удаляет записи по LRU, пока кэш превышает лимит (вызывать под блокировкой)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.evictions += 1
+            logger.debug(f"HTTP кэш: вытеснен {row[0]}")
+
+    def clear(self) -> None:
+        """Очищает кэш"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает статистику кэша"""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        return {
+            **counters,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
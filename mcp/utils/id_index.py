@@ -0,0 +1,199 @@
+# mcp/utils/id_index.py
+
+"""
+Модуль индекса ресурсов по ID
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class IdIndex:
+    """
+    Индекс id -> [(файл, позиция)] по всем JSON файлам data_dir
+
+    Индекс строится лениво при первом обращении и поддерживается
+    инкрементально: запись через JSONHandler переиндексирует только
+    измененный файл, а внешние изменения обнаруживаются по mtime/size
+    без чтения неизмененных файлов.
+    """
+
+    def __init__(self, json_handler: Any):
+        self.json_handler = json_handler
+        self._built = False
+        # id -> список (относительный путь, позиция в файле)
+        self._by_id: dict[str, list[tuple[str, int]]] = {}
+        # относительный путь -> (mtime_ns, size) на момент индексации
+        self._signatures: dict[str, tuple[int, int]] = {}
+        # относительный путь -> id в порядке следования
+        self._file_ids: dict[str, list[str]] = {}
+        # Индекс обновляется и из фоновых потоков (сброс журнала изменений)
+        self._lock = threading.RLock()
+
+    def _signature(self, relpath: str) -> tuple[int, int] | None:
+        """Возвращает (mtime_ns, size) файла или None, если файла нет"""
+        try:
+            stat = (self.json_handler.data_dir / relpath).stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _remove_file(self, relpath: str) -> None:
+        """Убирает из индекса все записи файла"""
+        for resource_id in self._file_ids.pop(relpath, []):
+            locations = self._by_id.get(resource_id)
+            if not locations:
+                continue
+            locations[:] = [loc for loc in locations if loc[0] != relpath]
+            if not locations:
+                del self._by_id[resource_id]
+        self._signatures.pop(relpath, None)
+
+    def update_file(self, relpath: str, data: list[dict[str, Any]] | None = None) -> None:
+        """
+        Переиндексирует один файл
+
+        Args:
+            relpath: Путь к файлу относительно data_dir
+            data: Уже загруженные ресурсы файла (если None — читаются заново)
+        """
+        with self._lock:
+            self._remove_file(relpath)
+
+            signature = self._signature(relpath)
+            if signature is None:
+                return
+
+            if data is None:
+                try:
+                    data = self.json_handler._read_shared(relpath)
+                except Exception as e:
+                    logger.warning(f"Индекс: не удалось прочитать {relpath}: {e}")
+                    return
+
+            ids = []
+            for position, resource in enumerate(data):
+                resource_id = resource.get("id") if isinstance(resource, dict) else None
+                if not isinstance(resource_id, str):
+                    continue
+                self._by_id.setdefault(resource_id, []).append((relpath, position))
+                ids.append(resource_id)
+
+            self._file_ids[relpath] = ids
+            self._signatures[relpath] = signature
+
+    def refresh(self) -> int:
+        """
+        Сверяет индекс с файлами на диске и переиндексирует измененные
+
+        Returns:
+            Количество переиндексированных файлов
+        """
+        with self._lock:
+            data_dir = self.json_handler.data_dir
+            current = {path.relative_to(data_dir).as_posix() for path in data_dir.rglob("*.json")}
+
+            changed = 0
+            for relpath in set(self._signatures) - current:
+                self._remove_file(relpath)
+                changed += 1
+
+            for relpath in sorted(current):
+                if self._signatures.get(relpath) != self._signature(relpath):
+                    self.update_file(relpath)
+                    changed += 1
+
+            if not self._built:
+                self._built = True
+                logger.info(f"Индекс ID построен: {len(self._by_id)} ресурсов в {len(self._signatures)} файлах")
+            elif changed:
+                logger.debug(f"Индекс ID: переиндексировано {changed} файлов")
+
+            return changed
+
+    def _ensure_fresh(self, relpath: str) -> None:
+        """Переиндексирует файл, если он изменился с момента индексации"""
+        if self._signatures.get(relpath) != self._signature(relpath):
+            self.update_file(relpath)
+
+    def locate(self, resource_id: str) -> list[tuple[str, int]]:
+        """
+        Находит все файлы, содержащие ресурс с данным ID
+
+        Args:
+            resource_id: ID ресурса
+
+        Returns:
+            Список (путь относительно data_dir, позиция в файле)
+        """
+        with self._lock:
+            if not self._built:
+                self.refresh()
+
+            locations = self._by_id.get(resource_id)
+            if locations:
+                for relpath in {loc[0] for loc in locations}:
+                    self._ensure_fresh(relpath)
+                locations = self._by_id.get(resource_id)
+
+            if not locations:
+                # Возможно, ресурс добавлен в файл в обход JSONHandler
+                self.refresh()
+                locations = self._by_id.get(resource_id)
+
+            return list(locations or [])
+
+    def universities(self) -> dict[str, str | None]:
+        """
+        Сверяет индекс с диском и возвращает ВУЗ каждого ID
+
+        Returns:
+            ID -> ВУЗ (None — ресурс есть в файлах нескольких ВУЗов)
+        """
+        with self._lock:
+            self.refresh()
+            result = {}
+            for resource_id, locations in self._by_id.items():
+                found = {self.university_of(relpath) for relpath, _ in locations}
+                result[resource_id] = found.pop() if len(found) == 1 else None
+            return result
+
+    def position(self, relpath: str, resource_id: str) -> int | None:
+        """
+        Возвращает позицию ресурса в конкретном файле
+
+        Args:
+            relpath: Путь к файлу относительно data_dir
+            resource_id: ID ресурса
+
+        Returns:
+            Индекс ресурса в списке файла или None
+        """
+        with self._lock:
+            self._ensure_fresh(relpath)
+            for loc_path, position in self._by_id.get(resource_id, []):
+                if loc_path == relpath:
+                    return position
+            return None
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает размер индекса"""
+        with self._lock:
+            return {
+                "built": self._built,
+                "ids": len(self._by_id),
+                "files": len(self._signatures),
+                "duplicate_ids": sum(1 for locations in self._by_id.values() if len(locations) > 1),
+            }
+
+    @staticmethod
+    def university_of(relpath: str) -> str | None:
+        """Возвращает ID ВУЗа по пути вида universities/<id>/<file>.json"""
+        parts = Path(relpath).parts
+        if len(parts) >= 3 and parts[0] == "universities":
+            return parts[1]
+        return None
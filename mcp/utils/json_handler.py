@@ -6,21 +6,94 @@
 
 import json
 import logging
+import os
+import shutil
+import stat as stat_module
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
+from .id_index import IdIndex
+from .json_patch import JSONPatchError, apply_json_patch, apply_merge_patch
+from .pagination import decode_cursor, encode_cursor
+from .resource_merge import MERGE_POLICIES, Resolver, field_diff, iter_resources, resolve_conflict, version_time
+
 logger = logging.getLogger(__name__)
 
+# Лимит кэша разобранных файлов по суммарному размеру исходных JSON (байт)
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def _clone(value: Any) -> Any:
+    """Глубокая копия разобранного JSON (быстрее copy.deepcopy: только dict и list)"""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+def is_resource_id(value: Any) -> bool:
+    """ID ресурса в патче — строка или целое число (не bool, объект или массив)"""
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Сбрасывает на диск запись каталога, чтобы переименование пережило сбой питания"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 class JSONHandler:
     """Класс для работы с JSON файлами ресурсов"""
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
         self.data_dir = Path(data_dir)
         if not self.data_dir.exists():
             self.data_dir.mkdir(parents=True, exist_ok=True)
             logger.info(f"Создана директория: {self.data_dir}")
 
+        # LRU кэш: resolved path -> (mtime_ns, size, data)
+        self.cache_max_bytes = cache_max_bytes
+        self._cache: OrderedDict[Path, tuple[int, int, list[dict[str, Any]]]] = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
+        # Кэш используется и из фоновых потоков (сброс журнала изменений)
+        self._cache_lock = threading.RLock()
+
+        # Блокировки записи по файлам (resolved path): блокировка удаляется,
+        # когда ее никто не держит, поэтому словарь не растет с числом файлов
+        self._locks: weakref.WeakValueDictionary[Path, threading.RLock] = weakref.WeakValueDictionary()
+        self._locks_guard = threading.Lock()
+
+        # Индекс id -> (файл, позиция), строится лениво
+        self.id_index = IdIndex(self)
+
+    def relative_path(self, filepath: str) -> str | None:
+        """
+        Нормализует путь к файлу относительно data_dir
+
+        Args:
+            filepath: Путь к файлу относительно data_dir
+
+        Returns:
+            POSIX-путь относительно data_dir или None, если файл вне data_dir
+        """
+        try:
+            return (self.data_dir / filepath).resolve().relative_to(self.data_dir.resolve()).as_posix()
+        except ValueError:
+            return None
+
     def read_file(self, filepath: str) -> list[dict[str, Any]]:
         """
         Читает JSON файл с ресурсами
@@ -29,7 +102,20 @@ class JSONHandler:
             filepath: Путь к файлу относительно data_dir
 
         Returns:
-            Список ресурсов
+            Список ресурсов — глубокая копия данных кэша, ее можно изменять
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            json.JSONDecodeError: Если JSON некорректен
+        """
+        return _clone(self._read_shared(filepath))
+
+    def _read_shared(self, filepath: str) -> list[dict[str, Any]]:
+        """
+        Читает JSON файл с ресурсами без копирования (для кода, который только читает)
+
+        Возвращает данные кэша: изменять список и ресурсы нельзя, наружу
+        отдаются только копии (read_file, find_resource, read_page).
 
         Raises:
             FileNotFoundError: Если файл не найден
@@ -42,6 +128,19 @@ class JSONHandler:
         if not full_path.exists():
             raise FileNotFoundError(f"Файл не найден: {full_path}")
 
+        key = full_path.resolve()
+        stat = key.stat()
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+                logger.debug(f"Кэш: попадание {filepath}")
+                return cached[2]
+
+            self._cache_misses += 1
+
         with full_path.open(encoding="utf-8") as f:
             data = json.load(f)
 
@@ -49,6 +148,8 @@ class JSONHandler:
         if not isinstance(data, list):
             data = [data]
 
+        self._cache_put(key, stat.st_mtime_ns, stat.st_size, data)
+
         logger.debug(f"Загружено {len(data)} ресурсов из {filepath}")
         return data
 
@@ -56,6 +157,10 @@ class JSONHandler:
         """
         Пишет JSON файл с ресурсами
 
+        Запись атомарна: данные пишутся во временный файл, сбрасываются на
+        диск и подменяют исходный переименованием. Записи одного файла
+        выполняются по очереди.
+
         Args:
             filepath: Путь к файлу относительно data_dir
             data: Список ресурсов
@@ -69,23 +174,312 @@ class JSONHandler:
         # Создаем директории если их нет
         full_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Создаем бэкап если файл существует
-        if backup and full_path.exists():
-            backup_path = full_path.with_suffix(".json.backup")
-            logger.info(f"Создание резервной копии: {backup_path}")
-            with full_path.open(encoding="utf-8") as f:
-                backup_data = f.read()
-            with backup_path.open("w", encoding="utf-8") as f:
-                f.write(backup_data)
-
-        # Пишем файл
-        logger.debug(f"Запись файла: {full_path}")
-        with full_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self.lock_for(filepath):
+            # Пишем во временный файл рядом с целевым: при сбое исходный файл остается целым
+            logger.debug(f"Запись файла: {full_path}")
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{full_path.name}.", suffix=".tmp", dir=full_path.parent)
+            tmp_path = Path(tmp_name)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                mode = stat_module.S_IMODE(full_path.stat().st_mode) if full_path.exists() else 0o644
+                tmp_path.chmod(mode)
+
+                # Создаем бэкап если файл существует
+                if backup and full_path.exists():
+                    self._backup(full_path)
+
+                tmp_path.replace(full_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+            _fsync_dir(full_path.parent)
+
+            # Обновляем кэш копией записанных данных, чтобы следующее чтение не парсило файл,
+            # а последующие изменения data вызывающим кодом не попали в кэш
+            key = full_path.resolve()
+            stat = key.stat()
+            self._cache_put(key, stat.st_mtime_ns, stat.st_size, _clone(data))
+
+            relpath = self.relative_path(filepath)
+            if relpath is not None:
+                self.id_index.update_file(relpath, data)
 
         logger.info(f"✅ Файл сохранен: {full_path} ({len(data)} ресурсов)")
         return full_path
 
+    def lock_for(self, filepath: str) -> threading.RLock:
+        """
+        Возвращает блокировку файла
+
+        Все записи файла выполняются под ней; вызывающий код может взять ее
+        сам, чтобы чтение-изменение-запись шло без вмешательства других вызовов.
+
+        Args:
+            filepath: Путь к файлу относительно data_dir
+        """
+        key = (self.data_dir / filepath).resolve()
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.RLock()
+                self._locks[key] = lock
+            return lock
+
+    @staticmethod
+    def _backup(full_path: Path) -> None:
+        """Сохраняет текущую версию файла в .json.backup жесткой ссылкой (без копирования содержимого)"""
+        backup_path = full_path.with_suffix(".json.backup")
+        link_path = backup_path.with_name(backup_path.name + ".tmp")
+        logger.info(f"Создание резервной копии: {backup_path}")
+
+        link_path.unlink(missing_ok=True)
+        try:
+            os.link(full_path, link_path)
+        except OSError:
+            # Файловая система без жестких ссылок
+            shutil.copy2(full_path, link_path)
+        link_path.replace(backup_path)
+
+    def _cache_put(self, key: Path, mtime_ns: int, size: int, data: list[dict[str, Any]]) -> None:
+        """Кладет файл в LRU кэш и вытесняет старые записи сверх лимита"""
+        with self._cache_lock:
+            self._cache_drop(key)
+
+            if size > self.cache_max_bytes:
+                return
+
+            self._cache[key] = (mtime_ns, size, data)
+            self._cache_bytes += size
+
+            while self._cache_bytes > self.cache_max_bytes:
+                old_key, (_, old_size, _) = self._cache.popitem(last=False)
+                self._cache_bytes -= old_size
+                self._cache_evictions += 1
+                logger.debug(f"Кэш: вытеснен {old_key}")
+
+    def _cache_drop(self, key: Path) -> None:
+        """Удаляет файл из кэша"""
+        with self._cache_lock:
+            cached = self._cache.pop(key, None)
+            if cached is not None:
+                self._cache_bytes -= cached[1]
+
+    def invalidate_cache(self, filepath: str | None = None) -> None:
+        """
+        Сбрасывает кэш разобранных файлов
+
+        Args:
+            filepath: Путь к файлу относительно data_dir (None — весь кэш)
+        """
+        if filepath is None:
+            with self._cache_lock:
+                self._cache.clear()
+                self._cache_bytes = 0
+        else:
+            self._cache_drop((self.data_dir / filepath).resolve())
+
+    def cache_stats(self) -> dict[str, Any]:
+        """
+        Возвращает статистику кэша разобранных файлов
+
+        Returns:
+            Счетчики попаданий/промахов, число записей и занятый объем
+        """
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / lookups if lookups else 0,
+                "evictions": self._cache_evictions,
+                "entries": len(self._cache),
+                "bytes": self._cache_bytes,
+                "max_bytes": self.cache_max_bytes,
+            }
+
+    def find_resource(self, filepath: str, resource_id: str) -> dict[str, Any] | None:
+        """
+        Находит ресурс в файле по ID через индекс
+
+        Args:
+            filepath: Путь к файлу относительно data_dir
+            resource_id: ID ресурса
+
+        Returns:
+            Копия ресурса или None, если в файле его нет
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+        """
+        relpath = self.relative_path(filepath)
+        data = self._read_shared(filepath)
+
+        if relpath is None:
+            return _clone(next((r for r in data if r.get("id") == resource_id), None))
+
+        position = self.id_index.position(relpath, resource_id)
+        if position is not None and position < len(data) and data[position].get("id") == resource_id:
+            return _clone(data[position])
+        return None
+
+    def read_page(
+        self, filepath: str, limit: int, cursor: str | None = None, start_index: int = 0
+    ) -> dict[str, Any]:
+        """
+        Возвращает страницу ресурсов файла
+
+        Args:
+            filepath: Путь к файлу относительно data_dir
+            limit: Размер страницы
+            cursor: Токен продолжения из предыдущей страницы (приоритетнее start_index)
+            start_index: Начальный индекс для первой страницы
+
+        Returns:
+            {"start_index", "resources", "total", "next_cursor"};
+            next_cursor равен None на последней странице, resources — копии
+            ресурсов страницы
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если cursor некорректен
+        """
+        cursor_key = self.relative_path(filepath) or filepath
+        data = self._read_shared(filepath)
+
+        start = max(0, start_index)
+        if cursor:
+            last_id, next_index = decode_cursor(cursor, cursor_key)
+            start = next_index
+            if last_id is not None:
+                # Продолжаем сразу после последнего выданного ресурса, где бы он теперь ни был
+                position = self.id_index.position(cursor_key, last_id)
+                if position is not None and position < len(data) and data[position].get("id") == last_id:
+                    start = position + 1
+
+        page = data[start : start + max(0, limit)]
+        end = start + len(page)
+
+        next_cursor = None
+        if page and end < len(data):
+            next_cursor = encode_cursor(cursor_key, page[-1].get("id"), end)
+
+        return {"start_index": start, "resources": _clone(page), "total": len(data), "next_cursor": next_cursor}
+
+    def locate_resource(self, resource_id: str) -> list[dict[str, Any]]:
+        """
+        Находит все файлы data_dir, содержащие ресурс с данным ID
+
+        Args:
+            resource_id: ID ресурса
+
+        Returns:
+            Список {"filepath", "index", "university"}
+        """
+        return [
+            {"filepath": relpath, "index": position, "university": IdIndex.university_of(relpath)}
+            for relpath, position in self.id_index.locate(resource_id)
+        ]
+
+    def patch_file(self, filepath: str, patches: list[dict[str, Any]], atomic: bool = False) -> dict[str, Any]:
+        """
+        Применяет патчи к ресурсам файла по ID и сохраняет файл одной записью
+
+        Каждый патч: {"id": "...", "merge": {...}} (JSON Merge Patch) и/или
+        {"id": "...", "ops": [...]} (JSON Patch); если указаны оба, сначала
+        применяется merge. {"id": "...", "delete": true} удаляет ресурс из
+        файла. Патч, после которого ресурс перестает проходить
+        validate_structure, отклоняется.
+
+        Args:
+            filepath: Путь к файлу относительно data_dir
+            patches: Список патчей
+            atomic: Не сохранять файл, если хотя бы один патч не применился
+
+        Returns:
+            {"written": bool, "results": [{"id", "status", "message"?}]}
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+        """
+        with self.lock_for(filepath):
+            # Копия только списка: патчи не меняют ресурсы на месте, а строят новые
+            data = list(self._read_shared(filepath))
+            positions: dict[Any, int] = {}
+            for position, resource in enumerate(data):
+                if isinstance(resource, dict) and is_resource_id(resource.get("id")):
+                    positions.setdefault(resource["id"], position)
+
+            results = []
+            deleted: set[int] = set()
+            for patch in patches:
+                resource_id = patch.get("id") if isinstance(patch, dict) else None
+                try:
+                    if resource_id is None:
+                        raise JSONPatchError(f"У патча нет id: {patch}")
+                    if not is_resource_id(resource_id):
+                        raise JSONPatchError(f"id патча должен быть строкой или числом: {resource_id!r}")
+                    if patch.get("delete") is True:
+                        if set(patch) - {"id", "file", "delete"}:
+                            raise JSONPatchError("Патч удаления не может содержать другие изменения")
+                    elif "merge" not in patch and "ops" not in patch:
+                        raise JSONPatchError("Патч должен содержать merge, ops или delete")
+                    position = positions.get(resource_id)
+                    if position is None:
+                        raise JSONPatchError(f"Ресурс не найден: {resource_id}")
+                    if patch.get("delete") is True:
+                        deleted.add(position)
+                        del positions[resource_id]
+                        results.append({"id": resource_id, "status": "success"})
+                        continue
+
+                    original = data[position]
+                    updated = original
+                    if "merge" in patch:
+                        updated = apply_merge_patch(updated, patch["merge"])
+                    if "ops" in patch:
+                        updated = apply_json_patch(updated, patch["ops"])
+
+                    if not isinstance(updated, dict):
+                        raise JSONPatchError("После патча ресурс должен остаться объектом")
+                    is_valid, errors = self.validate_structure(updated)
+                    if not is_valid and self.validate_structure(original)[0]:
+                        raise JSONPatchError(f"Патч нарушает структуру ресурса: {'; '.join(errors)}")
+                    new_id = updated.get("id")
+                    if not is_resource_id(new_id):
+                        raise JSONPatchError(f"id ресурса должен быть строкой или числом: {new_id!r}")
+                    if new_id != resource_id and new_id in positions:
+                        raise JSONPatchError(f"ID {new_id} уже занят")
+                except JSONPatchError as e:
+                    results.append({"id": resource_id, "status": "error", "message": str(e)})
+                    continue
+
+                data[position] = updated
+                if new_id != resource_id:
+                    del positions[resource_id]
+                    positions[new_id] = position
+                results.append({"id": resource_id, "status": "success"})
+
+            failed = any(r["status"] == "error" for r in results)
+            applied = any(r["status"] == "success" for r in results)
+            if atomic and failed:
+                for result in results:
+                    if result["status"] == "success":
+                        result["status"] = "skipped"
+                applied = False
+
+            if applied:
+                if deleted:
+                    data = [resource for position, resource in enumerate(data) if position not in deleted]
+                self.write_file(filepath, data)
+
+        logger.info(f"Патчи {filepath}: применено {sum(r['status'] == 'success' for r in results)} из {len(results)}")
+        return {"written": applied, "results": results}
+
     def validate_structure(self, resource: dict[str, Any]) -> tuple:
         """
         Валидирует структуру ресурса
@@ -135,40 +529,125 @@ class JSONHandler:
             Количество ресурсов
         """
         try:
-            data = self.read_file(filepath)
-            return len(data)
+            return len(self._read_shared(filepath))
         except Exception as e:
             logger.error(f"Ошибка подсчета ресурсов: {e}")
             return 0
 
-    def merge_files(self, source_file: str, dest_file: str) -> int:
+    def merge_files(
+        self,
+        sources: str | list[str],
+        dest_file: str,
+        policy: str | Resolver = "keep",
+        timestamp_field: str | None = None,
+        dry_run: bool = False,
+    ) -> dict[str, Any]:
         """
-        Объединяет ресурсы из одного файла в другой
+        Объединяет ресурсы из нескольких файлов в целевой файл по ID
+
+        Исходные файлы (JSON массивы или JSON Lines) читаются потоково и
+        сверяются с индексом ID целевого файла; целевой файл сохраняется
+        одной атомарной записью после обработки всех источников. Ресурсы
+        без id или не проходящие validate_structure отклоняются.
 
         Args:
-            source_file: Исходный файл
-            dest_file: Целевой файл
+            sources: Исходный файл или список файлов (пути относительно data_dir или абсолютные)
+            dest_file: Целевой файл (создается, если его нет)
+            policy: Политика для существующих ID: "keep", "overwrite", "newest"
+                или функция (existing, incoming) -> ресурс | None
+            timestamp_field: Поле ресурса с ISO датой версии для "newest"
+                (default: время изменения файла)
+            dry_run: Только вычислить изменения, не записывая файл
 
         Returns:
-            Количество добавленных ресурсов
-        """
-        try:
-            source_data = self.read_file(source_file)
-            dest_data = self.read_file(dest_file)
-
-            # Объединяем по ID
-            existing_ids = {r["id"] for r in dest_data}
-            added = 0
+            {"dest", "sources": {файл: прочитано}, "added": [id], "updated":
+            [{"id", "source", "fields": {поле: {"old", "new"}}}], "unchanged",
+            "rejected": [{"source", "index", "id", "errors"}], "written"}
 
-            for resource in source_data:
-                if resource["id"] not in existing_ids:
-                    dest_data.append(resource)
-                    added += 1
-
-            self.write_file(dest_file, dest_data)
-            logger.info(f"Добавлено {added} ресурсов из {source_file} в {dest_file}")
-            return added
-
-        except Exception as e:
-            logger.error(f"Ошибка объединения файлов: {e}")
-            return 0
+        Raises:
+            FileNotFoundError: Если исходный файл не найден
+            json.JSONDecodeError: Если JSON исходного или целевого файла некорректен
+            ValueError: Если политика неизвестна
+        """
+        if isinstance(sources, str):
+            sources = [sources]
+        if not callable(policy) and policy not in MERGE_POLICIES:
+            raise ValueError(f"Неизвестная политика объединения: {policy} (допустимо: {', '.join(MERGE_POLICIES)})")
+
+        dest_path = self.data_dir / dest_file
+        with self.lock_for(dest_file):
+            data = self.read_file(dest_file) if dest_path.exists() else []
+            dest_time = dest_path.stat().st_mtime if dest_path.exists() else 0.0
+
+            positions: dict[Any, int] = {}
+            for position, resource in enumerate(data):
+                if isinstance(resource, dict):
+                    positions.setdefault(resource.get("id"), position)
+            # Время версий ресурсов, уже измененных при этом объединении
+            times: dict[int, float] = {}
+
+            counts: dict[str, int] = {}
+            added: list[Any] = []
+            updated: list[dict[str, Any]] = []
+            rejected: list[dict[str, Any]] = []
+            unchanged = 0
+            for source in sources:
+                source_path = self.data_dir / source
+                source_time = source_path.stat().st_mtime if source_path.exists() else 0.0
+                counts[source] = 0
+                for index, incoming in enumerate(iter_resources(source_path)):
+                    counts[source] += 1
+                    resource_id = incoming.get("id") if isinstance(incoming, dict) else None
+                    if resource_id is None:
+                        rejected.append({"source": source, "index": index, "id": None, "errors": ["Нет поля id"]})
+                        continue
+
+                    incoming_time = version_time(incoming, source_time, timestamp_field)
+                    position = positions.get(resource_id)
+                    if position is None:
+                        merged = incoming
+                    else:
+                        existing = data[position]
+                        if position in times:
+                            existing_time = times[position]
+                        else:
+                            existing_time = version_time(existing, dest_time, timestamp_field)
+                        merged = resolve_conflict(existing, incoming, policy, existing_time, incoming_time)
+                        incoming_time = max(existing_time, incoming_time)
+                        if merged is existing or merged == existing:
+                            unchanged += 1
+                            continue
+
+                    is_valid, errors = self.validate_structure(merged)
+                    if not is_valid:
+                        rejected.append({"source": source, "index": index, "id": resource_id, "errors": errors})
+                        continue
+
+                    if position is None:
+                        positions[resource_id] = len(data)
+                        times[len(data)] = incoming_time
+                        data.append(merged)
+                        added.append(resource_id)
+                    else:
+                        diff = field_diff(data[position], merged)
+                        updated.append({"id": resource_id, "source": source, "fields": diff})
+                        times[position] = incoming_time
+                        data[position] = merged
+
+            written = bool(added or updated) and not dry_run
+            if written:
+                self.write_file(dest_file, data)
+
+        logger.info(
+            f"Объединение в {dest_file}: {sum(counts.values())} ресурсов из {len(sources)} файлов, "
+            f"добавлено {len(added)}, обновлено {len(updated)}, отклонено {len(rejected)}"
+        )
+        return {
+            "dest": dest_file,
+            "sources": counts,
+            "added": added,
+            "updated": updated,
+            "unchanged": unchanged,
+            "rejected": rejected,
+            "written": written,
+        }
@@ -0,0 +1,162 @@
+# mcp/utils/json_patch.py
+
+"""
+Модуль частичного обновления ресурсов: JSON Merge Patch (RFC 7396)
+и JSON Patch (RFC 6902)
+"""
+
+import copy
+from typing import Any
+
+
+class JSONPatchError(ValueError):
+    """Патч не может быть применен к документу"""
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Применяет JSON Merge Patch: ключи со значением null удаляются,
+    вложенные объекты объединяются, остальные значения заменяются
+
+    Исходный документ не изменяется.
+
+    Args:
+        target: Документ (ресурс)
+        patch: Merge patch
+
+    Returns:
+        Новый документ
+    """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    """Разбирает JSON Pointer ("/dates/event") в список ключей"""
+    if not isinstance(pointer, str):
+        raise JSONPatchError(f"Путь должен быть строкой: {pointer!r}")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JSONPatchError(f"Некорректный путь: {pointer}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")]
+
+
+def _list_index(container: list, key: str, allow_end: bool) -> int:
+    if allow_end and key == "-":
+        return len(container)
+    if not key.isdigit() or (len(key) > 1 and key.startswith("0")):
+        raise JSONPatchError(f"Некорректный индекс массива: {key}")
+    index = int(key)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JSONPatchError(f"Индекс вне массива: {key}")
+    return index
+
+
+def _resolve(doc: Any, parts: list[str]) -> Any:
+    for part in parts:
+        if isinstance(doc, dict):
+            if part not in doc:
+                raise JSONPatchError(f"Путь не найден: {part}")
+            doc = doc[part]
+        elif isinstance(doc, list):
+            doc = doc[_list_index(doc, part, allow_end=False)]
+        else:
+            raise JSONPatchError(f"Путь не найден: {part}")
+    return doc
+
+
+def _add(doc: Any, parts: list[str], value: Any) -> Any:
+    if not parts:
+        return value
+    parent = _resolve(doc, parts[:-1])
+    key = parts[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        raise JSONPatchError(f"Нельзя добавить значение в {key}")
+    return doc
+
+
+def _remove(doc: Any, parts: list[str]) -> Any:
+    if not parts:
+        raise JSONPatchError("Нельзя удалить документ целиком")
+    parent = _resolve(doc, parts[:-1])
+    key = parts[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JSONPatchError(f"Путь не найден: {key}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, key, allow_end=False))
+    raise JSONPatchError(f"Путь не найден: {key}")
+
+
+def apply_json_patch(doc: Any, operations: list[dict[str, Any]]) -> Any:
+    """
+    Применяет JSON Patch: операции add, remove, replace, move, copy, test
+
+    Операции применяются к копии документа; при ошибке любой операции
+    исходный документ не изменяется.
+
+    Args:
+        doc: Документ (ресурс)
+        operations: Список операций [{"op": "replace", "path": "/description", "value": "..."}]
+
+    Returns:
+        Новый документ
+
+    Raises:
+        JSONPatchError: Если операция некорректна или путь не найден
+    """
+    if not isinstance(operations, list):
+        raise JSONPatchError("JSON Patch должен быть списком операций")
+
+    result = copy.deepcopy(doc)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JSONPatchError(f"Некорректная операция: {operation}")
+
+        op = operation["op"]
+        parts = _parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JSONPatchError(f"Операции {op} нужен value: {operation}")
+
+        if op == "add":
+            result = _add(result, parts, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(result, parts)
+        elif op == "replace":
+            _resolve(result, parts)
+            if parts:
+                _remove(result, parts)
+            result = _add(result, parts, copy.deepcopy(operation["value"]))
+        elif op in ("move", "copy"):
+            if "from" not in operation:
+                raise JSONPatchError(f"Операции {op} нужен from: {operation}")
+            source = _parse_pointer(operation["from"])
+            if op == "move":
+                if parts[: len(source)] == source and parts != source:
+                    raise JSONPatchError("Нельзя переместить значение внутрь самого себя")
+                value = _remove(result, source)
+            else:
+                value = copy.deepcopy(_resolve(result, source))
+            result = _add(result, parts, value)
+        elif op == "test":
+            if _resolve(result, parts) != operation["value"]:
+                raise JSONPatchError(f"Проверка не пройдена: {operation['path']}")
+        else:
+            raise JSONPatchError(f"Неизвестная операция: {op}")
+
+    return result
@@ -0,0 +1,158 @@
+# mcp/utils/key_info.py
+
+"""
+Модуль извлечения ключевой информации из текста (даты, сущности, ключевые фразы)
+"""
+
+import re
+from datetime import date
+from typing import Any
+
+from .validator import STOP_WORDS
+
+# Сколько сущностей и ключевых фраз возвращать для одного текста
+MAX_ENTITIES = 10
+MAX_KEY_PHRASES = 10
+
+# Месяцы в родительном падеже ("22 января 2026")
+MONTHS = {
+    "января": 1,
+    "февраля": 2,
+    "марта": 3,
+    "апреля": 4,
+    "мая": 5,
+    "июня": 6,
+    "июля": 7,
+    "августа": 8,
+    "сентября": 9,
+    "октября": 10,
+    "ноября": 11,
+    "декабря": 12,
+}
+
+_MONTH = "|".join(MONTHS)
+_DASH = r"\s*[-–—]\s*"
+_ISO = r"(?P<{0}y>\d{{4}})-(?P<{0}m>\d{{2}})-(?P<{0}d>\d{{2}})"
+_DMY = r"(?P<{0}d>\d{{2}})\.(?P<{0}m>\d{{2}})\.(?P<{0}y>\d{{4}})"
+
+# Все форматы дат одним выражением: альтернативы проверяются по порядку, диапазоны — раньше
+# одиночных дат. Просмотр вперед (?=\d) позволяет движку быстро пропускать текст без цифр
+DATE_RE = re.compile(
+    rf"(?=\d)(?:(?P<iso_range>\b{_ISO.format('a')}{_DASH}{_ISO.format('b')}\b)"
+    rf"|(?P<dmy_range>\b{_DMY.format('c')}{_DASH}{_DMY.format('e')}\b)"
+    rf"|(?P<iso>\b{_ISO.format('f')}\b)"
+    rf"|(?P<dmy>\b{_DMY.format('g')}\b)"
+    rf"|(?P<ru_range>\b(?P<rd1>\d{{1,2}})(?:\s+(?P<rm1>{_MONTH}))?(?:{_DASH}|\s+по\s+)"
+    rf"(?P<rd2>\d{{1,2}})\s+(?P<rm2>{_MONTH})(?:\s+(?P<ry2>\d{{4}}))?\b)"
+    rf"|(?P<ru>\b(?P<sd>\d{{1,2}})\s+(?P<sm>{_MONTH})(?:\s+(?P<sy>\d{{4}}))?\b))"
+)
+
+WORD_RE = re.compile(r"[А-ЯЁа-яёA-Za-z]+")
+
+
+def _make_date(year: str | int | None, month: str | int, day: str | int) -> date | None:
+    """Собирает дату; некорректные даты (31.02) и даты без года дают None"""
+    if year is None:
+        return None
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _month(name: str | None) -> int | None:
+    return MONTHS.get(name) if name else None
+
+
+def _words(text: str) -> tuple[list[str], list[str]]:
+    """Сущности и ключевые фразы: первые уникальные в порядке появления"""
+    entities: dict[str, None] = {}
+    key_phrases: dict[str, None] = {}
+    for word in WORD_RE.findall(text):
+        # Имена собственные ("Вышка") и аббревиатуры ("ВШЭ", "МФТИ")
+        if len(entities) < MAX_ENTITIES and (
+            (len(word) >= 3 and word[0].isupper() and word[1:].islower()) or (len(word) >= 2 and word.isupper())
+        ):
+            entities[word] = None
+        if len(key_phrases) < MAX_KEY_PHRASES and len(word) >= 4:
+            lowered = word.lower()
+            if lowered not in STOP_WORDS and lowered not in MONTHS:
+                key_phrases[lowered] = None
+        elif len(entities) >= MAX_ENTITIES and len(key_phrases) >= MAX_KEY_PHRASES:
+            break
+    return list(entities), list(key_phrases)
+
+
+def extract_key_info(text: str, default_year: int | None = None) -> dict[str, Any]:
+    """
+    Извлекает из текста даты, интервалы дат, сущности и ключевые фразы
+
+    Поддерживаются даты 2026-01-22 и 22.01.2026, интервалы
+    "2025-08-20 - 2025-10-20" и "01.02.2026 – 15.02.2026", даты с названием
+    месяца "22 января 2026", "10–12 марта 2026", "30 января — 2 февраля",
+    "с 10 по 12 марта". Все форматы дат ищутся одним проходом DATE_RE,
+    слова — одним проходом WORD_RE.
+
+    Args:
+        text: Текст (описание ресурса или контент страницы)
+        default_year: Год для дат без года ("22 января"); None — такие даты пропускаются
+
+    Returns:
+        {"dates": ["YYYY-MM-DD", ...], "date_ranges": [["начало", "конец"], ...],
+        "entities": [...], "key_phrases": [...]}; даты отсортированы и уникальны
+    """
+    dates: set[date] = set()
+    ranges: list[tuple[date, date]] = []
+
+    for match in DATE_RE.finditer(text):
+        kind = match.lastgroup
+        g = match.group
+
+        if kind == "iso_range":
+            start, end = _make_date(g("ay"), g("am"), g("ad")), _make_date(g("by"), g("bm"), g("bd"))
+        elif kind == "dmy_range":
+            start, end = _make_date(g("cy"), g("cm"), g("cd")), _make_date(g("ey"), g("em"), g("ed"))
+        elif kind == "ru_range":
+            year = g("ry2") or default_year
+            end_month = _month(g("rm2"))
+            start_month = _month(g("rm1")) or end_month
+            start_year = int(year) - 1 if year is not None and start_month > end_month else year
+            start, end = _make_date(start_year, start_month, g("rd1")), _make_date(year, end_month, g("rd2"))
+        else:
+            if kind == "iso":
+                single = _make_date(g("fy"), g("fm"), g("fd"))
+            elif kind == "dmy":
+                single = _make_date(g("gy"), g("gm"), g("gd"))
+            else:
+                single = _make_date(g("sy") or default_year, _month(g("sm")), g("sd"))
+            if single is not None:
+                dates.add(single)
+            continue
+
+        for value in (start, end):
+            if value is not None:
+                dates.add(value)
+        if start is not None and end is not None and start <= end:
+            ranges.append((start, end))
+
+    entities, key_phrases = _words(text)
+    return {
+        "dates": [d.isoformat() for d in sorted(dates)],
+        "date_ranges": [[s.isoformat(), e.isoformat()] for s, e in ranges],
+        "entities": entities,
+        "key_phrases": key_phrases,
+    }
+
+
+def extract_key_info_batch(texts: list[str], default_year: int | None = None) -> list[dict[str, Any]]:
+    """
+    Извлекает ключевую информацию из списка текстов
+
+    Args:
+        texts: Тексты
+        default_year: Год для дат без года
+
+    Returns:
+        Результаты extract_key_info в порядке текстов
+    """
+    return [extract_key_info(text or "", default_year) for text in texts]
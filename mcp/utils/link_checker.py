@@ -0,0 +1,387 @@
+# mcp/utils/link_checker.py
+
+"""
+Модуль проверки ссылок: HEAD-запросы с откатом на GET одного байта и
+кэш статусов и цепочек редиректов
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from .host_scheduler import HostScheduler, HostUnavailableError, backoff_delay, parse_retry_after
+from .http_cache import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Время жизни результата проверки по состоянию ссылки (секунды): рабочие
+# ссылки меняются редко, а сетевые ошибки часто бывают временными
+STATE_TTL = {
+    "ok": 7 * 24 * 60 * 60,
+    "redirected": 3 * 24 * 60 * 60,
+    "broken": 24 * 60 * 60,
+    "error": 60 * 60,
+}
+
+# Все состояния ссылки; skipped — хост временно исключен планировщиком, не кэшируется
+LINK_STATES = ("ok", "redirected", "broken", "error", "skipped")
+
+# HEAD дешевле GET страницы, поэтому хостам разрешена большая частота, чем при загрузке
+DEFAULT_HOST_RATE = 10.0
+DEFAULT_HOST_BURST = 20.0
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRYABLE_STATUSES = {429, 503}
+
+
+def link_state(status: int | None, url: str, final_url: str | None, error: str | None = None) -> str:
+    """
+    Состояние ссылки по результату проверки
+
+    Returns:
+        "ok", "redirected" (итоговый адрес другой), "broken" (HTTP 4xx/5xx)
+        или "error" (сетевая ошибка, таймаут)
+    """
+    if error is not None or status is None:
+        return "error"
+    if status >= 400:
+        return "broken"
+    if final_url and normalize_url(final_url) != normalize_url(url):
+        return "redirected"
+    return "ok"
+
+
+def _walk_websites(node: Any, path: str) -> Iterator[tuple[str, str]]:
+    """Все значения ключей website во вложенной структуре парами (путь, URL)"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            child = f"{path}.{key}" if path else key
+            if key == "website" and isinstance(value, str):
+                yield child, value
+            else:
+                yield from _walk_websites(value, child)
+
+
+def index_links(relpath: str, data: Any) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Ссылки файла index.json: website ВУЗов и их contacts.*.website
+
+    Yields:
+        (URL, {"file", "id", "field"})
+    """
+    universities = data.get("universities", []) if isinstance(data, dict) else []
+    for university in universities:
+        if not isinstance(university, dict):
+            continue
+        for field, url in _walk_websites(university, ""):
+            yield url, {"file": relpath, "id": university.get("id"), "field": field}
+
+
+def resource_links(relpath: str, resources: list[dict[str, Any]]) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Ссылки website ресурсов файла
+
+    Yields:
+        (URL, {"file", "id", "field"})
+    """
+    for resource in resources:
+        url = resource.get("website")
+        if isinstance(url, str) and url.strip():
+            yield url, {"file": relpath, "id": resource.get("id"), "field": "website"}
+
+
+class LinkCache:
+    """Кэш результатов проверки ссылок на SQLite (срок жизни зависит от состояния)"""
+
+    def __init__(self, path: str, ttl: dict[str, float] | None = None):
+        self.path = Path(path)
+        self.ttl = {**STATE_TTL, **(ttl or {})}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS links (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                state TEXT NOT NULL,
+                status INTEGER,
+                final_url TEXT,
+                chain TEXT NOT NULL,
+                method TEXT,
+                error TEXT,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, urls: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Возвращает непросроченные результаты проверки
+
+        Args:
+            urls: Список URL
+
+        Returns:
+            URL -> {"state", "status", "final_url", "chain", "method", "error", "checked_at"}
+        """
+        keys = {normalize_url(url): url for url in urls}
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, state, status, final_url, chain, method, error, checked_at FROM links "
+                "WHERE key IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(keys), ensure_ascii=False),),
+            ).fetchall()
+
+        found = {}
+        for key, state, status, final_url, chain, method, error, checked_at in rows:
+            if now - checked_at < self.ttl.get(state, 0):
+                found[keys[key]] = {
+                    "state": state,
+                    "status": status,
+                    "final_url": final_url,
+                    "chain": json.loads(chain),
+                    "method": method,
+                    "error": error,
+                    "checked_at": checked_at,
+                }
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, results: list[dict[str, Any]]) -> None:
+        """
+        Сохраняет результаты проверки одной транзакцией
+
+        Args:
+            results: [{"url", "state", "status", "final_url", "chain", "method", "error"}]
+        """
+        now = time.time()
+        rows = [
+            (
+                normalize_url(r["url"]),
+                r["url"],
+                r["state"],
+                r["status"],
+                r["final_url"],
+                json.dumps(r["chain"], ensure_ascii=False),
+                r["method"],
+                r["error"],
+                now,
+            )
+            for r in results
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Очищает кэш"""
+        with self._lock:
+            self._conn.execute("DELETE FROM links")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает число записей по состояниям"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM links GROUP BY state").fetchall()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": sum(count for _, count in rows),
+            "by_state": dict(rows),
+            "ttl": self.ttl,
+        }
+
+
+class LinkChecker:
+    """
+    Проверка доступности ссылок без загрузки страниц
+
+    Ссылка проверяется HEAD-запросом с переходом по редиректам; если
+    сервер отвечает на HEAD ошибкой (часто HEAD просто не поддерживается),
+    выполняется GET с Range: bytes=0-0, тело которого не читается.
+    Одинаковые (после нормализации) URL проверяются один раз, результаты
+    с цепочкой редиректов кэшируются в LinkCache.
+    """
+
+    def __init__(
+        self,
+        cache: LinkCache | None = None,
+        timeout: float = 10.0,
+        max_retries: int = 2,
+        max_connections: int = 200,
+        max_connections_per_host: int = 6,
+        scheduler: HostScheduler | None = None,
+        max_retry_wait: float = 30.0,
+    ):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.scheduler = scheduler or HostScheduler(DEFAULT_HOST_RATE, DEFAULT_HOST_BURST)
+        self.max_retry_wait = max_retry_wait
+        self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+        # Клиент и лимиты по хостам привязаны к event loop (как в WebScraper)
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Возвращает httpx клиент текущего event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                trust_env=False,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._client_loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        """Возвращает семафор, ограничивающий число соединений к хосту"""
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_limits[host]
+
+    async def aclose(self) -> None:
+        """Закрывает пул соединений"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    async def _request(self, method: str, url: str) -> httpx.Response:
+        """HEAD или GET первого байта; тело ответа не читается"""
+        headers = {"User-Agent": self.user_agent, "Accept": "*/*"}
+        if method == "GET":
+            headers["Range"] = "bytes=0-0"
+        client = self._get_client()
+        async with self._host_limit(url), client.stream(method, url, headers=headers) as response:
+            return response
+
+    async def check(self, url: str) -> dict[str, Any]:
+        """
+        Проверяет одну ссылку
+
+        Returns:
+            {"url", "state", "status", "final_url", "chain": [{"status", "url"}], "method", "error"}
+        """
+        status = final_url = error = method = None
+        chain: list[dict[str, Any]] = []
+        skipped = False
+        last_attempt = self.max_retries - 1
+        for attempt in range(self.max_retries):
+            try:
+                await self.scheduler.acquire(url, self.max_retry_wait)
+                method = "HEAD"
+                response = await self._request(method, url)
+                if response.status_code >= 400 and response.status_code not in RETRYABLE_STATUSES:
+                    method = "GET"
+                    response = await self._request(method, url)
+
+                status, final_url, error = response.status_code, str(response.url), None
+                chain = [{"status": r.status_code, "url": str(r.url)} for r in response.history]
+                if status in RETRYABLE_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get("retry-after"))
+                    self.scheduler.record_failure(url, retry_after, throttled=True)
+                    if attempt < last_attempt:
+                        await asyncio.sleep(backoff_delay(attempt))
+                        continue
+                else:
+                    self.scheduler.record_success(url)
+                break
+            except HostUnavailableError as e:
+                status, error, skipped = None, str(e), True
+                break
+            except httpx.InvalidURL as e:
+                status, error = None, f"Некорректный URL: {e}"
+                break
+            except httpx.HTTPError as e:
+                self.scheduler.record_failure(url)
+                status, error = None, str(e) or type(e).__name__
+                if isinstance(e, httpx.TimeoutException):
+                    error = f"Таймаут: {error}"
+                if attempt < last_attempt:
+                    await asyncio.sleep(backoff_delay(attempt))
+
+        state = "skipped" if skipped else link_state(status, url, final_url, error)
+        if state != "ok":
+            logger.debug(f"Ссылка {url}: {state} ({status or error})")
+        return {
+            "url": url,
+            "state": state,
+            "status": status,
+            "final_url": final_url,
+            "chain": chain,
+            "method": method,
+            "error": error,
+        }
+
+    async def check_many(
+        self, urls: list[str], concurrency: int = 50, use_cache: bool = True
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Конкурентно проверяет ссылки; повторы (после нормализации) проверяются один раз
+
+        Результаты из кэша отдаются сразу, остальные — по мере готовности.
+        Новые результаты (кроме skipped) сохраняются в кэш одной транзакцией в конце;
+        запросы к кэшу выполняются вне event loop.
+
+        Yields:
+            Результат check с полем "cached"
+        """
+        by_key: dict[str, str] = {}
+        for url in urls:
+            by_key.setdefault(normalize_url(url), url)
+        unique = list(by_key.values())
+        use_cache = use_cache and self.cache is not None
+        cached = await asyncio.to_thread(self.cache.get_many, unique) if use_cache else {}
+        for url, entry in cached.items():
+            yield {"url": url, **entry, "cached": True}
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def check_one(url: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.check(url)
+
+        tasks = [asyncio.ensure_future(check_one(url)) for url in unique if url not in cached]
+        fresh = []
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if result["state"] != "skipped":
+                    fresh.append(result)
+                yield {**result, "cached": False}
+        finally:
+            for task in tasks:
+                task.cancel()
+            if fresh and self.cache is not None:
+                await asyncio.to_thread(self.cache.put_many, fresh)
@@ -0,0 +1,115 @@
+# mcp/utils/pagination.py
+
+"""
+Модуль постраничной выдачи ресурсов и проекции полей
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+# Проекция, возвращающая ресурс целиком
+ALL_FIELDS = "*"
+
+_MISSING = object()
+
+
+def get_path(resource: dict[str, Any], path: str) -> Any:
+    """
+    Возвращает значение по пути через точку ("dates.event", "benefits.bvi")
+
+    Returns:
+        Значение или None, если какого-то звена пути нет
+    """
+    value = _lookup(resource, path.split("."))
+    return None if value is _MISSING else value
+
+
+def _lookup(value: Any, parts: list[str]) -> Any:
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def project(resource: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    """
+    Оставляет в ресурсе только перечисленные поля
+
+    Вложенные пути сохраняют структуру: ["id", "dates.event"] ->
+    {"id": ..., "dates": {"event": ...}}. Отсутствующие поля
+    возвращаются как None, чтобы у всех ресурсов был одинаковый набор ключей.
+    Значения не копируются: результат разделяет их с resource, поэтому
+    копию ресурса делает вызывающий код (JSONHandler.read_page и
+    find_resource уже возвращают копии). Сам resource не изменяется:
+    вложенный словарь, в который пересекающийся путь (["dates", "dates.foo"])
+    дописывает ключи, предварительно копируется.
+
+    Args:
+        resource: Ресурс
+        fields: Список путей или ["*"] для всего ресурса
+
+    Returns:
+        Новый словарь с выбранными полями
+    """
+    if ALL_FIELDS in fields:
+        return dict(resource)
+
+    result: dict[str, Any] = {}
+    # Словари результата, созданные здесь (их можно дополнять, не трогая resource)
+    owned: set[int] = set()
+    for path in fields:
+        parts = path.split(".")
+        value = _lookup(resource, parts)
+        target = result
+        for part in parts[:-1]:
+            existing = target.get(part)
+            if not isinstance(existing, dict):
+                existing = target[part] = {}
+                owned.add(id(existing))
+            elif id(existing) not in owned:
+                existing = target[part] = dict(existing)
+                owned.add(id(existing))
+            target = existing
+        target[parts[-1]] = None if value is _MISSING else value
+    return result
+
+
+def encode_cursor(filepath: str, last_id: str | None, next_index: int) -> str:
+    """
+    Кодирует непрозрачный токен продолжения
+
+    Токен хранит ID последнего выданного ресурса: следующая страница
+    начинается сразу после него, даже если выше были вставлены или
+    удалены ресурсы. Индекс используется, если этот ресурс удален.
+    """
+    payload = json.dumps({"f": filepath, "id": last_id, "i": next_index}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, filepath: str) -> tuple[str | None, int]:
+    """
+    Декодирует токен продолжения
+
+    Args:
+        token: Токен из next_cursor
+        filepath: Файл, для которого запрашивается страница
+
+    Returns:
+        (ID последнего выданного ресурса, индекс следующего ресурса)
+
+    Raises:
+        ValueError: Если токен поврежден или выдан для другого файла
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        file_in_token, last_id, next_index = payload["f"], payload["id"], int(payload["i"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Некорректный cursor: {token}") from e
+
+    if file_in_token != filepath:
+        raise ValueError(f"Cursor выдан для файла {file_in_token}, а не {filepath}")
+    return last_id, next_index
@@ -0,0 +1,133 @@
+# mcp/utils/parse_pool.py
+
+"""
+Модуль пула для разбора HTML вне event loop
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("process", "thread", "inline")
+
+
+class ParseExecutor:
+    """
+    Исполнитель CPU-задач (разбор HTML) в пуле процессов или потоков
+
+    Ограничивает число задач в очереди (max_pending), чтобы при массовой
+    загрузке тела страниц не копились в памяти, и ведет счетчики для
+    get_server_stats. Вид "inline" выполняет задачи прямо в event loop.
+    """
+
+    def __init__(self, kind: str = "process", workers: int | None = None, max_pending: int | None = None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Неизвестный вид пула: {kind} (допустимы: {', '.join(EXECUTOR_KINDS)})")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.waiting = 0
+        self.running = 0
+        self.peak_queue = 0
+        self._busy_seconds = 0.0
+
+    @property
+    def offloads(self) -> bool:
+        """Выполняются ли задачи вне event loop"""
+        return self.kind != "inline"
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+                logger.info(f"Запущен пул разбора HTML: {self.kind}, {self.workers} воркеров")
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполняет func(*args) в пуле и ждет результат
+
+        Для пула процессов func и аргументы должны сериализоваться pickle.
+        """
+        self.submitted += 1
+        started = time.perf_counter()
+
+        if not self.offloads:
+            try:
+                return func(*args)
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.completed += 1
+                self._busy_seconds += time.perf_counter() - started
+
+        self.waiting += 1
+        self.peak_queue = max(self.peak_queue, self.waiting + self.running)
+        queued = True
+        try:
+            async with self._get_slots():
+                self.waiting -= 1
+                queued = False
+                self.running += 1
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+                    self._busy_seconds += time.perf_counter() - started
+        finally:
+            if queued:
+                self.waiting -= 1
+
+    def shutdown(self) -> None:
+        """Останавливает пул"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает размер пула, глубину очереди и счетчики задач"""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "max_pending": self.max_pending,
+            "queued": self.waiting,
+            "running": self.running,
+            "peak_queue": self.peak_queue,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_task_ms": round(self._busy_seconds / self.completed * 1000, 2) if self.completed else 0,
+        }
@@ -4,152 +4,44 @@
 Модуль для генерации отчетов валидации
 """
 
+from __future__ import annotations
+
 import csv
+import gzip
+import html
 import json
 import logging
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
 from pathlib import Path
 from datetime import datetime
-from typing import Any
+from contextlib import ExitStack
+from collections.abc import Iterable, Iterator
+from typing import Any, TextIO
 
 logger = logging.getLogger(__name__)
 
-
-class ReportGenerator:
-    """Класс для генерации отчетов о валидации"""
-
-    def __init__(self, reports_dir: str = "reports"):
-        self.reports_dir = Path(reports_dir)
-        if not self.reports_dir.exists():
-            self.reports_dir.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Создана директория отчетов: {self.reports_dir}")
-
-    def generate_csv(self, records: list[dict[str, Any]], filename: str | None = None) -> Path:
-        """
-        Генерирует CSV отчет о валидации
-
-        Args:
-            records: Список записей валидации
-            filename: Имя файла (optional, генерируется автоматически)
-
-        Returns:
-            Путь к сохраненному отчету
-        """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"validation_report_{timestamp}.csv"
-
-        filepath = self.reports_dir / filename
-
-        logger.info(f"Генерация CSV отчета: {filepath}")
-
-        # Поля для CSV
-        fieldnames = [
-            "resource_id",
-            "validation_status",
-            "confidence",
-            "was_auto_corrected",
-            "name_match",
-            "description_match",
-            "url_relevance",
-            "key_discrepancies",
-            "current_description",
-            "suggested_description",
-            "reasoning",
-            "timestamp",
-        ]
-
-        try:
-            with filepath.open("w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for record in records:
-                    semantic = record.get("semantic_analysis", {})
-                    key_discrepancies = "; ".join(semantic.get("key_discrepancies", []))
-
-                    row = {
-                        "resource_id": record.get("resource_id", ""),
-                        "validation_status": record.get("validation_status", ""),
-                        "confidence": record.get("confidence", ""),
-                        "was_auto_corrected": record.get("was_auto_corrected", False),
-                        "name_match": semantic.get("name_match", ""),
-                        "description_match": semantic.get("description_match", ""),
-                        "url_relevance": semantic.get("url_relevance", ""),
-                        "key_discrepancies": key_discrepancies,
-                        "current_description": record.get("current_description", "").replace("\n", " ")[:200],
-                        "suggested_description": record.get("suggested_description", "").replace("\n", " ")[:200],
-                        "reasoning": record.get("reasoning", "").replace("\n", " ")[:200],
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                    writer.writerow(row)
-
-            logger.info(f"✅ CSV отчет создан: {filepath} ({len(records)} записей)")
-            return filepath
-
-        except Exception as e:
-            logger.error(f"Ошибка при генерации CSV: {e}")
-            raise
-
-    def generate_json(self, records: list[dict[str, Any]], filename: str | None = None) -> Path:
-        """
-        Генерирует JSON отчет о валидации
-
-        Args:
-            records: Список записей валидации
-            filename: Имя файла (optional, генерируется автоматически)
-
-        Returns:
-            Путь к сохраненному отчету
-        """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"validation_report_{timestamp}.json"
-
-        filepath = self.reports_dir / filename
-
-        logger.info(f"Генерация JSON отчета: {filepath}")
-
-        try:
-            report_data = {
-                "timestamp": datetime.now().isoformat(),
-                "total_records": len(records),
-                "summary": self._generate_summary(records),
-                "records": records,
-            }
-
-            with filepath.open("w", encoding="utf-8") as f:
-                json.dump(report_data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"✅ JSON отчет создан: {filepath}")
-            return filepath
-
-        except Exception as e:
-            logger.error(f"Ошибка при генерации JSON: {e}")
-            raise
-
-    def generate_html(self, records: list[dict[str, Any]], filename: str | None = None) -> Path:
-        """
-        Генерирует HTML отчет о валидации
-
-        Args:
-            records: Список записей валидации
-            filename: Имя файла (optional, генерируется автоматически)
-
-        Returns:
-            Путь к сохраненному отчету
-        """
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"validation_report_{timestamp}.html"
-
-        filepath = self.reports_dir / filename
-
-        logger.info(f"Генерация HTML отчета: {filepath}")
-
-        try:
-            summary = self._generate_summary(records)
-
-            html_content = f"""<!DOCTYPE html>
+# Поля CSV отчета
+CSV_FIELDNAMES = [
+    "resource_id",
+    "validation_status",
+    "confidence",
+    "was_auto_corrected",
+    "name_match",
+    "description_match",
+    "url_relevance",
+    "key_discrepancies",
+    "current_description",
+    "suggested_description",
+    "reasoning",
+    "timestamp",
+]
+
+# Сколько строк HTML таблицы держать в памяти, прежде чем сбросить их во временный файл
+HTML_SPOOL_SIZE = 4 * 1024 * 1024
+
+HTML_HEAD = """<!DOCTYPE html>
 <html lang="ru">
 <head>
     <meta charset="UTF-8">
@@ -233,6 +125,20 @@ class ReportGenerator:
             border-radius: 4px;
             font-weight: bold;
         }}
+        .status-needs_update {{
+            background-color: #ffe0b2;
+            color: #e65100;
+            padding: 4px 8px;
+            border-radius: 4px;
+            font-weight: bold;
+        }}
+        .status-mismatch {{
+            background-color: #ffcdd2;
+            color: #c62828;
+            padding: 4px 8px;
+            border-radius: 4px;
+            font-weight: bold;
+        }}
         .status-error {{
             background-color: #ffcdd2;
             color: #c62828;
@@ -261,19 +167,19 @@ class ReportGenerator:
 
         <div class="summary">
             <div class="stat ok">
-                <div class="stat-value">{summary["ok"]}</div>
+                <div class="stat-value">{ok}</div>
                 <div class="stat-label">ОК</div>
             </div>
             <div class="stat warning">
-                <div class="stat-value">{summary["needs_update"]}</div>
+                <div class="stat-value">{needs_update}</div>
                 <div class="stat-label">Требует обновления</div>
             </div>
             <div class="stat error">
-                <div class="stat-value">{summary["mismatch"]}</div>
+                <div class="stat-value">{mismatch}</div>
                 <div class="stat-label">Несоответствие</div>
             </div>
             <div class="stat">
-                <div class="stat-value">{summary["avg_confidence"]:.0%}</div>
+                <div class="stat-value">{avg_confidence:.0%}</div>
                 <div class="stat-label">Средняя точность</div>
             </div>
         </div>
@@ -292,54 +198,386 @@ class ReportGenerator:
             <tbody>
 """
 
-            for record in records:
-                status = record.get("validation_status", "ERROR")
-                status_class = f"status-{status.lower()}"
-
-                html_content += f"""                <tr>
-                    <td><code>{record.get("resource_id", "")}</code></td>
-                    <td><span class="{status_class}">{status}</span></td>
-                    <td>{record.get("confidence", 0):.0%}</td>
-                    <td><div class="description">{record.get("current_description", "")}</div></td>
-                    <td>{record.get("reasoning", "")}</td>
+HTML_ROW = """                <tr>
+                    <td><code>{resource_id}</code></td>
+                    <td><span class="status-{status_class}">{status}</span></td>
+                    <td>{confidence:.0%}</td>
+                    <td><div class="description">{description}</div></td>
+                    <td>{reasoning}</td>
                 </tr>
 """
 
-            html_content += (
-                """            </tbody>
+HTML_TAIL = """            </tbody>
         </table>
 
         <footer>
-            <p>Отчет создан """
-                + datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-                + """</p>
+            <p>Отчет создан {created}</p>
         </footer>
     </div>
 </body>
 </html>
 """
+
+
+class SummaryAccumulator:
+    """Сводка по записям валидации, считаемая за один проход"""
+
+    def __init__(self):
+        self.counts = {"OK": 0, "NEEDS_UPDATE": 0, "MISMATCH": 0, "ERROR": 0}
+        self.confidence_sum = 0.0
+        self.total = 0
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Учитывает запись"""
+        status = record.get("validation_status", "ERROR")
+        if status in self.counts:
+            self.counts[status] += 1
+        self.confidence_sum += record.get("confidence", 0) or 0
+        self.total += 1
+
+    def result(self) -> dict[str, Any]:
+        """Возвращает сводку: число записей по статусам, средняя уверенность и общее количество"""
+        return {
+            "ok": self.counts["OK"],
+            "needs_update": self.counts["NEEDS_UPDATE"],
+            "mismatch": self.counts["MISMATCH"],
+            "error": self.counts["ERROR"],
+            "avg_confidence": self.confidence_sum / self.total if self.total else 0,
+            "total": self.total,
+        }
+
+
+class ReportSink(ABC):
+    """
+    Базовый потоковый писатель отчета
+
+    Записи передаются по одной через write(), сводка считается по ходу
+    записи. close() дописывает отчет; при ошибке внутри with файл
+    недописанного отчета удаляется. Файлы с расширением .gz сжимаются.
+    """
+
+    def __init__(self, filepath: Path):
+        self.filepath = Path(filepath)
+        self.summary = SummaryAccumulator()
+        self._file: TextIO
+        if self.filepath.suffix == ".gz":
+            self._file = gzip.open(self.filepath, "wt", newline="", encoding="utf-8")
+        else:
+            self._file = self.filepath.open("w", newline="", encoding="utf-8")
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Добавляет запись в отчет"""
+        self.summary.add(record)
+        self._write(record)
+
+    @abstractmethod
+    def _write(self, record: dict[str, Any]) -> None:
+        """Пишет запись в файл отчета"""
+
+    def _finish(self) -> None:  # noqa: B027 - необязательный хук
+        """Дописывает окончание отчета (сводку, закрывающие теги)"""
+
+    def close(self) -> Path:
+        """Завершает отчет и закрывает файл"""
+        try:
+            self._finish()
+        finally:
+            self._file.close()
+        return self.filepath
+
+    def abort(self) -> None:
+        """Закрывает и удаляет недописанный отчет"""
+        self._file.close()
+        self.filepath.unlink(missing_ok=True)
+
+    def __enter__(self) -> ReportSink:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class CSVReportSink(ReportSink):
+    """CSV отчет: строка на запись"""
+
+    def __init__(self, filepath: Path):
+        super().__init__(filepath)
+        self._timestamp = datetime.now().isoformat()
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDNAMES)
+        self._writer.writeheader()
+
+    def _write(self, record: dict[str, Any]) -> None:
+        semantic = record.get("semantic_analysis", {})
+        self._writer.writerow(
+            {
+                "resource_id": record.get("resource_id", ""),
+                "validation_status": record.get("validation_status", ""),
+                "confidence": record.get("confidence", ""),
+                "was_auto_corrected": record.get("was_auto_corrected", False),
+                "name_match": semantic.get("name_match", ""),
+                "description_match": semantic.get("description_match", ""),
+                "url_relevance": semantic.get("url_relevance", ""),
+                "key_discrepancies": "; ".join(semantic.get("key_discrepancies", [])),
+                "current_description": record.get("current_description", "").replace("\n", " ")[:200],
+                "suggested_description": record.get("suggested_description", "").replace("\n", " ")[:200],
+                "reasoning": record.get("reasoning", "").replace("\n", " ")[:200],
+                "timestamp": self._timestamp,
+            }
+        )
+
+
+class JSONReportSink(ReportSink):
+    """
+    JSON отчет: записи пишутся по мере поступления, сводка — в конце
+
+    Структура: {"timestamp", "records": [...], "total_records", "summary"}.
+    """
+
+    def __init__(self, filepath: Path):
+        super().__init__(filepath)
+        self._file.write(f'{{\n  "timestamp": {json.dumps(datetime.now().isoformat())},\n  "records": [')
+
+    def _write(self, record: dict[str, Any]) -> None:
+        encoded = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+        self._file.write(f"{',' if self.summary.total > 1 else ''}\n    {encoded}")
+
+    def _finish(self) -> None:
+        summary = json.dumps(self.summary.result(), ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        closing = "\n  ]" if self.summary.total else "]"
+        self._file.write(f'{closing},\n  "total_records": {self.summary.total},\n  "summary": {summary}\n}}\n')
+
+
+class HTMLReportSink(ReportSink):
+    """
+    HTML отчет
+
+    Сводка выводится над таблицей, но известна только после всех записей,
+    поэтому строки таблицы копятся во временном файле (в памяти, пока не
+    превысят HTML_SPOOL_SIZE) и переносятся в отчет при закрытии.
+    """
+
+    def __init__(self, filepath: Path):
+        super().__init__(filepath)
+        self._rows = tempfile.SpooledTemporaryFile(HTML_SPOOL_SIZE, mode="w+", encoding="utf-8")
+
+    def _write(self, record: dict[str, Any]) -> None:
+        status = str(record.get("validation_status", "ERROR"))
+        self._rows.write(
+            HTML_ROW.format(
+                resource_id=html.escape(str(record.get("resource_id", ""))),
+                status_class=html.escape(status.lower()),
+                status=html.escape(status),
+                confidence=record.get("confidence", 0) or 0,
+                description=html.escape(str(record.get("current_description", ""))),
+                reasoning=html.escape(str(record.get("reasoning", ""))),
             )
+        )
+
+    def _finish(self) -> None:
+        self._file.write(HTML_HEAD.format(**self.summary.result()))
+        self._rows.seek(0)
+        shutil.copyfileobj(self._rows, self._file)
+        self._file.write(HTML_TAIL.format(created=datetime.now().strftime("%d.%m.%Y %H:%M:%S")))
+
+    def close(self) -> Path:
+        try:
+            return super().close()
+        finally:
+            self._rows.close()
+
+    def abort(self) -> None:
+        self._rows.close()
+        super().abort()
+
+
+class ReportGenerator:
+    """Класс для генерации отчетов о валидации"""
+
+    SINKS = {"csv": CSVReportSink, "json": JSONReportSink, "html": HTMLReportSink}
+
+    def __init__(self, reports_dir: str = "reports"):
+        self.reports_dir = Path(reports_dir)
+        if not self.reports_dir.exists():
+            self.reports_dir.mkdir(parents=True, exist_ok=True)
+            logger.info(f"Создана директория отчетов: {self.reports_dir}")
+
+    def open_sink(self, fmt: str, filename: str | None = None, compress: bool = False) -> ReportSink:
+        """
+        Открывает потоковый писатель отчета
+
+        Args:
+            fmt: Формат: "csv", "json" или "html"
+            filename: Имя файла (optional, генерируется автоматически)
+            compress: Сжимать отчет gzip (к имени добавляется .gz)
+
+        Returns:
+            Писатель отчета (поддерживает with)
+
+        Raises:
+            ValueError: Если формат не поддерживается
+        """
+        if fmt not in self.SINKS:
+            raise ValueError(f"Неизвестный формат отчета: {fmt}")
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"validation_report_{timestamp}.{fmt}"
+        if compress and not filename.endswith(".gz"):
+            filename += ".gz"
+        return self.SINKS[fmt](self.reports_dir / filename)
+
+    def generate_many(
+        self,
+        records: Iterable[dict[str, Any]],
+        formats: list[str],
+        basename: str | None = None,
+        compress: bool = False,
+    ) -> tuple[dict[str, Path], dict[str, Any]]:
+        """
+        Пишет записи сразу в несколько форматов за один проход
+
+        Args:
+            records: Записи валидации (список или итератор)
+            formats: Форматы: "csv", "json", "html"
+            basename: Имя отчетов без расширения (optional, генерируется автоматически)
+            compress: Сжимать отчеты gzip
+
+        Returns:
+            (формат -> путь к отчету, сводка по записям)
+
+        Raises:
+            ValueError: Если формат не поддерживается или не указан ни один формат
+        """
+        if not formats:
+            raise ValueError("Не указан ни один формат отчета")
+        unknown = [fmt for fmt in formats if fmt not in self.SINKS]
+        if unknown:
+            raise ValueError(f"Неизвестные форматы отчета: {', '.join(unknown)}")
+        basename = basename or f"validation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-            with filepath.open("w", encoding="utf-8") as f:
-                f.write(html_content)
+        try:
+            with ExitStack() as stack:
+                sinks = [stack.enter_context(self.open_sink(fmt, f"{basename}.{fmt}", compress)) for fmt in formats]
+                logger.info(f"Генерация отчетов {', '.join(formats)}: {basename}")
+                for record in records:
+                    for sink in sinks:
+                        sink.write(record)
+        except Exception as e:
+            logger.error(f"Ошибка при генерации отчетов: {e}")
+            raise
 
-            logger.info(f"✅ HTML отчет создан: {filepath}")
-            return filepath
+        paths = {fmt: sink.filepath for fmt, sink in zip(formats, sinks, strict=True)}
+        summary = sinks[0].summary.result()
+        logger.info(f"✅ Отчеты созданы: {', '.join(str(p) for p in paths.values())} ({summary['total']} записей)")
+        return paths, summary
 
+    def _generate(self, fmt: str, records: Iterable[dict[str, Any]], filename: str | None) -> Path:
+        """Пишет записи в отчет заданного формата за один проход"""
+        try:
+            with self.open_sink(fmt, filename) as sink:
+                logger.info(f"Генерация {fmt.upper()} отчета: {sink.filepath}")
+                for record in records:
+                    sink.write(record)
+            logger.info(f"✅ {fmt.upper()} отчет создан: {sink.filepath} ({sink.summary.total} записей)")
+            return sink.filepath
         except Exception as e:
-            logger.error(f"Ошибка при генерации HTML: {e}")
+            logger.error(f"Ошибка при генерации {fmt.upper()}: {e}")
             raise
 
-    def _generate_summary(self, records: list[dict[str, Any]]) -> dict[str, Any]:
-        """Генерирует сводку по записям"""
-        statuses = [r.get("validation_status", "ERROR") for r in records]
-        confidences = [r.get("confidence", 0) for r in records]
+    def generate_csv(self, records: Iterable[dict[str, Any]], filename: str | None = None) -> Path:
+        """
+        Генерирует CSV отчет о валидации
 
-        return {
-            "ok": sum(1 for s in statuses if s == "OK"),
-            "needs_update": sum(1 for s in statuses if s == "NEEDS_UPDATE"),
-            "mismatch": sum(1 for s in statuses if s == "MISMATCH"),
-            "error": sum(1 for s in statuses if s == "ERROR"),
-            "avg_confidence": sum(confidences) / len(confidences) if confidences else 0,
-            "total": len(records),
-        }
+        Args:
+            records: Записи валидации (список или итератор)
+            filename: Имя файла (optional, генерируется автоматически)
+
+        Returns:
+            Путь к сохраненному отчету
+        """
+        return self._generate("csv", records, filename)
+
+    def generate_json(self, records: Iterable[dict[str, Any]], filename: str | None = None) -> Path:
+        """
+        Генерирует JSON отчет о валидации
+
+        Args:
+            records: Записи валидации (список или итератор)
+            filename: Имя файла (optional, генерируется автоматически)
+
+        Returns:
+            Путь к сохраненному отчету
+        """
+        return self._generate("json", records, filename)
+
+    def generate_html(self, records: Iterable[dict[str, Any]], filename: str | None = None) -> Path:
+        """
+        Генерирует HTML отчет о валидации
+
+        Args:
+            records: Записи валидации (список или итератор)
+            filename: Имя файла (optional, генерируется автоматически)
+
+        Returns:
+            Путь к сохраненному отчету
+        """
+        return self._generate("html", records, filename)
+
+    def summarize(self, records: Iterable[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Возвращает сводку по записям в том виде, как она попадает в JSON отчет
+
+        Args:
+            records: Записи валидации (список или итератор)
+
+        Returns:
+            Число записей по статусам, средняя уверенность и общее количество
+        """
+        summary = SummaryAccumulator()
+        for record in records:
+            summary.add(record)
+        return summary.result()
+
+
+def read_records(path: str | Path) -> Iterator[dict[str, Any]]:
+    """
+    Читает записи валидации из файла
+
+    Поддерживаются JSONL (.jsonl, .ndjson — читаются построчно) и JSON
+    (.json: массив записей, одна запись или JSON отчет с полем records),
+    в том числе сжатые gzip (.gz).
+
+    Args:
+        path: Путь к файлу
+
+    Yields:
+        Записи валидации
+
+    Raises:
+        ValueError: Если формат файла не поддерживается
+        json.JSONDecodeError: Если файл содержит некорректный JSON
+    """
+    path = Path(path)
+    suffixes = path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]
+    kind = suffixes[0] if suffixes else ""
+
+    def _open() -> TextIO:
+        if path.suffix == ".gz":
+            return gzip.open(path, "rt", encoding="utf-8")
+        return path.open("r", encoding="utf-8")
+
+    if kind in (".jsonl", ".ndjson"):
+        with _open() as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif kind == ".json":
+        with _open() as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("records", [data])
+        yield from data
+    else:
+        raise ValueError(f"Неподдерживаемый формат файла записей: {path.name} (ожидается .json или .jsonl)")
@@ -0,0 +1,208 @@
+# mcp/utils/resource_merge.py
+
+"""
+Модуль объединения ресурсов: потоковое чтение исходных файлов и
+разрешение конфликтов по ID
+"""
+
+import json
+import logging
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Размер блока потокового чтения JSON массива (символов)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Политики разрешения конфликтов для ресурсов с уже существующим ID:
+#   keep — оставить существующий ресурс (добавляются только новые ID)
+#   overwrite — заменить ресурс входящим целиком
+#   newest — объединить по полям, значение берется из более новой версии
+MERGE_POLICIES = ("keep", "overwrite", "newest")
+
+# Пользовательская политика: (существующий, входящий) -> итоговый ресурс (None — оставить существующий)
+Resolver = Callable[[dict[str, Any], dict[str, Any]], dict[str, Any] | None]
+
+_WHITESPACE = " \t\r\n"
+_MISSING = object()
+
+
+def iter_json_array(path: Path, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Потоково читает элементы JSON массива верхнего уровня
+
+    Файл читается блоками, элементы разбираются по одному через
+    JSONDecoder.raw_decode, поэтому в памяти одновременно находятся только
+    текущий блок и текущий элемент.
+
+    Raises:
+        json.JSONDecodeError: Если файл не является корректным JSON массивом
+    """
+    decoder = json.JSONDecoder()
+    with path.open(encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_char() -> str:
+            """Первый значимый символ с позиции pos ("" — конец файла)"""
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return ""
+
+        if next_char() != "[":
+            raise json.JSONDecodeError("Ожидается JSON массив", buffer, pos)
+        pos += 1
+        if next_char() == "]":
+            pos += 1
+        else:
+            while True:
+                next_char()
+                while True:
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if fill():
+                            continue
+                        raise
+                    # Значение принимается, когда за ним виден разделитель: число
+                    # на границе блока ("1." + "5") может продолжаться в следующем
+                    following = buffer[end:].lstrip(_WHITESPACE)[:1]
+                    if following not in (",", "]") and fill():
+                        continue
+                    break
+                pos = end
+                yield item
+
+                separator = next_char()
+                pos += 1
+                if separator == "]":
+                    break
+                if separator != ",":
+                    raise json.JSONDecodeError("Ожидается ',' или ']'", buffer, pos - 1)
+
+        if next_char():
+            raise json.JSONDecodeError("Лишние данные после массива", buffer, pos)
+
+
+def iter_resources(path: Path) -> Iterator[Any]:
+    """
+    Потоково читает ресурсы файла: JSON массив или JSON Lines (.jsonl, .ndjson)
+
+    Raises:
+        FileNotFoundError: Если файл не найден
+        json.JSONDecodeError: Если JSON некорректен
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Файл не найден: {path}")
+    if path.suffix not in (".jsonl", ".ndjson"):
+        yield from iter_json_array(path)
+        return
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _deep_update(base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
+    """
+    Новый словарь: значения overlay поверх base, вложенные объекты объединяются
+
+    Неизмененные значения не копируются, а разделяются с исходными
+    версиями — ресурсы никогда не изменяются на месте.
+    """
+    result = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _deep_update(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def version_time(resource: dict[str, Any], fallback: float, timestamp_field: str | None) -> float:
+    """Время версии ресурса: ISO дата из timestamp_field или fallback (mtime файла)"""
+    value = resource.get(timestamp_field) if timestamp_field else None
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return fallback
+
+
+def resolve_conflict(
+    existing: dict[str, Any],
+    incoming: dict[str, Any],
+    policy: str | Resolver,
+    existing_time: float = 0.0,
+    incoming_time: float = 0.0,
+) -> dict[str, Any]:
+    """
+    Разрешает конфликт двух версий ресурса с одним ID
+
+    Args:
+        existing: Версия в целевом файле
+        incoming: Версия из исходного файла
+        policy: Политика из MERGE_POLICIES или функция (existing, incoming) -> ресурс | None
+        existing_time: Время версии existing (для newest)
+        incoming_time: Время версии incoming (для newest; при равенстве побеждает incoming)
+
+    Returns:
+        Итоговый ресурс (existing, если менять нечего)
+
+    Raises:
+        ValueError: Если политика неизвестна
+    """
+    if callable(policy):
+        resolved = policy(existing, incoming)
+        return existing if resolved is None else resolved
+    if policy == "keep":
+        return existing
+    if policy == "overwrite":
+        return incoming
+    if policy == "newest":
+        if incoming_time >= existing_time:
+            return _deep_update(existing, incoming)
+        return _deep_update(incoming, existing)
+    raise ValueError(f"Неизвестная политика объединения: {policy} (допустимо: {', '.join(MERGE_POLICIES)})")
+
+
+def field_diff(old: dict[str, Any], new: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """
+    Изменения верхнего уровня между версиями ресурса
+
+    Returns:
+        Поле -> {"old": ..., "new": ...}; ключ отсутствует, если поля не было
+        в соответствующей версии
+    """
+    diff = {}
+    for field in dict.fromkeys([*old, *new]):
+        if old.get(field, _MISSING) != new.get(field, _MISSING):
+            change = {}
+            if field in old:
+                change["old"] = old[field]
+            if field in new:
+                change["new"] = new[field]
+            diff[field] = change
+    return diff
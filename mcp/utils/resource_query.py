@@ -0,0 +1,213 @@
+# mcp/utils/resource_query.py
+
+"""
+Модуль запросов к ресурсам всех ВУЗов по вторичным индексам
+"""
+
+import logging
+import threading
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from .dates import parse_date_range
+from .pagination import get_path
+
+logger = logging.getLogger(__name__)
+
+# Файлы ресурсов внутри data_dir
+RESOURCE_GLOB = "universities/*/*.json"
+
+# Поля с точным совпадением значения: имя индекса -> путь в ресурсе
+TERM_FIELDS = {
+    "type": "type",
+    "format": "format",
+    "target_audience": "targetAudience",
+    "bvi": "benefits.bvi",
+}
+
+# Интервалы дат, по которым можно фильтровать
+DATE_FIELDS = {
+    "registration": "dates.registration",
+    "event": "dates.event",
+}
+
+Key = tuple[str, int]
+
+
+def _normalize(value: Any) -> Any:
+    """Приводит строковые значения к виду для сравнения"""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+class ResourceQuery:
+    """
+    Вторичные индексы по ресурсам data_dir/universities/*/*.json
+
+    Ключ записи — (путь к файлу, позиция). Индексы по university,
+    category (имя файла: olympiads, courses, ...), type, format,
+    targetAudience и benefits.bvi хранят множества ключей; даты
+    регистрации и события хранятся разобранными интервалами. Перед
+    каждым запросом измененные файлы (по mtime/size) переиндексируются.
+    """
+
+    def __init__(self, json_handler: Any):
+        self.json_handler = json_handler
+        self._signatures: dict[str, tuple[int, int]] = {}
+        self._file_keys: dict[str, list[Key]] = {}
+        self._records: dict[Key, dict[str, Any]] = {}
+        # Обратная ссылка ключ -> (индекс, значение) для быстрого удаления
+        self._key_terms: dict[Key, list[tuple[str, Any]]] = {}
+        self._terms: dict[str, dict[Any, set[Key]]] = {
+            name: {} for name in ("university", "category", *TERM_FIELDS)
+        }
+        self._ranges: dict[str, dict[Key, tuple[date, date]]] = {name: {} for name in DATE_FIELDS}
+        # Запросы выполняются из потоков инструментов сервера
+        self._lock = threading.RLock()
+
+    def _add_term(self, name: str, value: Any, key: Key) -> None:
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if item is None or isinstance(item, (dict, list)):
+                continue
+            term = _normalize(item)
+            self._terms[name].setdefault(term, set()).add(key)
+            self._key_terms.setdefault(key, []).append((name, term))
+
+    def _remove_file(self, relpath: str) -> None:
+        for key in self._file_keys.pop(relpath, []):
+            self._records.pop(key, None)
+            for name, value in self._key_terms.pop(key, []):
+                keys = self._terms[name].get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._terms[name][value]
+            for ranges in self._ranges.values():
+                ranges.pop(key, None)
+        self._signatures.pop(relpath, None)
+
+    def _index_file(self, relpath: str, signature: tuple[int, int]) -> None:
+        self._remove_file(relpath)
+        try:
+            data = self.json_handler.read_file(relpath)
+        except Exception as e:
+            logger.warning(f"Запрос: не удалось прочитать {relpath}: {e}")
+            return
+
+        parts = Path(relpath).parts
+        university, category = parts[1], Path(relpath).stem
+        keys = []
+        for position, resource in enumerate(data):
+            if not isinstance(resource, dict) or "id" not in resource:
+                continue
+            key = (relpath, position)
+            keys.append(key)
+            self._records[key] = resource
+            self._add_term("university", university, key)
+            self._add_term("category", category, key)
+            for name, path in TERM_FIELDS.items():
+                self._add_term(name, get_path(resource, path), key)
+            for name, path in DATE_FIELDS.items():
+                interval = parse_date_range(get_path(resource, path))
+                if interval is not None:
+                    self._ranges[name][key] = interval
+
+        self._file_keys[relpath] = keys
+        self._signatures[relpath] = signature
+
+    def refresh(self) -> int:
+        """
+        Переиндексирует добавленные, измененные и удаленные файлы
+
+        Returns:
+            Количество переиндексированных файлов
+        """
+        with self._lock:
+            data_dir = self.json_handler.data_dir
+            current = {}
+            for path in data_dir.glob(RESOURCE_GLOB):
+                if path.name == "index.json":
+                    continue
+                stat = path.stat()
+                current[path.relative_to(data_dir).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+
+            changed = 0
+            for relpath in set(self._signatures) - set(current):
+                self._remove_file(relpath)
+                changed += 1
+            for relpath, signature in current.items():
+                if self._signatures.get(relpath) != signature:
+                    self._index_file(relpath, signature)
+                    changed += 1
+
+            if changed:
+                logger.info(f"Индексы запросов: переиндексировано {changed} файлов, {len(self._records)} ресурсов")
+            return changed
+
+    def query(
+        self,
+        terms: dict[str, list[Any]] | None = None,
+        date_windows: dict[str, tuple[date | None, date | None]] | None = None,
+    ) -> list[tuple[Key, dict[str, Any]]]:
+        """
+        Выполняет запрос: значения внутри одного поля объединяются по ИЛИ, поля — по И
+
+        Args:
+            terms: {"university": ["hse"], "format": ["онлайн"], "bvi": [True], ...}
+            date_windows: {"registration": (с, по), "event": (с, по)} — интервал
+                ресурса должен пересекаться с окном; None — открытая граница
+
+        Returns:
+            Список (ключ, ресурс) в порядке файлов и позиций
+
+        Raises:
+            ValueError: Если указан неизвестный индекс
+        """
+        with self._lock:
+            self.refresh()
+
+            candidates: set[Key] | None = None
+            for name, values in (terms or {}).items():
+                if name not in self._terms:
+                    raise ValueError(f"Неизвестное поле запроса: {name}")
+                matched: set[Key] = set()
+                for value in values:
+                    matched |= self._terms[name].get(_normalize(value), set())
+                candidates = matched if candidates is None else candidates & matched
+
+            for name, (start, end) in (date_windows or {}).items():
+                if name not in self._ranges:
+                    raise ValueError(f"Неизвестное поле дат: {name}")
+                ranges = self._ranges[name]
+                pool = ranges.keys() if candidates is None else candidates & ranges.keys()
+                candidates = {
+                    key
+                    for key in pool
+                    if (end is None or ranges[key][0] <= end) and (start is None or ranges[key][1] >= start)
+                }
+
+            keys = self._records.keys() if candidates is None else candidates
+            return [(key, self._records[key]) for key in sorted(keys)]
+
+    @staticmethod
+    def counts(results: list[tuple[Key, dict[str, Any]]]) -> dict[str, dict[str, int]]:
+        """Считает результаты по ВУЗам и категориям"""
+        by_university: Counter[str] = Counter()
+        by_category: Counter[str] = Counter()
+        for (relpath, _), _resource in results:
+            parts = Path(relpath).parts
+            by_university[parts[1]] += 1
+            by_category[Path(relpath).stem] += 1
+        return {"by_university": dict(by_university), "by_category": dict(by_category)}
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает размер индексов"""
+        with self._lock:
+            return {
+                "files": len(self._signatures),
+                "resources": len(self._records),
+                "terms": {name: len(index) for name, index in self._terms.items()},
+                "date_ranges": {name: len(ranges) for name, ranges in self._ranges.items()},
+            }
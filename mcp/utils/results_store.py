@@ -0,0 +1,478 @@
+# mcp/utils/results_store.py
+
+"""
+Модуль хранилища истории результатов валидации (все записи всех запусков)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .id_index import IdIndex
+
+logger = logging.getLogger(__name__)
+
+# Сколько записей накапливать перед вставкой одной транзакцией
+INSERT_BATCH = 1000
+
+# Тяжесть статусов: регрессия — переход к более тяжелому статусу
+STATUS_RANK = {"OK": 0, "NEEDS_UPDATE": 1, "ERROR": 1, "MISMATCH": 2}
+
+# Поля, по которым можно группировать агрегаты
+GROUP_FIELDS = ("status", "university", "run_id", "file")
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+
+
+class RunRecorder:
+    """
+    Запись одного запуска валидации в хранилище
+
+    Записи добавляются по одной (add) или по ходу итерации (track) и
+    вставляются пачками по INSERT_BATCH. При ошибке внутри with запуск
+    удаляется целиком, чтобы в истории не оставалось неполных запусков.
+    """
+
+    def __init__(self, store: ResultsStore, run_id: int):
+        self.store = store
+        self.run_id = run_id
+        self.total = 0
+        self._rows: list[tuple] = []
+        # resource_id -> ВУЗ по индексу ID: строится один раз за запуск при первой записи без file
+        self._universities: dict[str, str | None] | None = None
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Добавляет запись валидации в запуск"""
+        resource_id = str(record.get("resource_id", ""))
+        file = record.get("file")
+        if file:
+            university = IdIndex.university_of(file)
+        else:
+            if self._universities is None:
+                self._universities = self.store.universities()
+            university = self._universities.get(resource_id)
+
+        confidence = record.get("confidence")
+        self._rows.append(
+            (
+                self.run_id,
+                resource_id,
+                university,
+                file,
+                record.get("validation_status", "ERROR"),
+                float(confidence) if isinstance(confidence, (int, float)) else None,
+                json.dumps(record, ensure_ascii=False),
+            )
+        )
+        self.total += 1
+        if len(self._rows) >= INSERT_BATCH:
+            self._flush()
+
+    def track(self, records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Передает записи дальше (например, писателям отчетов), попутно сохраняя их"""
+        for record in records:
+            self.add(record)
+            yield record
+
+    def _flush(self) -> None:
+        if self._rows:
+            self.store._insert(self._rows)
+            self._rows = []
+
+    def close(self) -> None:
+        """Дописывает оставшиеся записи и фиксирует число записей запуска"""
+        self._flush()
+        self.store._finish_run(self.run_id, self.total)
+        logger.info(f"✅ Запуск {self.run_id} сохранен в истории: {self.total} записей")
+
+    def abort(self) -> None:
+        """Удаляет недописанный запуск"""
+        self._rows = []
+        self.store._delete_run(self.run_id)
+
+    def __enter__(self) -> RunRecorder:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ResultsStore:
+    """
+    Append-only хранилище записей валидации на SQLite
+
+    Каждый запуск (сохранение отчета, проверка дат, инкрементальная
+    валидация) получает run_id; его записи индексируются по ID ресурса,
+    ВУЗу, статусу и запуску. ВУЗ берется из поля file записи или по
+    индексу ID ресурсов. При завершении запуска его записи сворачиваются
+    в таблицу rollup (число и сумма уверенности по ВУЗу, файлу и статусу),
+    поэтому агрегаты и динамика по всей истории читают сотни строк, а не
+    все записи. Регрессии между запусками считаются по индексу run_id.
+    """
+
+    def __init__(self, path: str, id_index: IdIndex | None = None):
+        self.path = Path(path)
+        self.id_index = id_index
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                total INTEGER,
+                finished INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                run_id INTEGER NOT NULL,
+                resource_id TEXT NOT NULL,
+                university TEXT,
+                file TEXT,
+                status TEXT NOT NULL,
+                confidence REAL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_run ON records (run_id, status);
+            CREATE INDEX IF NOT EXISTS records_resource ON records (resource_id, run_id);
+            CREATE INDEX IF NOT EXISTS records_university ON records (university, run_id, status);
+            CREATE INDEX IF NOT EXISTS records_status ON records (status, run_id);
+            CREATE TABLE IF NOT EXISTS rollup (
+                run_id INTEGER NOT NULL,
+                university TEXT,
+                file TEXT,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                confidence_sum REAL,
+                confidence_count INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS rollup_run ON rollup (run_id);
+            CREATE INDEX IF NOT EXISTS rollup_university ON rollup (university, run_id);
+            """
+        )
+        self._conn.commit()
+
+    # ---------- запись ----------
+
+    def open_run(self, source: str) -> RunRecorder:
+        """
+        Начинает новый запуск
+
+        Args:
+            source: Откуда записи (инструмент и имя отчета)
+
+        Returns:
+            RunRecorder (поддерживает with)
+        """
+        with self._lock:
+            cursor = self._conn.execute("INSERT INTO runs (created_at, source) VALUES (?, ?)", (time.time(), source))
+            self._conn.commit()
+        return RunRecorder(self, cursor.lastrowid)
+
+    def record_run(self, records: Iterable[dict[str, Any]], source: str) -> int:
+        """Сохраняет записи одним запуском; возвращает run_id"""
+        with self.open_run(source) as run:
+            for record in records:
+                run.add(record)
+        return run.run_id
+
+    def universities(self) -> dict[str, str | None]:
+        """ВУЗы ресурсов по индексу ID: ID -> ВУЗ (None — ресурс есть в нескольких ВУЗах)"""
+        return self.id_index.universities() if self.id_index is not None else {}
+
+    def _insert(self, rows: list[tuple]) -> None:
+        with self._lock:
+            self._conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def _finish_run(self, run_id: int, total: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO rollup"
+                " SELECT run_id, university, file, status, COUNT(*), SUM(confidence), COUNT(confidence)"
+                " FROM records WHERE run_id = ? GROUP BY university, file, status",
+                (run_id,),
+            )
+            self._conn.execute("UPDATE runs SET total = ?, finished = 1 WHERE run_id = ?", (total, run_id))
+            self._conn.commit()
+
+    def _delete_run(self, run_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM records WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM rollup WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+    # ---------- запросы ----------
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def runs(self, limit: int = 20, university: str | None = None) -> list[dict[str, Any]]:
+        """
+        Последние запуски (новые первыми)
+
+        Args:
+            limit: Сколько запусков вернуть
+            university: Только запуски с записями этого ВУЗа
+
+        Returns:
+            [{"run_id", "created_at", "source", "total"}]
+        """
+        sql = "SELECT run_id, created_at, source, total FROM runs WHERE finished = 1"
+        params: list[Any] = []
+        if university:
+            sql += " AND run_id IN (SELECT DISTINCT run_id FROM records WHERE university = ?)"
+            params.append(university)
+        sql += " ORDER BY run_id DESC LIMIT ?"
+        params.append(limit)
+        return [
+            {"run_id": run_id, "created_at": _iso(created_at), "source": source, "total": total}
+            for run_id, created_at, source, total in self._query(sql, params)
+        ]
+
+    def aggregate(
+        self,
+        group_by: list[str] | None = None,
+        university: str | None = None,
+        status: str | None = None,
+        run_id: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Число записей и средняя уверенность по группам
+
+        Args:
+            group_by: Поля группировки из GROUP_FIELDS (default: ["status"])
+            university: Фильтр по ВУЗу
+            status: Фильтр по статусу
+            run_id: Фильтр по запуску
+            since: Только запуски не раньше этого времени (timestamp)
+            until: Только запуски раньше этого времени (timestamp)
+
+        Returns:
+            [{<поля группировки>, "count", "avg_confidence"}], по убыванию count
+
+        Raises:
+            ValueError: Если поле группировки не поддерживается
+        """
+        group_by = group_by or ["status"]
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Неизвестные поля группировки: {', '.join(unknown)} (доступны: {', '.join(GROUP_FIELDS)})"
+            )
+
+        where, params = self._filters(university, status, run_id, since, until)
+        columns = ", ".join(f"r.{field}" for field in group_by)
+        # Столбцы — только из белого списка GROUP_FIELDS, условия — из _filters с параметрами
+        rows = self._query(
+            f"SELECT {columns}, SUM(r.count), SUM(r.confidence_sum) / SUM(r.confidence_count)"  # noqa: S608
+            f" FROM rollup r JOIN runs USING (run_id) WHERE {where} GROUP BY {columns} ORDER BY SUM(r.count) DESC",
+            params,
+        )
+        results = []
+        for row in rows:
+            item = dict(zip(group_by, row[: len(group_by)], strict=True))
+            item["count"] = row[-2]
+            item["avg_confidence"] = round(row[-1], 3) if row[-1] is not None else None
+            results.append(item)
+        return results
+
+    def trend(
+        self,
+        status: str = "MISMATCH",
+        university: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """
+        Доля записей со статусом по запускам (старые первыми)
+
+        Args:
+            status: Статус, долю которого считать
+            university: Фильтр по ВУЗу
+            since: Только запуски не раньше этого времени (timestamp)
+            until: Только запуски раньше этого времени (timestamp)
+            limit: Сколько последних запусков вернуть
+
+        Returns:
+            [{"run_id", "created_at", "source", "total", "count", "rate", "avg_confidence"}]
+        """
+        where, params = self._filters(university, None, None, since, until)
+        # Условия — из _filters с параметрами, значения в SQL не подставляются
+        rows = self._query(
+            "SELECT run_id, runs.created_at, runs.source, SUM(r.count), SUM(IIF(r.status = ?, r.count, 0)),"  # noqa: S608
+            " SUM(r.confidence_sum) / SUM(r.confidence_count)"
+            f" FROM rollup r JOIN runs USING (run_id) WHERE {where}"
+            " GROUP BY run_id ORDER BY run_id DESC LIMIT ?",
+            [status, *params, limit],
+        )
+        return [
+            {
+                "run_id": run_id,
+                "created_at": _iso(created_at),
+                "source": source,
+                "total": total,
+                "count": count,
+                "rate": round(count / total, 4) if total else 0,
+                "avg_confidence": round(avg, 3) if avg is not None else None,
+            }
+            for run_id, created_at, source, total, count, avg in reversed(rows)
+        ]
+
+    def regressions(
+        self, run_id: int | None = None, base_run_id: int | None = None, university: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Сравнивает статусы ресурсов в двух запусках
+
+        Args:
+            run_id: Запуск (default: последний)
+            base_run_id: С каким запуском сравнивать (default: предыдущий, где есть эти же ресурсы)
+            university: Фильтр по ВУЗу
+
+        Returns:
+            {"run_id", "base_run_id", "regressed": [...], "improved": [...], "changed": [...],
+            "unchanged", "new", "removed"}; changed — смена статуса той же тяжести
+            (ERROR <-> NEEDS_UPDATE); элемент списков — {"resource_id", "university",
+            "file", "from", "to", "confidence", "reasoning"}
+
+        Raises:
+            ValueError: Если запусков для сравнения недостаточно
+        """
+        if run_id is None:
+            latest = self.runs(1, university)
+            if not latest:
+                raise ValueError("В истории нет запусков")
+            run_id = latest[0]["run_id"]
+
+        current = self._run_statuses(run_id, university)
+        if base_run_id is None:
+            base_run_id = self._previous_run(run_id, list(current), university)
+            if base_run_id is None:
+                raise ValueError(f"Нет предыдущего запуска для сравнения с запуском {run_id}")
+        base = self._run_statuses(base_run_id, university)
+
+        regressed, improved, changed = [], [], []
+        unchanged = 0
+        for key, (status, confidence, file) in current.items():
+            if key not in base:
+                continue
+            before = base[key][0]
+            if before == status:
+                unchanged += 1
+                continue
+            change = {
+                "resource_id": key[0],
+                "university": key[1],
+                "file": file,
+                "from": before,
+                "to": status,
+                "confidence": confidence,
+            }
+            rank, before_rank = STATUS_RANK.get(status, 1), STATUS_RANK.get(before, 1)
+            if rank > before_rank:
+                regressed.append(change)
+            elif rank < before_rank:
+                improved.append(change)
+            else:
+                changed.append(change)
+
+        # Полные записи нужны только для изменившихся ресурсов
+        differing = regressed + improved + changed
+        reasoning = self._reasoning(run_id, [change["resource_id"] for change in differing])
+        for change in differing:
+            change["reasoning"] = reasoning.get(change["resource_id"], "")
+
+        return {
+            "run_id": run_id,
+            "base_run_id": base_run_id,
+            "regressed": regressed,
+            "improved": improved,
+            "changed": changed,
+            "unchanged": unchanged,
+            "new": sum(1 for key in current if key not in base),
+            "removed": sum(1 for key in base if key not in current),
+        }
+
+    def _run_statuses(self, run_id: int, university: str | None) -> dict[tuple[str, str | None], tuple]:
+        """(resource_id, ВУЗ) -> (статус, уверенность, файл) для запуска"""
+        sql = "SELECT resource_id, university, status, confidence, file FROM records WHERE run_id = ?"
+        params: list[Any] = [run_id]
+        if university:
+            sql += " AND university = ?"
+            params.append(university)
+        return {
+            (resource_id, uni): (status, confidence, file)
+            for resource_id, uni, status, confidence, file in self._query(sql, params)
+        }
+
+    def _reasoning(self, run_id: int, resource_ids: list[str]) -> dict[str, str]:
+        """resource_id -> reasoning записи запуска"""
+        if not resource_ids:
+            return {}
+        rows = self._query(
+            "SELECT resource_id, record FROM records"
+            " WHERE run_id = ? AND resource_id IN (SELECT value FROM json_each(?))",
+            [run_id, json.dumps(sorted(set(resource_ids)))],
+        )
+        return {resource_id: json.loads(record).get("reasoning", "") for resource_id, record in rows}
+
+    def _previous_run(self, run_id: int, keys: list[tuple[str, str | None]], university: str | None) -> int | None:
+        """Последний запуск до run_id, в котором есть хотя бы один из ресурсов"""
+        ids = sorted({resource_id for resource_id, _ in keys})
+        if not ids:
+            return None
+        # Незавершенные запуски (прерванные или идущие в другом процессе) не учитываются
+        sql = (
+            "SELECT MAX(run_id) FROM records JOIN runs USING (run_id)"
+            " WHERE finished = 1 AND run_id < ? AND resource_id IN (SELECT value FROM json_each(?))"
+        )
+        params: list[Any] = [run_id, json.dumps(ids)]
+        if university:
+            sql += " AND university = ?"
+            params.append(university)
+        return self._query(sql, params)[0][0]
+
+    @staticmethod
+    def _filters(
+        university: str | None, status: str | None, run_id: int | None, since: float | None, until: float | None
+    ) -> tuple[str, list[Any]]:
+        """Условие WHERE для записей (алиас r) и запусков"""
+        clauses, params = ["runs.finished = 1"], []
+        for clause, value in (
+            ("r.university = ?", university),
+            ("r.status = ?", status),
+            ("r.run_id = ?", run_id),
+            ("runs.created_at >= ?", since),
+            ("runs.created_at < ?", until),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает число запусков и записей"""
+        runs, records = self._query("SELECT (SELECT COUNT(*) FROM runs), (SELECT COUNT(*) FROM records)")[0]
+        return {"runs": runs, "records": records, "path": str(self.path)}
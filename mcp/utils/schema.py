@@ -0,0 +1,411 @@
+# mcp/utils/schema.py
+
+"""
+Модуль проверки структуры ресурсов по модели данных (docs/модель_данных.md)
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Значения из раздела "Примеры значений" модели данных
+FORMAT_VALUES = ("очно", "онлайн", "выездное", "смешанное_очно_онлайн", "очно_выездное")
+REGIONALITY_VALUES = ("москва", "москва_и_подмосковье", "вся_россия", "онлайн_из_любого_региона", "москва_и_онлайн")
+# Фильтр стоимости на сайте (js/filters.js) сравнивает cost.type с "бесплатно" и "платно"
+COST_TYPES = ("бесплатно", "платно", "частично_платно")
+# Коды type из примеров модели; в данных type пока свободный текст, поэтому расхождение — предупреждение
+TYPE_VALUES = (
+    "online",
+    "offline",
+    "hackathon",
+    "caseChampionship",
+    "openDay",
+    "meetup",
+    "lecture",
+    "masterclass",
+    "youtube",
+    "telegram",
+    "portal",
+)
+
+# Варианты дат: "2026-09-15", "2026-09-01 - 2026-10-31", "2026-09-15 18:00"
+_DATE = r"(\d{4}-\d{2}-\d{2})(?: (\d{2}:\d{2}))?"
+DATE_VALUE_RE = re.compile(rf"^{_DATE}(?: - {_DATE})?$")
+URL_RE = re.compile(r"^https?://[^\s/]+\.[^\s]+$")
+ID_RE = re.compile(r"^\S+$")
+
+NUMBER = (int, float)
+
+BENEFITS_SCHEMA: dict[str, dict[str, Any]] = {
+    "bvi": {"type": bool, "required": True},
+    "points100": {"type": bool, "required": True},
+    "additionalPoints": {"type": NUMBER, "required": True, "range": (0, 10)},
+    "grants": {"type": str, "required": True, "nullable": True},
+    "tuitionDiscount": {"type": str, "required": True, "nullable": True},
+    "priority": {"type": bool, "required": True},
+    "earlyAdmission": {"type": bool, "required": True},
+}
+
+COST_SCHEMA: dict[str, dict[str, Any]] = {
+    "type": {"type": str, "required": True, "enum": COST_TYPES},
+    "amount": {"type": NUMBER, "nullable": True, "range": (0, None)},
+    "currency": {"type": str},
+    "note": {"type": str},
+}
+
+# Таблица полей ресурса и раздел "Валидация при сохранении"
+RESOURCE_SCHEMA: dict[str, dict[str, Any]] = {
+    "id": {"type": str, "required": True, "pattern": ID_RE},
+    "name": {"type": str, "required": True},
+    "description": {"type": str, "required": True},
+    "type": {"type": str, "required": True, "enum": TYPE_VALUES, "enum_severity": "warning"},
+    "format": {"type": str, "required": True, "enum": FORMAT_VALUES},
+    "duration": {"type": str},
+    "location": {"type": str},
+    "targetAudience": {"type": list, "required": True, "items": str, "non_empty": True},
+    "subjects": {"type": list, "nullable": True, "items": str},
+    "benefits": {"type": dict, "required": True, "fields": BENEFITS_SCHEMA},
+    "relevantDirections": {"type": list, "required": True, "items": str, "non_empty": True},
+    # В модели обязательное, но в данных пока не заполнено и сайтом не используется
+    "regionality": {"type": str, "enum": REGIONALITY_VALUES},
+    "dates": {"type": dict, "required": True, "dates": True},
+    "cost": {"type": dict, "required": True, "fields": COST_SCHEMA},
+    "website": {"type": str, "required": True, "pattern": URL_RE},
+    "regulations": {"type": str, "nullable": True, "pattern": URL_RE},
+    "participationRequirements": {"type": list, "items": str},
+    "selectionProcess": {"type": str, "nullable": True},
+    "participantLimit": {"type": int, "nullable": True, "range": (1, None)},
+}
+
+# Версия схемы: при изменении правил кэш результатов по файлам сбрасывается
+SCHEMA_VERSION = hashlib.sha256(
+    repr((RESOURCE_SCHEMA, BENEFITS_SCHEMA, COST_SCHEMA, DATE_VALUE_RE.pattern)).encode("utf-8")
+).hexdigest()[:16]
+
+Issue = tuple[str, str, str, str]  # (severity, rule, path, message)
+Check = Callable[[dict[str, Any], list[Issue]], None]
+
+
+def _type_name(expected: type | tuple[type, ...]) -> str:
+    names = {str: "строка", bool: "булево", int: "целое", float: "число", list: "массив", dict: "объект"}
+    if isinstance(expected, tuple):
+        return "число" if expected == NUMBER else " или ".join(names.get(t, t.__name__) for t in expected)
+    return names.get(expected, expected.__name__)
+
+
+def _is_type(value: Any, expected: type | tuple[type, ...]) -> bool:
+    # bool — подкласс int, но числом в данных не считается
+    if isinstance(value, bool):
+        return expected is bool or (isinstance(expected, tuple) and bool in expected)
+    return isinstance(value, expected)
+
+
+def _check_date_value(path: str, value: Any, issues: list[Issue]) -> bool:
+    """Проверяет одно значение dates.*; возвращает True, если это дата"""
+    if value is None:
+        return False
+    if not isinstance(value, str):
+        issues.append(("error", "type", path, f"{path}: ожидается строка с датой"))
+        return False
+    match = DATE_VALUE_RE.match(value.strip())
+    if not match:
+        # "постоянно", "по расписанию" — допустимый текст, но не дата
+        if re.search(r"\d{4}-\d{2}-\d{2}", value):
+            issues.append(("warning", "date_format", path, f"{path}: нестандартный формат даты: {value}"))
+        return False
+
+    start_day, start_time, end_day, end_time = match.groups()
+    try:
+        start = datetime.fromisoformat(f"{start_day} {start_time or '00:00'}")
+        end = datetime.fromisoformat(f"{end_day} {end_time or '00:00'}") if end_day else start
+    except ValueError:
+        issues.append(("error", "date_value", path, f"{path}: несуществующая дата: {value}"))
+        return False
+    if end < start:
+        issues.append(("error", "date_range", path, f"{path}: конец интервала раньше начала: {value}"))
+    return True
+
+
+def _compile_field(name: str, spec: dict[str, Any], prefix: str) -> Check:
+    """Собирает проверку одного поля по его описанию в схеме"""
+    path = f"{prefix}{name}"
+    expected = spec["type"]
+    required = spec.get("required", False)
+    nullable = spec.get("nullable", False)
+    checks: list[Check] = []
+
+    if expected is str and required:
+
+        def check_blank(value: Any, issues: list[Issue]) -> None:
+            if not value.strip():
+                issues.append(("error", "empty", path, f"Поле {path} пусто"))
+
+        checks.append(check_blank)
+
+    if "pattern" in spec:
+        pattern = spec["pattern"]
+
+        def check_pattern(value: Any, issues: list[Issue]) -> None:
+            if value.strip() and not pattern.match(value):
+                issues.append(("error", "pattern", path, f"Поле {path}: некорректное значение: {value[:80]}"))
+
+        checks.append(check_pattern)
+
+    if "enum" in spec:
+        allowed = frozenset(spec["enum"])
+        severity = spec.get("enum_severity", "error")
+        hint = ", ".join(spec["enum"])
+
+        def check_enum(value: Any, issues: list[Issue]) -> None:
+            if value not in allowed:
+                issues.append((severity, "enum", path, f"Поле {path}: {value!r} не из списка ({hint})"))
+
+        checks.append(check_enum)
+
+    if "range" in spec:
+        low, high = spec["range"]
+
+        def check_range(value: Any, issues: list[Issue]) -> None:
+            if (low is not None and value < low) or (high is not None and value > high):
+                bounds = f"{low if low is not None else '-∞'}..{high if high is not None else '∞'}"
+                issues.append(("error", "range", path, f"Поле {path}: {value} вне диапазона {bounds}"))
+
+        checks.append(check_range)
+
+    if "items" in spec:
+        item_type = spec["items"]
+        non_empty = spec.get("non_empty", False)
+
+        def check_items(value: Any, issues: list[Issue]) -> None:
+            if non_empty and not value:
+                issues.append(("error", "empty", path, f"Поле {path}: пустой массив"))
+            if any(not _is_type(item, item_type) for item in value):
+                issues.append(("error", "type", path, f"Поле {path}: элементы должны быть: {_type_name(item_type)}"))
+
+        checks.append(check_items)
+
+    if "fields" in spec:
+        nested = compile_schema(spec["fields"], f"{path}.")
+        checks.append(nested)
+
+    if spec.get("dates"):
+
+        def check_dates(value: Any, issues: list[Issue]) -> None:
+            found = False
+            for key, item in value.items():
+                found = _check_date_value(f"{path}.{key}", item, issues) or found
+            if not found:
+                issues.append(("warning", "no_dates", path, f"Поле {path}: нет ни одной даты"))
+
+        checks.append(check_dates)
+
+    type_name = _type_name(expected)
+
+    def check(resource: dict[str, Any], issues: list[Issue]) -> None:
+        if name not in resource:
+            if required:
+                issues.append(("error", "missing", path, f"Отсутствует поле: {path}"))
+            return
+        value = resource[name]
+        if value is None:
+            if not nullable:
+                issues.append(("error", "null", path, f"Поле {path} не может быть null"))
+            return
+        if not _is_type(value, expected):
+            issues.append(("error", "type", path, f"Поле {path} должно быть: {type_name}"))
+            return
+        for field_check in checks:
+            field_check(value, issues)
+
+    return check
+
+
+def compile_schema(schema: dict[str, dict[str, Any]], prefix: str = "") -> Check:
+    """
+    Компилирует описание схемы в одну функцию проверки
+
+    Описание разбирается один раз: для каждого поля собирается список
+    замыканий только с нужными ему проверками, так что проверка ресурса
+    не интерпретирует схему заново.
+
+    Args:
+        schema: Поле -> {"type", "required", "nullable", "enum", "pattern", "range", "items", "fields", "dates"}
+        prefix: Префикс пути вложенных полей ("benefits.")
+
+    Returns:
+        check(resource, issues), дописывающая в issues кортежи (severity, rule, path, message)
+    """
+    checks = [_compile_field(name, spec, prefix) for name, spec in schema.items()]
+
+    def check(resource: dict[str, Any], issues: list[Issue]) -> None:
+        for field_check in checks:
+            field_check(resource, issues)
+
+    return check
+
+
+_check_resource = compile_schema(RESOURCE_SCHEMA)
+
+
+def validate_resource(resource: Any) -> list[Issue]:
+    """
+    Проверяет ресурс по модели данных
+
+    Returns:
+        Список (severity, rule, path, message); severity — "error" или "warning"
+    """
+    if not isinstance(resource, dict):
+        return [("error", "type", "", "Ресурс должен быть объектом")]
+    issues: list[Issue] = []
+    _check_resource(resource, issues)
+    return issues
+
+
+def validate_file(path: str, max_examples: int = 5) -> dict[str, Any]:
+    """
+    Проверяет все ресурсы файла (выполняется в пуле процессов)
+
+    Args:
+        path: Полный путь к JSON файлу
+        max_examples: Сколько примеров нарушений каждого вида сохранить
+
+    Returns:
+        {"resources", "errors", "warnings", "rules": {"severity:rule:path": число},
+        "examples": [{"id", "severity", "rule", "path", "message"}]}
+    """
+    result: dict[str, Any] = {"resources": 0, "errors": 0, "warnings": 0, "rules": {}, "examples": []}
+    try:
+        with Path(path).open(encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        result.update(errors=1, rules={"error:json:": 1})
+        result["examples"].append({"id": None, "severity": "error", "rule": "json", "path": "", "message": str(e)})
+        return result
+
+    if not isinstance(data, list):
+        data = [data]
+    result["resources"] = len(data)
+
+    seen_ids: set[str] = set()
+    for position, resource in enumerate(data):
+        issues = validate_resource(resource)
+        resource_id = resource.get("id") if isinstance(resource, dict) else None
+        if isinstance(resource_id, str):
+            if resource_id in seen_ids:
+                issues.append(("error", "duplicate_id", "id", f"ID {resource_id} повторяется в файле"))
+            seen_ids.add(resource_id)
+
+        for severity, rule, field_path, message in issues:
+            result["errors" if severity == "error" else "warnings"] += 1
+            key = f"{severity}:{rule}:{field_path}"
+            count = result["rules"].get(key, 0)
+            result["rules"][key] = count + 1
+            if count < max_examples:
+                result["examples"].append(
+                    {
+                        "id": resource_id if isinstance(resource_id, str) else position,
+                        "severity": severity,
+                        "rule": rule,
+                        "path": field_path,
+                        "message": message,
+                    }
+                )
+    return result
+
+
+def validate_files(paths: list[str]) -> list[dict[str, Any]]:
+    """Проверяет пачку файлов одной задачей пула (меньше пересылок между процессами)"""
+    return [validate_file(path) for path in paths]
+
+
+class SchemaCache:
+    """
+    Персистентный кэш результатов проверки файлов на SQLite
+
+    Ключ — путь файла; результат действителен, пока совпадают сигнатура
+    файла (mtime_ns, размер) и версия схемы.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                relpath TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                schema_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                checked_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, signatures: dict[str, tuple[int, int]]) -> dict[str, dict[str, Any]]:
+        """
+        Возвращает сохраненные результаты для файлов, которые не менялись
+
+        Args:
+            signatures: Путь -> (mtime_ns, размер)
+
+        Returns:
+            Путь -> результат validate_file
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT relpath, mtime_ns, size, schema_version, result FROM files").fetchall()
+        return {
+            relpath: json.loads(result)
+            for relpath, mtime_ns, size, version, result in rows
+            if signatures.get(relpath) == (mtime_ns, size) and version == SCHEMA_VERSION
+        }
+
+    def save(
+        self, results: dict[str, tuple[tuple[int, int], dict[str, Any]]], existing: list[str] | None = None
+    ) -> None:
+        """
+        Сохраняет результаты
+
+        Args:
+            results: Путь -> (сигнатура, результат)
+            existing: Все существующие файлы: записи остальных (удаленных)
+                файлов удаляются из кэша (None — ничего не удалять)
+        """
+        checked_at = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (relpath, signature[0], signature[1], SCHEMA_VERSION, json.dumps(result, ensure_ascii=False), checked_at)
+            for relpath, (signature, result) in results.items()
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if existing is not None:
+                self._conn.execute(
+                    "DELETE FROM files WHERE relpath NOT IN (SELECT value FROM json_each(?))", (json.dumps(existing),)
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Удаляет все сохраненные результаты"""
+        with self._lock:
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает число файлов в кэше и версию схемы"""
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return {"files": files, "schema_version": SCHEMA_VERSION}
@@ -0,0 +1,219 @@
+# mcp/utils/similarity.py
+
+"""
+Модуль локальной оценки сходства карточки ресурса и текста его страницы
+(TF-IDF по словам и символьным n-граммам, без обращения к LLM)
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import zlib
+from typing import Any
+
+import numpy as np
+
+from .validator import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+# Размерность пространства признаков (hashing trick)
+DIMENSION = 1 << 20
+# Длина символьных n-грамм и "основы" слова (грубый стемминг для русской морфологии)
+NGRAM = 3
+STEM_LENGTH = 6
+
+WORD_RE = re.compile(r"[а-яёa-z0-9]+")
+
+# Пороги по умолчанию: доля веса признаков карточки, найденная на странице
+DEFAULT_NAME_THRESHOLD = 0.6
+DEFAULT_FULL_THRESHOLD = 0.6
+DEFAULT_PARTIAL_THRESHOLD = 0.3
+
+
+def _features(text: str) -> list[int]:
+    """Хэши признаков текста: основы слов и символьные n-граммы слов"""
+    hashes = []
+    for word in WORD_RE.findall(text.lower().replace("ё", "е")):
+        if word in STOP_WORDS:
+            continue
+        hashes.append(zlib.crc32(b"w:" + word[:STEM_LENGTH].encode("utf-8")))
+        padded = f" {word} "
+        for i in range(len(padded) - NGRAM + 1):
+            hashes.append(zlib.crc32(b"c:" + padded[i : i + NGRAM].encode("utf-8")))
+    return hashes
+
+
+class SparseRows:
+    """
+    Набор разреженных векторов в формате CSR
+
+    indptr[i]:indptr[i + 1] — срез indices/data строки i; индексы внутри
+    строки отсортированы и уникальны.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def row_ids(self) -> np.ndarray:
+        """Номер строки для каждого ненулевого элемента"""
+        return np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+    @classmethod
+    def from_texts(cls, texts: list[str]) -> SparseRows:
+        """Считает частоты признаков по текстам"""
+        indptr = [0]
+        indices: list[np.ndarray] = []
+        counts: list[np.ndarray] = []
+        for text in texts:
+            hashed = np.asarray(_features(text or ""), dtype=np.int64) & (DIMENSION - 1)
+            unique, count = np.unique(hashed, return_counts=True)
+            indices.append(unique)
+            counts.append(count)
+            indptr.append(indptr[-1] + len(unique))
+        return cls(
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else np.empty(0, dtype=np.int64),
+            np.concatenate(counts).astype(np.float64) if counts else np.empty(0),
+        )
+
+    def tfidf(self, idf: np.ndarray) -> SparseRows:
+        """Сублинейный TF (1 + log tf) x IDF с L2-нормировкой строк"""
+        data = (1.0 + np.log(self.data)) * idf[self.indices]
+        norms = np.sqrt(np.bincount(self.row_ids, weights=data * data, minlength=len(self)))
+        data = data / np.where(norms > 0, norms, 1.0)[self.row_ids]
+        return SparseRows(self.indptr, self.indices, data)
+
+
+def inverse_document_frequency(corpus: list[SparseRows]) -> np.ndarray:
+    """
+    Сглаженный IDF по всем строкам корпуса: log((1 + n) / (1 + df)) + 1
+
+    Returns:
+        Вектор IDF длины DIMENSION
+    """
+    df = np.zeros(DIMENSION, dtype=np.float64)
+    total = 0
+    for rows in corpus:
+        df += np.bincount(rows.indices, minlength=DIMENSION)
+        total += len(rows)
+    return np.log((1.0 + total) / (1.0 + df)) + 1.0
+
+
+def pairwise_overlap(left: SparseRows, right: SparseRows) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Сравнивает строки left[i] и right[i] для всех i за одну векторную операцию
+
+    Returns:
+        (cosine, coverage): косинус нормированных векторов и доля веса
+        признаков left[i] (сумма квадратов весов), найденная в right[i]
+    """
+    if len(left) != len(right):
+        raise ValueError("Число строк для попарного сравнения должно совпадать")
+
+    # Ключ элемента = номер пары * DIMENSION + признак: пересечение ключей дает общие признаки каждой пары
+    left_keys = left.row_ids * DIMENSION + left.indices
+    right_keys = right.row_ids * DIMENSION + right.indices
+    common, left_pos, right_pos = np.intersect1d(left_keys, right_keys, assume_unique=True, return_indices=True)
+    pairs = common // DIMENSION
+
+    cosine = np.bincount(pairs, weights=left.data[left_pos] * right.data[right_pos], minlength=len(left))
+    shared = np.bincount(pairs, weights=left.data[left_pos] ** 2, minlength=len(left))
+    total = np.bincount(left.row_ids, weights=left.data**2, minlength=len(left))
+    coverage = np.divide(shared, total, out=np.zeros(len(left)), where=total > 0)
+    return cosine, coverage
+
+
+class SimilarityScorer:
+    """
+    Пакетная предварительная оценка соответствия карточек их страницам
+
+    Для name и description каждой карточки и текста ее страницы
+    строятся TF-IDF векторы (основы слов + символьные триграммы, IDF по
+    всему пакету). Основная метрика — доля веса признаков карточки,
+    встречающаяся на странице: короткое название не "тонет" в длинной
+    странице, как при косинусе. По порогам выставляются name_match и
+    description_match (full/partial/none) в формате отчета валидации и
+    решение: pass — можно не отправлять на семантическую проверку,
+    review — нужна проверка, fail — вероятное несоответствие.
+    """
+
+    def __init__(
+        self,
+        name_threshold: float = DEFAULT_NAME_THRESHOLD,
+        full_threshold: float = DEFAULT_FULL_THRESHOLD,
+        partial_threshold: float = DEFAULT_PARTIAL_THRESHOLD,
+    ):
+        if not 0 <= partial_threshold <= full_threshold <= 1:
+            raise ValueError("Пороги должны удовлетворять 0 <= partial_threshold <= full_threshold <= 1")
+        self.name_threshold = name_threshold
+        self.full_threshold = full_threshold
+        self.partial_threshold = partial_threshold
+
+    def score(self, resources: list[dict[str, Any]], pages: list[str]) -> list[dict[str, Any]]:
+        """
+        Оценивает пары (ресурс, текст страницы)
+
+        Args:
+            resources: Ресурсы с полями id, name, description
+            pages: Тексты страниц в том же порядке
+
+        Returns:
+            Список {"resource_id", "name_score", "description_score", "cosine",
+            "name_match", "description_match", "prescreen"}
+        """
+        if len(resources) != len(pages):
+            raise ValueError("Число ресурсов и страниц должно совпадать")
+        if not resources:
+            return []
+
+        names = SparseRows.from_texts([str(r.get("name") or "") for r in resources])
+        cards = SparseRows.from_texts([str(r.get("description") or "") for r in resources])
+        page_rows = SparseRows.from_texts(pages)
+
+        idf = inverse_document_frequency([cards, page_rows])
+        names, cards, page_rows = names.tfidf(idf), cards.tfidf(idf), page_rows.tfidf(idf)
+
+        _, name_scores = pairwise_overlap(names, page_rows)
+        cosines, card_scores = pairwise_overlap(cards, page_rows)
+
+        results = []
+        for resource, page, name_score, card_score, cosine in zip(
+            resources, pages, name_scores, card_scores, cosines, strict=True
+        ):
+            name_match = bool(name_score >= self.name_threshold)
+            if card_score >= self.full_threshold:
+                description_match = "full"
+            elif card_score >= self.partial_threshold:
+                description_match = "partial"
+            else:
+                description_match = "none"
+
+            if not page or not page.strip():
+                prescreen = "review"
+            elif name_match and description_match == "full":
+                prescreen = "pass"
+            elif not name_match and description_match == "none":
+                prescreen = "fail"
+            else:
+                prescreen = "review"
+
+            results.append(
+                {
+                    "resource_id": resource.get("id"),
+                    "name_score": round(float(name_score), 3),
+                    "description_score": round(float(card_score), 3),
+                    "cosine": round(float(cosine), 3),
+                    "name_match": name_match,
+                    "description_match": description_match,
+                    "prescreen": prescreen,
+                }
+            )
+        return results
@@ -0,0 +1,195 @@
+# mcp/utils/validation_state.py
+
+"""
+Модуль состояния инкрементальной валидации: хэши данных и страниц ресурсов
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Поля ресурса, изменение которых требует повторной валидации
+VALIDATED_FIELDS = ("name", "description", "website", "type", "format", "dates")
+
+# Повторная валидация без изменений не реже чем раз в столько секунд
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def data_hash(resource: dict[str, Any]) -> str:
+    """Хэш проверяемых полей ресурса (порядок ключей не важен)"""
+    payload = {field: resource.get(field) for field in VALIDATED_FIELDS}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def page_hash(text: str | None) -> str | None:
+    """Хэш текста страницы без учета пробелов и регистра; None — страница не загружена"""
+    if text is None:
+        return None
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ValidationState:
+    """
+    Персистентное состояние валидации ресурсов на SQLite
+
+    Для каждого ресурса (id + файл) хранятся хэш проверяемых полей,
+    хэш текста страницы на момент проверки, результат, время проверки и
+    дата, относительно которой даты ресурса считались прошедшими. По ним
+    определяется, каким ресурсам нужна повторная валидация.
+    """
+
+    def __init__(self, path: str, max_age: float = DEFAULT_MAX_AGE):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state (
+                resource_id TEXT NOT NULL,
+                file TEXT NOT NULL,
+                data_hash TEXT NOT NULL,
+                page_hash TEXT,
+                status TEXT NOT NULL,
+                result TEXT NOT NULL,
+                validated_at REAL NOT NULL,
+                evaluated_on TEXT NOT NULL,
+                PRIMARY KEY (resource_id, file)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def load(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        Возвращает сохраненное состояние ресурсов
+
+        Args:
+            keys: Список (resource_id, file)
+
+        Returns:
+            (resource_id, file) -> {"data_hash", "page_hash", "status", "result",
+            "validated_at", "evaluated_on"}
+        """
+        wanted = set(keys)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT resource_id, file, data_hash, page_hash, status, result, validated_at, evaluated_on FROM state"
+            ).fetchall()
+
+        state = {}
+        for resource_id, file, d_hash, p_hash, status, result, validated_at, evaluated_on in rows:
+            if (resource_id, file) in wanted:
+                state[(resource_id, file)] = {
+                    "data_hash": d_hash,
+                    "page_hash": p_hash,
+                    "status": status,
+                    "result": json.loads(result),
+                    "validated_at": validated_at,
+                    "evaluated_on": date.fromisoformat(evaluated_on),
+                }
+        return state
+
+    def change_reason(
+        self,
+        saved: dict[str, Any] | None,
+        d_hash: str,
+        p_hash: str | None,
+        max_age: float | None = None,
+        now: float | None = None,
+        today: date | None = None,
+        date_ends: Iterable[date] = (),
+    ) -> str | None:
+        """
+        Определяет, нужна ли повторная валидация
+
+        Args:
+            saved: Сохраненное состояние ресурса (None — ресурс еще не проверялся)
+            d_hash: Текущий хэш проверяемых полей
+            p_hash: Текущий хэш страницы (None — нет website или страница не загрузилась)
+            max_age: Максимальный возраст результата в секундах (default: self.max_age)
+            now: Текущее время (default: time.time())
+            today: Дата, относительно которой проверяются даты (default: сегодня)
+            date_ends: Концы интервалов dates.* ресурса
+
+        Returns:
+            "new", "data_changed", "page_changed", "date_passed", "expired"
+            или None, если результат актуален
+        """
+        if saved is None:
+            return "new"
+        if saved["data_hash"] != d_hash:
+            return "data_changed"
+        if saved["page_hash"] != p_hash:
+            return "page_changed"
+        # Вердикт зависит от даты проверки: конец интервала, оказавшийся между
+        # прошлой датой проверки и текущей, меняет признак "прошла"
+        low, high = sorted((saved["evaluated_on"], today or date.today()))
+        if any(low <= end < high for end in date_ends):
+            return "date_passed"
+        max_age = self.max_age if max_age is None else max_age
+        if (now or time.time()) - saved["validated_at"] > max_age:
+            return "expired"
+        return None
+
+    def record_many(self, entries: list[dict[str, Any]]) -> None:
+        """
+        Сохраняет результаты проверки одной транзакцией
+
+        Args:
+            entries: [{"resource_id", "file", "data_hash", "page_hash", "status", "result",
+                "evaluated_on"}], evaluated_on — дата проверки (default: сегодня)
+        """
+        now = time.time()
+        rows = [
+            (
+                e["resource_id"],
+                e["file"],
+                e["data_hash"],
+                e["page_hash"],
+                e["status"],
+                json.dumps(e["result"], ensure_ascii=False),
+                now,
+                (e.get("evaluated_on") or date.today()).isoformat(),
+            )
+            for e in entries
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        logger.debug(f"Состояние валидации: сохранено {len(rows)} записей")
+
+    def clear(self) -> None:
+        """Удаляет все состояние (следующий запуск проверит все ресурсы)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM state")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Возвращает число записей по статусам"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM state GROUP BY status").fetchall()
+            oldest = self._conn.execute("SELECT MIN(validated_at) FROM state").fetchone()[0]
+        return {
+            "entries": sum(count for _, count in rows),
+            "by_status": dict(rows),
+            "oldest_age_seconds": round(time.time() - oldest) if oldest else None,
+            "max_age_seconds": self.max_age,
+        }
@@ -5,25 +5,100 @@
 """
 
 import asyncio
+import codecs
+import copy
 import logging
+from collections.abc import AsyncIterator
+from typing import Any
+from urllib.parse import urlsplit
+
 import httpx
-from bs4 import BeautifulSoup
+
+from .host_scheduler import HostScheduler, backoff_delay, parse_retry_after
+from .html_text import TextExtractor, extract_text_soup, sniff_encoding
+from .http_cache import HTTPCache
+from .parse_pool import ParseExecutor
 
 logger = logging.getLogger(__name__)
 
+# Статусы, при которых запрос имеет смысл повторить
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
 
 class WebScraper:
     """Класс для захвата содержимого веб-страниц"""
 
-    def __init__(self, timeout: int = 10, max_retries: int = 3):
+    def __init__(
+        self,
+        timeout: int = 10,
+        max_retries: int = 3,
+        max_connections: int = 100,
+        max_connections_per_host: int = 6,
+        cache: HTTPCache | None = None,
+        scheduler: HostScheduler | None = None,
+        max_retry_wait: float = 60.0,
+        streaming: bool = True,
+        max_download_bytes: int = 2 * 1024 * 1024,
+        parser: ParseExecutor | None = None,
+    ):
         self.timeout = timeout
         self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.cache = cache
+        self.scheduler = scheduler or HostScheduler()
+        # Дольше этого не ждем Retry-After, а сразу возвращаем ошибку
+        self.max_retry_wait = max_retry_wait
+        # Потоковое извлечение текста с остановкой на max_chars (иначе полный разбор BeautifulSoup)
+        self.streaming = streaming
+        self.max_download_bytes = max_download_bytes
+        # Пул для полного разбора BeautifulSoup (streaming=False); потоковое
+        # извлечение ограничено max_chars и всегда идет в event loop
+        self.parser = parser or ParseExecutor("inline")
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
         ]
 
+        # Общий пул соединений и лимиты по хостам привязаны к event loop,
+        # в котором были созданы, поэтому пересоздаются при смене loop
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Возвращает общий httpx клиент текущего event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                trust_env=False,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._client_loop = loop
+            self._host_limits = {}
+            logger.debug("Создан пул HTTP соединений")
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        """Возвращает семафор, ограничивающий число соединений к хосту"""
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_limits[host]
+
+    async def aclose(self) -> None:
+        """Закрывает общий пул соединений"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
     async def fetch_url(self, url: str, max_chars: int = 3000) -> str:
         """
         Асинхронно захватывает содержимое URL
@@ -39,7 +114,44 @@ class WebScraper:
             TimeoutError: Если запрос превысит timeout
             Exception: При других ошибках сети
         """
+        page = await self.fetch_page(url, max_chars)
+        return page["content"]
+
+    async def fetch_page(
+        self, url: str, max_chars: int = 3000, use_cache: bool = True, cache_ttl: float | None = None
+    ) -> dict[str, Any]:
+        """
+        Захватывает содержимое URL с учетом HTTP кэша
+
+        Args:
+            url: URL страницы
+            max_chars: Максимум символов в ответе
+            use_cache: Использовать дисковый кэш (если он подключен)
+            cache_ttl: Сколько секунд страница из кэша свежа без перепроверки (None — ttl кэша)
+
+        Returns:
+            {"content": текст страницы, "cache_status": "hit" | "revalidated" | "miss" | "bypass"}
+
+        Raises:
+            TimeoutError: Если запрос превысит timeout
+            HostUnavailableError: Если хост временно отключен планировщиком
+            Exception: При других ошибках сети
+        """
+        cache = self.cache if use_cache else None
+        # Кэш на SQLite блокирующий — обращения к нему идут вне event loop.
+        # Текст, извлеченный с меньшим лимитом, не подходит для большего max_chars
+        cached = await asyncio.to_thread(cache.get, url, max_chars, cache_ttl) if cache is not None else None
+
+        if cached is not None and cached["fresh"]:
+            logger.debug(f"HTTP кэш: попадание {url}")
+            return {"content": cached["text"][:max_chars], "cache_status": "hit"}
+
+        last_attempt = self.max_retries - 1
         for attempt in range(self.max_retries):
+            # Ждем своей очереди к хосту (корзина токенов, Retry-After, предохранитель)
+            await self.scheduler.acquire(url, self.max_retry_wait)
+            retry_after = None
+
             try:
                 logger.debug(f"Попытка {attempt + 1}/{self.max_retries}: {url}")
 
@@ -49,51 +161,190 @@ class WebScraper:
                     "Accept-Language": "ru-RU,ru;q=0.9",
                 }
 
-                async with httpx.AsyncClient(timeout=self.timeout, trust_env=False) as client:
-                    response = await client.get(url, headers=headers, follow_redirects=True)
-                    response.raise_for_status()
+                # Условный запрос для устаревшей записи кэша
+                if cached is not None:
+                    if "etag" in cached["headers"]:
+                        headers["If-None-Match"] = cached["headers"]["etag"]
+                    if "last-modified" in cached["headers"]:
+                        headers["If-Modified-Since"] = cached["headers"]["last-modified"]
 
-                    # Парсим HTML
-                    soup = BeautifulSoup(response.content, "html.parser")
+                client = self._get_client()
+                async with self._host_limit(url), client.stream("GET", url, headers=headers) as response:
+                    if response.status_code in RETRYABLE_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get("retry-after"))
+                        self.scheduler.record_failure(url, retry_after, throttled=response.status_code in (429, 503))
+                    else:
+                        self.scheduler.record_success(url)
+
+                    if response.status_code == 304 and cached is not None:
+                        await asyncio.to_thread(cache.touch, url, response.headers)
+                        logger.info(f"✅ Страница не изменилась: {url}")
+                        return {"content": cached["text"][:max_chars], "cache_status": "revalidated"}
+
+                    response.raise_for_status()
 
-                    # Удаляем ненужные теги
-                    for tag in soup(["script", "style", "nav", "footer", "noscript"]):
-                        tag.decompose()
+                    if self.streaming:
+                        # Чтение прекращается, как только набрано max_chars символов текста
+                        body, text, complete = await self._read_text(response, max_chars)
+                    elif self.parser.offloads:
+                        # Полный разбор в пуле: читаем тело (до лимита), а CPU-работу отдаем воркерам
+                        body, complete = await self._read_body(response)
+                        text = await self.parser.run(extract_text_soup, body)
+                    else:
+                        body = await response.aread()
+                        text, complete = extract_text_soup(body), True
 
-                    # Извлекаем текст
-                    text = soup.get_text(separator="\n", strip=True)
+                if cache is not None:
+                    # Неполный текст годится только для запросов с тем же или меньшим max_chars
+                    text_limit = None if complete else max_chars
+                    await asyncio.to_thread(
+                        cache.put, url, response.status_code, response.headers, body, text, text_limit
+                    )
 
-                    # Ограничиваем размер
-                    result = text[:max_chars]
+                # Ограничиваем размер
+                result = text[:max_chars]
 
-                    logger.info(f"✅ Успешно загружен {url} ({len(result)} символов)")
-                    return result
+                logger.info(f"✅ Успешно загружен {url} ({len(result)} символов)")
+                return {"content": result, "cache_status": "miss" if cache is not None else "bypass"}
 
-            except TimeoutError:
+            except httpx.TimeoutException:
+                self.scheduler.record_failure(url)
                 logger.warning(f"Таймаут при загрузке {url} (попытка {attempt + 1})")
-                if attempt == self.max_retries - 1:
+                if attempt == last_attempt:
                     raise TimeoutError(f"Таймаут после {self.max_retries} попыток")
-                await asyncio.sleep(2**attempt)  # Exponential backoff
 
             except httpx.HTTPStatusError as e:
                 logger.warning(f"HTTP ошибка {e.response.status_code}: {url}")
-                if e.response.status_code == 429:  # Rate limit
-                    await asyncio.sleep(5)
-                elif attempt == self.max_retries - 1:
+                if e.response.status_code not in RETRYABLE_STATUSES or attempt == last_attempt:
                     raise
-                else:
-                    await asyncio.sleep(2)
+                if retry_after is not None:
+                    # Паузу выдержит планировщик при следующем acquire
+                    continue
 
-            except Exception as e:
+            except httpx.TransportError as e:
+                self.scheduler.record_failure(url)
                 logger.warning(f"Ошибка при загрузке {url}: {e}")
-                if attempt == self.max_retries - 1:
+                if attempt == last_attempt:
                     raise
-                await asyncio.sleep(1)
+
+            await asyncio.sleep(backoff_delay(attempt))
 
         raise Exception(f"Не удалось загрузить {url} после {self.max_retries} попыток")
 
+    async def _read_body(self, response: httpx.Response) -> tuple[bytes, bool]:
+        """
+        Читает тело ответа, но не более max_download_bytes байт
+
+        Returns:
+            (прочитанное тело, прочитан ли документ целиком)
+        """
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) >= self.max_download_bytes:
+                logger.debug(f"Чтение остановлено на {len(body)} байтах: {response.url}")
+                return bytes(body), False
+        return bytes(body), True
+
+    async def _read_text(self, response: httpx.Response, max_chars: int) -> tuple[bytes, str, bool]:
+        """
+        Читает ответ потоком и извлекает текст на лету
+
+        Чтение прекращается, как только набрано max_chars символов текста
+        или скачано max_download_bytes байт.
+
+        Returns:
+            (прочитанное тело, текст, прочитан ли документ целиком)
+        """
+        extractor = TextExtractor(max_chars)
+        decoder = None
+        body = bytearray()
+
+        async for chunk in response.aiter_bytes():
+            if decoder is None:
+                encoding = sniff_encoding(chunk, response.charset_encoding)
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            body.extend(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if extractor.done or len(body) >= self.max_download_bytes:
+                logger.debug(f"Чтение остановлено на {len(body)} байтах: {response.url}")
+                # Дописывает текстовый узел, оборванный на границе блока
+                extractor.close()
+                return bytes(body), extractor.text, False
+
+        if decoder is not None:
+            extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+        return bytes(body), extractor.text, True
+
+    async def fetch_many(
+        self,
+        urls: list[str],
+        max_chars: int = 3000,
+        concurrency: int = 10,
+        use_cache: bool = True,
+        cache_ttl: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Конкурентно захватывает несколько URL через общий пул соединений
+
+        Результаты отдаются по мере готовности, а не в порядке urls.
+        Повторяющиеся URL загружаются один раз.
+
+        Args:
+            urls: Список URL
+            max_chars: Максимум символов для каждой страницы
+            concurrency: Максимум одновременных загрузок
+            use_cache: Использовать дисковый кэш (если он подключен)
+            cache_ttl: Сколько секунд страница из кэша свежа без перепроверки (None — ttl кэша)
+
+        Yields:
+            {"url", "status": "success", "content", "length", "cache_status"} или
+            {"url", "status": "error", "message"}
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch_one(url: str) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    page = await self.fetch_page(url, max_chars, use_cache, cache_ttl)
+                    return {
+                        "url": url,
+                        "status": "success",
+                        "content": page["content"],
+                        "length": len(page["content"]),
+                        "cache_status": page["cache_status"],
+                    }
+                except Exception as e:
+                    return {"url": url, "status": "error", "message": str(e) or type(e).__name__}
+
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in dict.fromkeys(urls)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def fetch_sync(self, url: str, max_chars: int = 3000) -> str:
         """
-        Синхронная версия fetch_url для использования в не-async контексте
+        Синхронная версия fetch_url для использования в не-async контексте (скрипты)
+
+        Запрос выполняется в отдельном event loop со своим временным пулом
+        соединений, который закрывается после вызова: общий пул и лимиты по
+        хостам принадлежат loop сервера и не затрагиваются. Кэш, планировщик
+        хостов и пул разбора общие. В async коде используйте await
+        fetch_url/fetch_page.
         """
-        return asyncio.run(self.fetch_url(url, max_chars))
+        scraper = copy.copy(self)
+        scraper._client = None
+        scraper._client_loop = None
+        scraper._host_limits = {}
+
+        async def run() -> str:
+            try:
+                return await scraper.fetch_url(url, max_chars)
+            finally:
+                await scraper.aclose()
+
+        return asyncio.run(run())